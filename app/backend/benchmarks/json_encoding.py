@@ -0,0 +1,118 @@
+"""Compare response rendering with the stdlib encoder and orjson.
+
+Run from app/backend:
+
+    python -m benchmarks.json_encoding --orders 1000 --products 200
+"""
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from models.order import Order, OrderItem, OrderType, OrderStatus, PaymentStatus, PaymentMethod, DeliveryInfo, PickupInfo
+from models.product import Product, ProductCategory
+from responses import ORJSONResponse
+
+PRODUCT_NAMES = ["Espresso", "Cappuccino", "Latte", "Matcha Latte", "Croissant", "Pain au Chocolat", "Banana Bread", "Cold Brew"]
+INGREDIENTS = ["espresso", "whole milk", "oat milk", "matcha", "butter", "flour", "sugar", "dark chocolate", "vanilla", "banana"]
+TIME_SLOTS = ["9:00 AM - 10:00 AM", "10:00 AM - 11:00 AM", "1:00 PM - 2:00 PM", "3:00 PM - 4:00 PM"]
+
+def make_products(count: int, rng: random.Random):
+    return [
+        Product(
+            name=f"{rng.choice(PRODUCT_NAMES)} {i}",
+            description="House favourite, made fresh every morning",
+            price=round(rng.uniform(2.5, 9.0), 2),
+            category=rng.choice(list(ProductCategory)),
+            image_url=f"https://images.example.com/products/{i}.jpg",
+            ingredients=rng.sample(INGREDIENTS, rng.randint(2, 6)),
+            allergens=rng.sample(["milk", "gluten", "nuts", "soy"], rng.randint(0, 2)),
+            stock_quantity=rng.randint(0, 200)
+        )
+        for i in range(count)
+    ]
+
+def make_orders(count: int, products, rng: random.Random):
+    orders = []
+    for i in range(count):
+        items = []
+        for product in rng.sample(products, rng.randint(1, 4)):
+            quantity = rng.randint(1, 3)
+            items.append(OrderItem(
+                product_id=product.id,
+                product_name=product.name,
+                quantity=quantity,
+                unit_price=product.price,
+                total_price=round(product.price * quantity, 2)
+            ))
+        subtotal = round(sum(item.total_price for item in items), 2)
+        order_type = rng.choice(list(OrderType))
+        service_date = datetime.utcnow() + timedelta(days=rng.randint(0, 14))
+        orders.append(Order(
+            customer_id=f"user-{rng.randint(1, 500)}",
+            customer_email=f"customer{i}@example.com",
+            order_type=order_type,
+            items=items,
+            subtotal=subtotal,
+            delivery_fee=50.0 if order_type == OrderType.DELIVERY else 0.0,
+            total_amount=subtotal + (50.0 if order_type == OrderType.DELIVERY else 0.0),
+            status=rng.choice(list(OrderStatus)),
+            payment_status=rng.choice(list(PaymentStatus)),
+            payment_method=rng.choice(list(PaymentMethod)),
+            delivery_info=DeliveryInfo(
+                full_name="Juan dela Cruz",
+                contact_number="+63 912 345 6789",
+                delivery_address="123 Mabini Street, Makati City",
+                delivery_date=service_date,
+                delivery_time_slot=rng.choice(TIME_SLOTS)
+            ) if order_type == OrderType.DELIVERY else None,
+            pickup_info=PickupInfo(
+                full_name="Maria Santos",
+                contact_number="+63 917 555 0101",
+                pickup_date=service_date,
+                pickup_time_slot=rng.choice(TIME_SLOTS)
+            ) if order_type == OrderType.PICKUP else None,
+            updated_at=datetime.utcnow()
+        ))
+    return orders
+
+def measure(label: str, func, number: int):
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"  {label:<38} {seconds * 1000:9.3f} ms")
+    return seconds
+
+def compare(title: str, payload, number: int):
+    # response_model routes: FastAPI hands the renderer JSON-ready data
+    print(f"{title} (response_model, render only)")
+    json_ready = jsonable_encoder(payload)
+    baseline = measure("starlette JSONResponse", lambda: JSONResponse(json_ready), number)
+    fast = measure("ORJSONResponse", lambda: ORJSONResponse(json_ready), number)
+    print(f"  speedup {baseline / fast:.1f}x")
+
+    # Routes returning an ORJSONResponse directly skip jsonable_encoder entirely
+    print(f"{title} (raw documents, encode + render)")
+    documents = [item.model_dump() for item in payload]
+    baseline = measure("jsonable_encoder + JSONResponse", lambda: JSONResponse(jsonable_encoder(documents)), number)
+    fast = measure("ORJSONResponse", lambda: ORJSONResponse(documents), number)
+    print(f"  speedup {baseline / fast:.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1000, help="Orders per payload (get_orders allows up to 1000)")
+    parser.add_argument("--products", type=int, default=200, help="Products per payload")
+    parser.add_argument("--number", type=int, default=20, help="Renders per timing run")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    products = make_products(args.products, rng)
+    orders = make_orders(args.orders, products, rng)
+
+    body = ORJSONResponse(jsonable_encoder(orders)).body
+    print(f"{args.orders} orders = {len(body) / 1024:.0f} KiB, {args.products} products\n")
+    compare(f"{args.orders} orders", orders, args.number)
+    compare(f"{args.products} products", products, args.number)
+
+if __name__ == "__main__":
+    main()
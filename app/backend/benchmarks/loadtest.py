@@ -0,0 +1,221 @@
+"""Synthetic customer traffic against a running API.
+
+Virtual users replay the frontend's flows, picked by weight:
+
+- browse:   menu, upcoming events, delivery info, time slots
+- account:  register, log in, fetch profile
+- checkout: time slots, create order, payment intent, confirm payment
+            (signing up first if this user has no session yet)
+- admin:    list orders, move a recent order along its status workflow
+
+Reports throughput and latency percentiles per endpoint. Run from
+app/backend (see benchmarks.standins for a local server):
+
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8001 \\
+        --users 50 --duration 60 --mix browse=70,checkout=20,account=5,admin=5
+"""
+import argparse
+import asyncio
+import random
+import secrets
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+import httpx
+
+DEFAULT_MIX = "browse=70,checkout=20,account=5,admin=5"
+ADMIN_EMAIL = "admin@nanacafe.com"
+ADMIN_PASSWORD = "password123"
+# Each admin pass moves one order one step along
+NEXT_STATUS = {"pending": "confirmed", "confirmed": "preparing", "preparing": "ready", "ready": "completed"}
+
+class Stats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, seconds: float, status: str):
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][status] += 1
+
+    def report(self, elapsed: float):
+        print(f"\n{'endpoint':<36}{'reqs':>7}{'rps':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  statuses")
+        total = 0
+        for endpoint in sorted(self.latencies):
+            samples = sorted(self.latencies[endpoint])
+            total += len(samples)
+            statuses = " ".join(f"{status}:{count}" for status, count in sorted(self.statuses[endpoint].items()))
+            print(
+                f"{endpoint:<36}{len(samples):>7}{len(samples) / elapsed:>8.1f}"
+                f"{percentile(samples, 50):>8.1f}ms{percentile(samples, 90):>7.1f}ms"
+                f"{percentile(samples, 99):>7.1f}ms{samples[-1] * 1000:>7.1f}ms  {statuses}"
+            )
+        print(f"\n{total} requests in {elapsed:.1f}s = {total / elapsed:.1f} req/s")
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted samples, in milliseconds"""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, int(round(pct / 100 * len(samples) + 0.5)) - 1))
+    return samples[index] * 1000
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, admin_token: Optional[str], rng: random.Random, think_time: float):
+        self.client = client
+        self.stats = stats
+        self.admin_token = admin_token
+        self.rng = rng
+        self.think_time = think_time
+        self.token: Optional[str] = None
+        self.products: List[dict] = []
+
+    async def call(self, endpoint: str, method: str, url: str, token: Optional[str] = None, **kwargs) -> Optional[httpx.Response]:
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            response, status = None, type(e).__name__
+        self.stats.record(endpoint, time.perf_counter() - start, status)
+        return response
+
+    async def think(self):
+        if self.think_time:
+            await asyncio.sleep(self.rng.expovariate(1 / self.think_time))
+
+    async def browse(self):
+        response = await self.call("GET /products", "GET", "/api/products/")
+        if response is not None and response.status_code == 200:
+            self.products = response.json()
+        await self.call("GET /events/upcoming", "GET", "/api/events/upcoming")
+        await self.call("GET /settings/delivery-info", "GET", "/api/settings/delivery-info")
+        await self.call("GET /settings/time-slots", "GET", "/api/settings/time-slots", params={"date": self.service_date()})
+
+    async def account(self):
+        email = f"load-{secrets.token_hex(6)}@example.com"
+        password = secrets.token_urlsafe(12)
+        await self.call("POST /auth/register", "POST", "/api/auth/register", json={
+            "username": email.split("@")[0], "email": email, "password": password, "full_name": "Load Test"
+        })
+        response = await self.call("POST /auth/login", "POST", "/api/auth/login", json={"email": email, "password": password})
+        if response is not None and response.status_code == 200:
+            self.token = response.json()["access_token"]
+            await self.call("GET /auth/me", "GET", "/api/auth/me", token=self.token)
+
+    async def checkout(self):
+        # Order placement needs a signed-in customer
+        if not self.token:
+            await self.account()
+        if not self.products:
+            await self.browse()
+        if not self.token or not self.products:
+            return
+        service_date = self.service_date()
+        response = await self.call("GET /settings/time-slots", "GET", "/api/settings/time-slots", params={"date": service_date})
+        slots = response.json().get("time_slots", []) if response is not None and response.status_code == 200 else []
+        if not slots:
+            return
+
+        items = []
+        for product in self.rng.sample(self.products, min(len(self.products), self.rng.randint(1, 3))):
+            quantity = self.rng.randint(1, 2)
+            items.append({
+                "product_id": product["id"], "product_name": product["name"], "quantity": quantity,
+                "unit_price": product["price"], "total_price": round(product["price"] * quantity, 2)
+            })
+        order = {
+            "customer_email": f"guest-{secrets.token_hex(4)}@example.com",
+            "order_type": "pickup",
+            "items": items,
+            "pickup_info": {
+                "full_name": "Load Test", "contact_number": "+63 912 345 6789",
+                "pickup_date": service_date, "pickup_time_slot": self.rng.choice(slots)
+            },
+            "payment_method": "stripe"
+        }
+        response = await self.call("POST /orders", "POST", "/api/orders/", token=self.token, json=order)
+        if response is None or response.status_code != 200:
+            return
+        order_id = response.json()["id"]
+
+        await self.think()
+        response = await self.call("POST /orders/{id}/payment-intent", "POST", f"/api/orders/{order_id}/payment-intent")
+        if response is None or response.status_code != 200:
+            return
+        await self.call("POST /orders/{id}/confirm-payment", "POST", f"/api/orders/{order_id}/confirm-payment")
+
+    async def admin(self):
+        if not self.admin_token:
+            return
+        response = await self.call("GET /orders (admin)", "GET", "/api/orders/", token=self.admin_token, params={"limit": 50})
+        if response is None or response.status_code != 200:
+            return
+        movable = [order for order in response.json() if order["status"] in NEXT_STATUS]
+        if movable:
+            order = self.rng.choice(movable)
+            await self.call(
+                "PUT /orders/{id}/status", "PUT", f"/api/orders/{order['id']}/status",
+                token=self.admin_token, params={"new_status": NEXT_STATUS[order["status"]]}
+            )
+
+    def service_date(self) -> str:
+        return (date.today() + timedelta(days=self.rng.randint(1, 14))).isoformat()
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("browse", "account", "checkout", "admin"):
+            raise SystemExit(f"Unknown flow in --mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+async def run(args):
+    stats = Stats()
+    weights = parse_mix(args.mix)
+    flows, flow_weights = list(weights), list(weights.values())
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        admin_token = None
+        if "admin" in weights:
+            response = await client.post("/api/auth/admin-login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+            if response.status_code == 200:
+                admin_token = response.json()["access_token"]
+            else:
+                print(f"Admin login failed ({response.status_code}); admin flow disabled")
+
+        deadline = time.monotonic() + args.duration
+        started = time.monotonic()
+
+        async def user_loop(index: int):
+            rng = random.Random(args.seed * 10007 + index)
+            user = VirtualUser(client, stats, admin_token, rng, args.think_time)
+            # Spread the ramp-up so users do not all start in lockstep
+            await asyncio.sleep(rng.uniform(0, args.ramp_up))
+            while time.monotonic() < deadline:
+                flow = rng.choices(flows, flow_weights)[0]
+                await getattr(user, flow)()
+                await user.think()
+
+        print(f"{args.users} users for {args.duration}s against {args.base_url} ({args.mix})")
+        await asyncio.gather(*(user_loop(index) for index in range(args.users)))
+        stats.report(time.monotonic() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0], formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="Seconds over which users start")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between steps, in seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Flow weights, e.g. browse=70,checkout=20,account=5,admin=5")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
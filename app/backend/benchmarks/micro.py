@@ -0,0 +1,191 @@
+"""Per-call cost of the functions and models every request goes through.
+
+Times order totals, model construction and serialization, JWT issue and
+verification, and notification rendering, then saves or compares against
+a baseline in benchmarks/baselines. Each case is the median of several
+timing runs. ``compare`` exits non-zero when a case's median is slower than
+the baseline by more than --threshold, by more than three times the
+run-to-run spread, and by more than --min-delta-us, so noise on sub-microsecond
+cases does not fail it.
+
+Baselines are machine specific and are not committed. Save one on the
+machine that will compare against it, e.g. in one CI job: check out the
+base commit and save, then check out the change and compare. Run from
+app/backend:
+
+    python -m benchmarks.micro run --save base
+    python -m benchmarks.micro compare --baseline base --threshold 0.25
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from models.event import Event
+from models.order import Order, OrderCreate, OrderItem, OrderStatus, OrderType, DeliveryInfo
+from models.product import Product
+from models.settings import CafeSettings, BusinessHours, DeliveryZone
+from routes.orders import calculate_order_totals
+from services.auth_service import AuthService, token_cache
+from services.notification_service import NotificationService
+from benchmarks.json_encoding import make_products, make_orders
+from benchmarks.model_validation import make_events
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+# A regression must also exceed this many times the larger interquartile spread of the two runs
+NOISE_FACTOR = 3
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def make_settings() -> CafeSettings:
+    return CafeSettings(
+        contact_email="admin@nanacafe.com",
+        contact_phone="+63 2 8555 0100",
+        address="123 Main Street, Makati",
+        business_hours=[BusinessHours(day=day, open_time="08:00", close_time="18:00") for day in DAYS],
+        delivery_zones=[
+            DeliveryZone(name=f"Zone {i}", areas=[f"Barangay {i}-{j}" for j in range(5)], delivery_fee=50.0 + 10 * i, min_order_amount=150.0)
+            for i in range(4)
+        ],
+        time_slot_capacities={"12:00 PM - 1:00 PM": 30}
+    )
+
+def make_order_create(order: Order) -> OrderCreate:
+    return OrderCreate(
+        customer_email=order.customer_email,
+        order_type=OrderType.DELIVERY,
+        items=order.items,
+        delivery_info=DeliveryInfo(
+            full_name="Maria Santos",
+            contact_number="+63 917 555 0101",
+            delivery_address="123 Main Street, Makati",
+            delivery_date=datetime.utcnow() + timedelta(days=1),
+            delivery_time_slot="10:00 AM - 11:00 AM"
+        )
+    )
+
+def model_cases(name: str, instance) -> List[Tuple[str, Callable]]:
+    model = type(instance)
+    document = instance.model_dump()
+    return [
+        (f"{name}: construct from document", lambda: model(**document)),
+        (f"{name}: model_dump", instance.model_dump),
+        (f"{name}: model_dump_json", instance.model_dump_json),
+    ]
+
+def build_cases() -> List[Tuple[str, Callable]]:
+    rng = random.Random(42)
+    products = make_products(20, rng)
+    # A typical basket rather than a worst case
+    order = next(order for order in make_orders(50, products, rng) if len(order.items) == 3)
+    order_create = make_order_create(order)
+    notifications = NotificationService()
+
+    claims = {"sub": "user-1", "role": "customer"}
+    token = AuthService.create_access_token(claims)
+
+    def verify_uncached():
+        token_cache.clear()
+        return AuthService.verify_token(token)
+
+    return [
+        ("calculate_order_totals", lambda: calculate_order_totals(order_create)),
+        *model_cases("Order", order),
+        *model_cases("Product", products[0]),
+        *model_cases("Event", make_events(1, rng)[0]),
+        *model_cases("CafeSettings", make_settings()),
+        ("create_access_token", lambda: AuthService.create_access_token(claims)),
+        ("verify_token (decode)", verify_uncached),
+        ("verify_token (cached)", lambda: AuthService.verify_token(token)),
+        ("render order confirmation", lambda: notifications.render_order_confirmation(order)),
+        ("render status update", lambda: notifications.render_status_update(order, OrderStatus.READY)),
+        ("render admin notification", lambda: notifications.render_admin_notification(order)),
+    ]
+
+def measure(func: Callable, repeat: int) -> Dict[str, float]:
+    """Median per-call time in seconds and its interquartile spread relative to the median.
+
+    The loop count is sized to ~0.2s per run.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    median = statistics.median(runs)
+    quartiles = statistics.quantiles(runs, n=4)
+    return {"median": median, "spread": (quartiles[2] - quartiles[0]) / median}
+
+def run_cases(match: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, func in build_cases():
+        if match.lower() in name.lower():
+            results[name] = measure(func, repeat)
+            print(f"  {name:<40} {results[name]['median'] * 1e6:10.2f} us  ±{results[name]['spread']:.1%}")
+    return results
+
+def baseline_path(name: str) -> Path:
+    return BASELINE_DIR / f"{name}.json"
+
+def save_baseline(name: str, results: Dict[str, Dict[str, float]]):
+    BASELINE_DIR.mkdir(exist_ok=True)
+    record = {
+        "saved_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }
+    baseline_path(name).write_text(json.dumps(record, indent=2, sort_keys=True) + "\n")
+    print(f"\nSaved baseline {baseline_path(name)}")
+
+def compare(name: str, results: Dict[str, Dict[str, float]], threshold: float, min_delta: float) -> bool:
+    """Print the change per case; False if any case regressed past the threshold, the noise and min_delta"""
+    path = baseline_path(name)
+    if not path.exists():
+        raise SystemExit(f"No baseline {path}; save one with: python -m benchmarks.micro run --save {name}")
+    baseline = json.loads(path.read_text())
+    print(
+        f"\nAgainst {path.name} (python {baseline['python']}, saved {baseline['saved_at']}), "
+        f"threshold +{threshold:.0%}, min delta {min_delta * 1e6:.2f} us"
+    )
+
+    ok = True
+    for case, result in results.items():
+        before = baseline["results"].get(case)
+        if before is None:
+            print(f"  {case:<40} {'new':>10}")
+            continue
+        change = result["median"] / before["median"] - 1
+        noise = NOISE_FACTOR * max(result["spread"], before["spread"])
+        delta = result["median"] - before["median"]
+        regressed = change > max(threshold, noise) and delta > min_delta
+        ok = ok and not regressed
+        print(f"  {case:<40} {change:>+10.1%}  noise ±{noise:<6.1%} {delta * 1e6:>+8.2f} us{'  REGRESSION' if regressed else ''}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0], formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Time every case, optionally saving a baseline")
+    run_parser.add_argument("--save", metavar="NAME", help="Store the results as baselines/NAME.json")
+    compare_parser = commands.add_parser("compare", help="Time every case and compare with a baseline")
+    compare_parser.add_argument("--baseline", default="base", metavar="NAME")
+    compare_parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown, as a fraction")
+    compare_parser.add_argument("--min-delta-us", type=float, default=1.0, help="Slowdowns smaller than this many microseconds never fail")
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("-k", "--match", default="", help="Only cases whose name contains this")
+        sub.add_argument("--repeat", type=int, default=9, help="Timing runs per case; the median counts")
+    args = parser.parse_args()
+
+    print(f"Median of {args.repeat} runs per case\n")
+    results = run_cases(args.match, args.repeat)
+    if args.command == "run":
+        if args.save:
+            save_baseline(args.save, results)
+    elif not compare(args.baseline, results, args.threshold, args.min_delta_us / 1e6):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Per-model cost of the old read path against the trusted one.
+
+Old path: build ``Model(**doc)`` per document, then FastAPI dumps, re-validates
+and serializes the result against ``response_model``. Trusted path:
+``documents_response`` validates the batch once and serializes it in
+pydantic-core. There is one case per response model in ``models/``; they
+live here with the other benchmarks so the models package stays free of
+benchmark code and fixtures. Run from app/backend:
+
+    python -m benchmarks.model_validation --count 1000
+"""
+import argparse
+import asyncio
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import List
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from models.api_key import ApiKey, ApiKeyResponse, ApiKeyScope
+from models.event import Event, EventResponse, EventRegistration, EventRegistrationResponse, RegistrationStatus
+from models.order import OrderResponse
+from models.product import ProductResponse
+from models.settings import CafeSettings
+from responses import ORJSONResponse, documents_response
+from benchmarks.json_encoding import make_products, make_orders
+
+def make_events(count: int, rng: random.Random):
+    return [
+        Event(
+            title=f"Pop-Up #{i}",
+            description="Coffee, pastries and live music",
+            event_date=datetime.utcnow() + timedelta(days=rng.randint(0, 90)),
+            start_time="9:00 AM",
+            end_time="5:00 PM",
+            location="Downtown Plaza, Main Street",
+            max_capacity=rng.choice([None, 50, 100]),
+            current_registrations=rng.randint(0, 50),
+            is_featured=rng.random() < 0.2
+        )
+        for i in range(count)
+    ]
+
+def make_registrations(count: int, rng: random.Random):
+    return [
+        EventRegistration(
+            event_id="event-1",
+            user_id=f"user-{i}",
+            status=rng.choice(list(RegistrationStatus)),
+            waitlisted_at=datetime.utcnow()
+        )
+        for i in range(count)
+    ]
+
+def make_api_keys(count: int, rng: random.Random):
+    return [ApiKey(name=f"Kiosk {i}", scopes=rng.sample(list(ApiKeyScope), 2)) for i in range(count)]
+
+def make_settings(count: int, rng: random.Random):
+    return [CafeSettings(contact_email="admin@nanacafe.com") for _ in range(count)]
+
+def run_old_path(model, documents, field, loop):
+    async def render():
+        models = [model(**document) for document in documents]
+        content = await serialize_response(field=field, response_content=models, is_coroutine=True)
+        return ORJSONResponse(content)
+    return loop.run_until_complete(render())
+
+def measure(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000, help="Documents per response")
+    parser.add_argument("--number", type=int, default=10, help="Responses per timing run")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    products = make_products(args.count, rng)
+    cases = [
+        (OrderResponse, make_orders(args.count, products, rng)),
+        (ProductResponse, products),
+        (EventResponse, make_events(args.count, rng)),
+        (EventRegistrationResponse, make_registrations(args.count, rng)),
+        (ApiKeyResponse, make_api_keys(args.count, rng)),
+        (CafeSettings, make_settings(args.count, rng)),
+    ]
+
+    loop = asyncio.new_event_loop()
+    print(f"{args.count} documents per response, best of 5\n")
+    print(f"{'model':<28}{'old path':>12}{'trusted':>12}{'speedup':>10}")
+    for model, instances in cases:
+        # What Motor hands back: plain dicts with the Mongo _id attached
+        documents = [{**instance.model_dump(), "_id": index} for index, instance in enumerate(instances)]
+        field = create_response_field(name=f"Response_{model.__name__}", type_=List[model], mode="serialization")
+
+        old_body = run_old_path(model, documents, field, loop).body
+        new_body = documents_response(model, documents).body
+        assert old_body == new_body, f"{model.__name__} output differs"
+
+        old = measure(lambda: run_old_path(model, documents, field, loop), args.number)
+        new = measure(lambda: documents_response(model, documents), args.number)
+        print(f"{model.__name__:<28}{old * 1000:>10.2f}ms{new * 1000:>10.2f}ms{old / new:>9.1f}x")
+    loop.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Run the API against local stand-ins for MongoDB, Stripe and SMTP.
+
+Starts, in one process:
+
+- a Stripe stand-in speaking the subset of the REST API PaymentService uses
+  (payment intents and refunds), with configurable latency
+- an SMTP sink that accepts and discards every message
+- the API itself, on an in-memory MongoDB (mongomock-motor, optional
+  dependency) or on MONGO_URL with ``--mongo url``
+
+Run from app/backend, then point benchmarks.loadtest at it:
+
+    python -m benchmarks.standins --port 8001
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8001
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import threading
+import time
+from fastapi import FastAPI, HTTPException, Request
+
+def create_stripe_standin(latency_ms: float = 0.0) -> FastAPI:
+    """Minimal Stripe API: create/retrieve payment intents, create refunds"""
+    app = FastAPI(title="Stripe stand-in")
+    intents = {}
+
+    async def delay():
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+    @app.post("/v1/payment_intents")
+    async def create_payment_intent(request: Request):
+        await delay()
+        form = await request.form()
+        intent_id = f"pi_{secrets.token_hex(12)}"
+        intent = {
+            "id": intent_id,
+            "object": "payment_intent",
+            "amount": int(form.get("amount", 0)),
+            "amount_received": 0,
+            "currency": form.get("currency", "php"),
+            "client_secret": f"{intent_id}_secret_{secrets.token_hex(8)}",
+            "created": int(time.time()),
+            "description": form.get("description"),
+            "metadata": {key[9:-1]: value for key, value in form.items() if key.startswith("metadata[")},
+            "status": "requires_payment_method"
+        }
+        intents[intent_id] = intent
+        return intent
+
+    @app.get("/v1/payment_intents/{intent_id}")
+    async def retrieve_payment_intent(intent_id: str):
+        await delay()
+        intent = intents.get(intent_id)
+        if intent is None:
+            raise HTTPException(status_code=404, detail={"error": {"type": "invalid_request_error", "message": "No such payment_intent"}})
+        # The customer "pays" between creating the intent and confirming it
+        intent.update(status="succeeded", amount_received=intent["amount"])
+        return intent
+
+    @app.post("/v1/refunds")
+    async def create_refund(request: Request):
+        await delay()
+        form = await request.form()
+        intent = intents.get(form.get("payment_intent"), {})
+        return {
+            "id": f"re_{secrets.token_hex(12)}",
+            "object": "refund",
+            "amount": int(form.get("amount") or intent.get("amount", 0)),
+            "payment_intent": form.get("payment_intent"),
+            "status": "succeeded"
+        }
+
+    return app
+
+class SMTPSink:
+    """Accepts SMTP sessions and throws the messages away (no STARTTLS)"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.messages = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def reply(line: str):
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        try:
+            await reply("220 smtp-standin ESMTP")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors="replace").strip().upper()
+                if command.startswith(("EHLO", "HELO")):
+                    await reply("250 smtp-standin")
+                elif command == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    while (await reader.readline()) not in (b".\r\n", b".\n", b""):
+                        pass
+                    if self.latency_ms:
+                        await asyncio.sleep(self.latency_ms / 1000)
+                    self.messages += 1
+                    await reply("250 OK queued")
+                elif command == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:  # MAIL, RCPT, RSET, NOOP, AUTH ...
+                    await reply("250 OK")
+        finally:
+            writer.close()
+
+def use_in_memory_mongo():
+    """Swap the Motor client for mongomock-motor before the app starts"""
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit("--mongo memory needs mongomock-motor (pip install mongomock-motor), or use --mongo url")
+
+    import database
+    import server
+
+    async def connect_in_memory():
+        database.client = AsyncMongoMockClient()
+        database.database = database.client[database.DB_NAME]
+        print(f"Connected to in-memory MongoDB stand-in: {database.DB_NAME}")
+
+    database.connect_to_mongo = connect_in_memory
+    server.connect_to_mongo = connect_in_memory
+
+def create_app():
+    """App factory on the in-memory MongoDB, for multi-worker runs (one database per worker)"""
+    use_in_memory_mongo()
+    from server import app
+    return app
+
+async def serve_standins(args, smtp_sink: SMTPSink, ready: threading.Event):
+    import uvicorn
+    try:
+        smtp_server = await asyncio.start_server(smtp_sink.handle, args.host, args.smtp_port)
+    finally:
+        ready.set()
+    stripe_server = uvicorn.Server(uvicorn.Config(
+        create_stripe_standin(args.stripe_latency_ms), host=args.host, port=args.stripe_port, log_level="warning"
+    ))
+    async with smtp_server:
+        await stripe_server.serve()
+
+def run(args):
+    import uvicorn
+
+    # PaymentService and NotificationService make blocking calls from the event
+    # loop, so the stand-ins get a loop (thread) of their own
+    smtp_sink = SMTPSink(args.smtp_latency_ms)
+    ready = threading.Event()
+    threading.Thread(target=lambda: asyncio.run(serve_standins(args, smtp_sink, ready)), daemon=True).start()
+    ready.wait()
+
+    # Environment must be in place before the app's services are imported
+    if args.mongo == "memory":
+        use_in_memory_mongo()
+    from server import app
+
+    print(f"Stripe stand-in on http://{args.host}:{args.stripe_port}, SMTP sink on {args.host}:{args.smtp_port}")
+    print(f"API on http://{args.host}:{args.port} (mongo: {args.mongo})")
+    try:
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    finally:
+        print(f"SMTP sink received {smtp_sink.messages} messages")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001, help="API port")
+    parser.add_argument("--stripe-port", type=int, default=12111)
+    parser.add_argument("--smtp-port", type=int, default=2525)
+    parser.add_argument("--stripe-latency-ms", type=float, default=80.0, help="Added to every Stripe call")
+    parser.add_argument("--smtp-latency-ms", type=float, default=30.0, help="Added to every message")
+    parser.add_argument("--mongo", choices=["memory", "url"], default="memory", help="In-memory stand-in or MONGO_URL")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Keep login/register limits (all load comes from one IP)")
+    args = parser.parse_args()
+
+    os.environ["STRIPE_API_BASE"] = f"http://{args.host}:{args.stripe_port}"
+    os.environ["SMTP_SERVER"] = args.host
+    os.environ["SMTP_PORT"] = str(args.smtp_port)
+    os.environ["SMTP_STARTTLS"] = "false"
+    if not args.keep_rate_limits:
+        os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    run(args)
+
+if __name__ == "__main__":
+    main()
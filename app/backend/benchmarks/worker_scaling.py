@@ -0,0 +1,132 @@
+"""Throughput of the multi-worker launcher as workers are added.
+
+For each worker count, starts ``cli.py serve`` on the in-memory stand-in
+(``benchmarks.standins:create_app``, one database per worker) or on
+MONGO_URL with ``--mongo url``, then drives keep-alive GETs from several
+client processes and reports req/s, latency and scaling over one worker.
+Client processes need cores too: scaling flattens once workers plus
+clients exceed the CPUs available. Run from app/backend:
+
+    python -m benchmarks.worker_scaling --workers 1,2,4 --clients 4 --duration 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import List, Tuple
+from launcher import default_workers
+
+def worker_counts() -> str:
+    counts, count = [], 1
+    while count < default_workers():
+        counts.append(count)
+        count *= 2
+    return ",".join(str(c) for c in counts + [default_workers()])
+
+async def connection(host: str, port: int, path: str, deadline: float, latencies: List[float]) -> int:
+    """One keep-alive connection issuing GETs back to back; returns the error count"""
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+    errors = 0
+    try:
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line[:15].lower() == b"content-length:":
+                    length = int(line[15:])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            errors += not head.startswith(b"HTTP/1.1 200")
+    finally:
+        writer.close()
+    return errors
+
+def client_process(host: str, port: int, path: str, connections: int, duration: float, results):
+    async def run():
+        latencies: List[float] = []
+        deadline = time.monotonic() + duration
+        errors = await asyncio.gather(*(connection(host, port, path, deadline, latencies) for _ in range(connections)))
+        return latencies, sum(errors)
+    results.put(asyncio.run(run()))
+
+def drive(host: str, port: int, path: str, clients: int, connections: int, duration: float) -> Tuple[List[float], int]:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(target=client_process, args=(host, port, path, connections, duration, results))
+        for _ in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    latencies, errors = [], 0
+    for _ in processes:
+        client_latencies, client_errors = results.get()
+        latencies.extend(client_latencies)
+        errors += client_errors
+    for process in processes:
+        process.join()
+    return sorted(latencies), errors
+
+def start_server(args, workers: int) -> subprocess.Popen:
+    command = [sys.executable, "cli.py", "serve", "--host", args.host, "--port", str(args.port), "--workers", str(workers), "--log-level", "warning"]
+    if args.mongo == "memory":
+        command += ["--app", "benchmarks.standins:create_app", "--factory", "--per-worker-startup"]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+    # Ready once every worker has answered at least once
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"Server exited with code {server.returncode}")
+        try:
+            urllib.request.urlopen(f"http://{args.host}:{args.port}{args.path}", timeout=1).read()
+            time.sleep(2 + 0.5 * workers)
+            return server
+        except OSError:
+            time.sleep(0.5)
+    stop_server(server)
+    raise SystemExit("Server did not become ready")
+
+def stop_server(server: subprocess.Popen):
+    os.killpg(server.pid, signal.SIGTERM)
+    server.wait(60)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0], formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=worker_counts(), help="Comma-separated worker counts to try")
+    parser.add_argument("--clients", type=int, default=max(1, default_workers() // 2), help="Load generator processes")
+    parser.add_argument("--connections", type=int, default=32, help="Keep-alive connections per client process")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per worker count")
+    parser.add_argument("--path", default="/api/products/")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--mongo", choices=["memory", "url"], default="memory", help="In-memory stand-in or MONGO_URL")
+    args = parser.parse_args()
+
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    counts = [int(count) for count in args.workers.split(",")]
+    print(f"GET {args.path}, {args.clients} client processes x {args.connections} connections, {args.duration:.0f}s each, {default_workers()} CPUs\n")
+    print(f"{'workers':>7}{'req/s':>10}{'p50':>10}{'p99':>10}{'errors':>8}{'scaling':>9}")
+    base = None
+    for workers in counts:
+        server = start_server(args, workers)
+        try:
+            latencies, errors = drive(args.host, args.port, args.path, args.clients, args.connections, args.duration)
+        finally:
+            stop_server(server)
+        rps = len(latencies) / args.duration
+        base = base or rps
+        p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0
+        print(f"{workers:>7}{rps:>10.0f}{p50:>8.1f}ms{p99:>8.1f}ms{errors:>8}{rps / base:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
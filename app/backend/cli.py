@@ -0,0 +1,105 @@
+import asyncio
+import time
+import typer
+from database import connect_to_mongo, close_mongo_connection, ensure_indexes
+from migrations import run_migrations
+from launcher import default_workers, serve as serve_workers
+from logging_config import configure_logging
+from seeding import DatasetGenerator, SEED_BATCH_SIZE, seed_database, clear_seeded_collections
+from services.auth_service import AuthService, BCRYPT_TARGET_MS, BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS
+
+app = typer.Typer(help="Nana Cafe backend management commands")
+
+@app.callback()
+def main():
+    """Nana Cafe backend management commands"""
+
+@app.command("calibrate-bcrypt")
+def calibrate_bcrypt(
+    target_ms: float = typer.Option(BCRYPT_TARGET_MS, help="Target password verify latency in milliseconds"),
+    min_rounds: int = typer.Option(BCRYPT_MIN_ROUNDS, help="Lowest acceptable bcrypt cost"),
+    max_rounds: int = typer.Option(BCRYPT_MAX_ROUNDS, help="Highest bcrypt cost to consider")
+):
+    """Benchmark bcrypt on this host and recommend a BCRYPT_ROUNDS value"""
+    rounds, timings = AuthService.calibrate_bcrypt_rounds(target_ms, min_rounds, max_rounds)
+    for cost in sorted(timings):
+        typer.echo(f"cost {cost:>2}: {timings[cost]:8.1f} ms per verify")
+    typer.echo(f"Recommended: BCRYPT_ROUNDS={rounds}")
+
+def run_with_database(coro_factory):
+    """Run an async job with a database connection open"""
+    async def runner():
+        await connect_to_mongo()
+        try:
+            return await coro_factory()
+        finally:
+            await close_mongo_connection()
+    return asyncio.run(runner())
+
+@app.command("migrate")
+def migrate():
+    """Create indexes and apply data migrations"""
+    async def job():
+        await ensure_indexes()
+        await run_migrations()
+    run_with_database(job)
+    typer.echo("Migrations complete")
+
+@app.command("seed")
+def seed(
+    users: int = typer.Option(10000, help="Customer accounts"),
+    products: int = typer.Option(200, help="Menu items"),
+    events: int = typer.Option(100, help="Pop-up events"),
+    orders: int = typer.Option(100000, help="Orders, spread over --days"),
+    days: int = typer.Option(365, help="History the orders and events span"),
+    guest_ratio: float = typer.Option(0.2, help="Share of orders placed without an account"),
+    delivery_ratio: float = typer.Option(0.4, help="Share of delivery orders (the rest are pickup)"),
+    product_skew: float = typer.Option(0.8, help="Zipf exponent of product popularity"),
+    customer_skew: float = typer.Option(0.6, help="Zipf exponent of orders per customer (repeat regulars)"),
+    password: str = typer.Option("password123", help="Password of every seeded account"),
+    batch_size: int = typer.Option(SEED_BATCH_SIZE, help="Documents per insert_many"),
+    seed_value: int = typer.Option(42, "--seed", help="Random seed, for reproducible datasets"),
+    clear: bool = typer.Option(False, "--clear", help="Delete products, events, orders and non-admin users first"),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Do not ask before clearing")
+):
+    """Bulk-generate a synthetic dataset for scale testing"""
+    if clear and not yes:
+        typer.confirm("Delete all products, events, orders and non-admin users?", abort=True)
+    generator = DatasetGenerator(
+        users, products, events, orders,
+        days=days, guest_ratio=guest_ratio, delivery_ratio=delivery_ratio,
+        product_skew=product_skew, customer_skew=customer_skew, password=password, seed=seed_value
+    )
+    started = time.perf_counter()
+
+    def progress(name: str, count: int):
+        typer.echo(f"\r{name}: {count}/{generator.counts[name]}", nl=False)
+        if count >= generator.counts[name]:
+            typer.echo("")
+
+    async def job():
+        if clear:
+            await clear_seeded_collections()
+        await ensure_indexes()
+        return await seed_database(generator, batch_size, progress)
+    inserted = run_with_database(job)
+    elapsed = time.perf_counter() - started
+    total = sum(inserted.values())
+    typer.echo(f"Inserted {total} documents in {elapsed:.1f}s ({total / elapsed:.0f}/s)")
+
+@app.command("serve")
+def serve(
+    host: str = typer.Option("0.0.0.0", help="Interface to listen on"),
+    port: int = typer.Option(8001, help="Port to listen on"),
+    workers: int = typer.Option(0, help="Worker processes [default: WEB_CONCURRENCY, else one per CPU]"),
+    app_path: str = typer.Option("server:app", "--app", help="ASGI app import string"),
+    factory: bool = typer.Option(False, "--factory", help="Treat --app as an app factory"),
+    per_worker_startup: bool = typer.Option(False, "--per-worker-startup", help="Run indexes/migrations/default data in every worker instead of once"),
+    log_level: str = typer.Option("info", help="uvicorn log level")
+):
+    """Run the API in production: N uvicorn workers, graceful reload on SIGHUP"""
+    configure_logging()
+    serve_workers(app_path, host, port, workers or default_workers(), factory, per_worker_startup, log_level)
+
+if __name__ == "__main__":
+    app()
@@ -1,6 +1,8 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from typing import Optional
+from services.metrics import db_command_listener
+from services.tracing import db_tracing_listener
 
 # MongoDB connection
 MONGO_URL = os.environ.get('MONGO_URL')
@@ -12,7 +14,7 @@ database = None
 async def connect_to_mongo():
     """Create database connection"""
     global client, database
-    client = AsyncIOMotorClient(MONGO_URL)
+    client = AsyncIOMotorClient(MONGO_URL, event_listeners=[db_command_listener, db_tracing_listener])
     database = client[DB_NAME]
     print(f"Connected to MongoDB database: {DB_NAME}")
 
@@ -33,5 +35,55 @@ COLLECTIONS = {
     'products': 'products', 
     'orders': 'orders',
     'events': 'events',
-    'settings': 'settings'
+    'settings': 'settings',
+    'refresh_tokens': 'refresh_tokens',
+    'revoked_tokens': 'revoked_tokens',
+    'rate_limits': 'rate_limits',
+    'api_keys': 'api_keys',
+    'api_key_nonces': 'api_key_nonces',
+    'event_registrations': 'event_registrations',
+    'cache_versions': 'cache_versions',
+    'slot_reservations': 'slot_reservations',
+    'email_outbox': 'email_outbox',
+    'migrations': 'migrations'
 }
+
+async def ensure_indexes():
+    """Create indexes required by the application (idempotent)"""
+    db = get_database()
+    
+    # Refresh tokens: lookup by jti, family revocation, TTL cleanup
+    await db[COLLECTIONS['refresh_tokens']].create_index("jti", unique=True)
+    await db[COLLECTIONS['refresh_tokens']].create_index("family_id")
+    await db[COLLECTIONS['refresh_tokens']].create_index("expires_at", expireAfterSeconds=0)
+    
+    # Revoked access tokens: denylist sync by revoked_at, TTL cleanup
+    await db[COLLECTIONS['revoked_tokens']].create_index("jti", unique=True)
+    await db[COLLECTIONS['revoked_tokens']].create_index("revoked_at")
+    await db[COLLECTIONS['revoked_tokens']].create_index("expires_at", expireAfterSeconds=0)
+    
+    # Shared rate limit counters expire after their window has passed
+    await db[COLLECTIONS['rate_limits']].create_index("expires_at", expireAfterSeconds=0)
+    
+    # API keys: lookup by public key id and by admin-facing id
+    await db[COLLECTIONS['api_keys']].create_index("key_id", unique=True)
+    await db[COLLECTIONS['api_keys']].create_index("id", unique=True)
+    
+    # API key nonces: one use per key, dropped once the signed timestamp expires
+    await db[COLLECTIONS['api_key_nonces']].create_index([("key_id", 1), ("nonce", 1)], unique=True)
+    await db[COLLECTIONS['api_key_nonces']].create_index("expires_at", expireAfterSeconds=0)
+    
+    # Event registrations: one document per user and event, waitlist in arrival order
+    await db[COLLECTIONS['event_registrations']].create_index([("event_id", 1), ("user_id", 1)], unique=True)
+    await db[COLLECTIONS['event_registrations']].create_index([("event_id", 1), ("status", 1), ("waitlisted_at", 1)])
+    
+    # Events: status filter + date range/sort, and date-only ranges
+    await db[COLLECTIONS['events']].create_index("id", unique=True)
+    await db[COLLECTIONS['events']].create_index([("status", 1), ("event_date", 1)])
+    await db[COLLECTIONS['events']].create_index("event_date")
+    
+    # Time slot counters are read a day at a time
+    await db[COLLECTIONS['slot_reservations']].create_index("date")
+    
+    # Email outbox: due emails in retry order
+    await db[COLLECTIONS['email_outbox']].create_index([("status", 1), ("next_attempt_at", 1)])
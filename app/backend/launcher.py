@@ -0,0 +1,217 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Workers are spawned, never forked: each one imports the app afresh and opens
+# its own Motor client in the lifespan, so no driver threads or sockets are
+# inherited from the supervisor
+spawn = multiprocessing.get_context("spawn")
+
+WORKER_READY_TIMEOUT = float(os.getenv("WORKER_READY_TIMEOUT", "60"))
+WORKER_GRACEFUL_TIMEOUT = int(os.getenv("WORKER_GRACEFUL_TIMEOUT", "30"))
+# A worker that dies sooner than this after starting is restarted with a delay
+WORKER_MIN_UPTIME = 5.0
+
+def default_workers() -> int:
+    """WEB_CONCURRENCY, else one worker per CPU this process may run on"""
+    if os.getenv("WEB_CONCURRENCY"):
+        return max(1, int(os.environ["WEB_CONCURRENCY"]))
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def event_loop_implementation() -> str:
+    try:
+        import uvloop  # noqa: F401
+        return "uvloop"
+    except ImportError:
+        return "asyncio"
+
+def http_implementation() -> str:
+    try:
+        import httptools  # noqa: F401
+        return "httptools"
+    except ImportError:
+        return "h11"
+
+def run_worker(uvicorn_options: dict, sock: socket.socket, ready):
+    """Worker process entry point: serve on the shared socket until told to stop"""
+    import uvicorn
+    from logging_config import configure_logging
+
+    # Before uvicorn's config, which only sets levels with log_config=None
+    configure_logging()
+
+    class WorkerServer(uvicorn.Server):
+        async def startup(self, sockets=None):
+            await super().startup(sockets)
+            if not self.should_exit:
+                ready.set()
+
+    config = uvicorn.Config(**uvicorn_options)
+    config.configure_logging()
+    WorkerServer(config).run(sockets=[sock])
+
+class Worker:
+    def __init__(self, process, ready):
+        self.process = process
+        self.ready = ready
+        self.started_at = time.monotonic()
+
+class Supervisor:
+    """Pre-binds the listening socket and keeps N uvicorn worker processes on it.
+
+    - SIGHUP: graceful reload. Workers are replaced one at a time; each old
+      worker is stopped only once its replacement has finished startup, and
+      then drains its open connections. New workers load the current code.
+    - SIGTERM/SIGINT: graceful shutdown of every worker.
+    - A worker that exits unexpectedly is restarted.
+    """
+
+    def __init__(self, app: str, host: str, port: int, workers: int, factory: bool = False, log_level: str = "info"):
+        self.workers_count = workers
+        self.host = host
+        self.port = port
+        self.uvicorn_options = {
+            "app": app,
+            "factory": factory,
+            "loop": event_loop_implementation(),
+            "http": http_implementation(),
+            "log_level": log_level,
+            # Keep the queued pipeline from logging_config instead of uvicorn's default handlers
+            "log_config": None,
+            "proxy_headers": True,
+            "timeout_graceful_shutdown": WORKER_GRACEFUL_TIMEOUT,
+        }
+        self.workers: List[Worker] = []
+        self.socket: Optional[socket.socket] = None
+        self.should_exit = threading.Event()
+        self.should_reload = threading.Event()
+
+    def bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def spawn_worker(self) -> Worker:
+        ready = spawn.Event()
+        process = spawn.Process(target=run_worker, args=(self.uvicorn_options, self.socket, ready), name="nanacafe-worker")
+        process.start()
+        logger.info(f"Started worker {process.pid}")
+        return Worker(process, ready)
+
+    def stop_worker(self, worker: Worker):
+        if worker.process.is_alive():
+            worker.process.terminate()
+        worker.process.join(WORKER_GRACEFUL_TIMEOUT + 5)
+        if worker.process.is_alive():
+            logger.warning(f"Worker {worker.process.pid} did not stop in time; killing it")
+            worker.process.kill()
+            worker.process.join()
+
+    def wait_ready(self, worker: Worker) -> bool:
+        deadline = time.monotonic() + WORKER_READY_TIMEOUT
+        while time.monotonic() < deadline and worker.process.is_alive():
+            if worker.ready.wait(0.1):
+                return True
+        return False
+
+    def reload(self):
+        logger.info(f"Reloading {len(self.workers)} workers")
+        for index, old in enumerate(list(self.workers)):
+            if self.should_exit.is_set():
+                return
+            new = self.spawn_worker()
+            if not self.wait_ready(new):
+                logger.error(f"Replacement worker {new.process.pid} failed to start; keeping the current workers")
+                self.stop_worker(new)
+                return
+            self.workers[index] = new
+            self.stop_worker(old)
+        logger.info("Reload complete")
+
+    def restart_dead_workers(self):
+        for index, worker in enumerate(self.workers):
+            if worker.process.is_alive():
+                continue
+            logger.warning(f"Worker {worker.process.pid} exited with code {worker.process.exitcode}; restarting")
+            if time.monotonic() - worker.started_at < WORKER_MIN_UPTIME:
+                # Crashing at startup: do not spin
+                time.sleep(WORKER_MIN_UPTIME)
+            self.workers[index] = self.spawn_worker()
+
+    def handle_signal(self, sig, frame):
+        if sig == signal.SIGHUP:
+            self.should_reload.set()
+        else:
+            self.should_exit.set()
+
+    def run(self):
+        self.socket = self.bind()
+        for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(sig, self.handle_signal)
+
+        logger.info(
+            f"Serving {self.uvicorn_options['app']} on http://{self.host}:{self.port} with {self.workers_count} workers "
+            f"(loop: {self.uvicorn_options['loop']}, http: {self.uvicorn_options['http']}, supervisor pid {os.getpid()})"
+        )
+        self.workers = [self.spawn_worker() for _ in range(self.workers_count)]
+        try:
+            while not self.should_exit.wait(0.5):
+                if self.should_reload.is_set():
+                    self.should_reload.clear()
+                    self.reload()
+                self.restart_dead_workers()
+        finally:
+            logger.info("Stopping workers")
+            for worker in self.workers:
+                if worker.process.is_alive():
+                    worker.process.terminate()
+            for worker in self.workers:
+                self.stop_worker(worker)
+            self.socket.close()
+
+async def run_startup_tasks_once():
+    """Indexes, migrations and default data, before any worker starts"""
+    from database import connect_to_mongo, close_mongo_connection
+    from server import run_startup_tasks
+    await connect_to_mongo()
+    try:
+        await run_startup_tasks()
+    finally:
+        await close_mongo_connection()
+
+def calibrate_bcrypt_once():
+    """With BCRYPT_CALIBRATE, pick the cost here and pin it for every worker.
+
+    Workers calibrating on their own can settle on different costs and keep
+    rehashing passwords back and forth as users log in on one or the other.
+    """
+    if "BCRYPT_ROUNDS" in os.environ or os.getenv("BCRYPT_CALIBRATE", "false").lower() != "true":
+        return
+    from services.auth_service import AuthService
+    rounds, timings = AuthService.calibrate_bcrypt_rounds()
+    logger.info(f"Calibrated bcrypt cost to {rounds} rounds ({timings[rounds]:.0f} ms per verify)")
+    # Inherited by the spawned workers, which then skip their own calibration
+    os.environ["BCRYPT_ROUNDS"] = str(rounds)
+
+def serve(app: str, host: str, port: int, workers: int, factory: bool = False, per_worker_startup: bool = False, log_level: str = "info"):
+    calibrate_bcrypt_once()
+    if not per_worker_startup:
+        asyncio.run(run_startup_tasks_once())
+        # Inherited by the spawned workers
+        os.environ["RUN_STARTUP_TASKS"] = "false"
+    Supervisor(app, host, port, workers, factory, log_level).run()
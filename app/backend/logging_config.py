@@ -0,0 +1,173 @@
+import atexit
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import orjson
+from services.metrics import log_records_dropped
+from services.tracing import current_span
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# json (one object per line) or text (the old human-readable format)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Records waiting for the writer thread; beyond this they are dropped rather than blocking the caller
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Share of INFO/DEBUG records kept, overall and per logger ("uvicorn.access=0.1,services.cache_service=0.5")
+LOG_INFO_SAMPLE_RATE = float(os.getenv("LOG_INFO_SAMPLE_RATE", "1.0"))
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+# Token bucket per logger for INFO and below: sustained records per second and burst size
+LOG_RATE_LIMIT_PER_SECOND = float(os.getenv("LOG_RATE_LIMIT_PER_SECOND", "50"))
+LOG_RATE_LIMIT_BURST = float(os.getenv("LOG_RATE_LIMIT_BURST", "200"))
+# Exception strings from drivers can run to pages
+LOG_MAX_MESSAGE_LENGTH = int(os.getenv("LOG_MAX_MESSAGE_LENGTH", "2000"))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Sent through the root handler instead of uvicorn's own stderr handlers
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    rates = {}
+    for part in value.split(","):
+        name, _, rate = part.partition("=")
+        if name.strip() and rate:
+            rates[name.strip()] = float(rate)
+    return rates
+
+class LogThrottle(logging.Filter):
+    """Samples INFO and below, then rate-limits them with a token bucket per logger.
+
+    Warnings and errors are never dropped here, so an error storm cannot hide
+    its own errors; only the bounded queue can shed them. Runs in the
+    emitting thread before a record is formatted or queued, so dropped
+    records cost almost nothing. The next record a logger gets through
+    carries the number of its records dropped since, so gaps stay visible.
+    """
+
+    def __init__(self, info_sample_rate: float = LOG_INFO_SAMPLE_RATE, sample_rates: Optional[Dict[str, float]] = None,
+                 rate: float = LOG_RATE_LIMIT_PER_SECOND, burst: float = LOG_RATE_LIMIT_BURST):
+        super().__init__()
+        self.info_sample_rate = info_sample_rate
+        self.sample_rates = sample_rates if sample_rates is not None else parse_sample_rates(LOG_SAMPLE_RATES)
+        self.rate = rate
+        self.burst = burst
+        # logger name -> [tokens, last refill, dropped since last record]
+        self._buckets: Dict[str, list] = {}
+        # Records come from the event loop, driver and executor threads
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        sample_rate = self.sample_rates.get(record.name, self.info_sample_rate)
+        if sample_rate < 1.0 and random.random() >= sample_rate:
+            log_records_dropped.inc("sampled")
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(record.name)
+            if bucket is None:
+                bucket = self._buckets[record.name] = [self.burst, now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                log_records_dropped.inc("rate_limited")
+                return False
+            bucket[0] -= 1
+            dropped, bucket[2] = bucket[2], 0
+        if dropped:
+            record.dropped = dropped
+        return True
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that renders the message in the caller and never blocks on a full queue"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self._exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Arguments and tracebacks can change after this call returns; render them now
+        record = copy.copy(record)
+        message = record.getMessage()
+        if len(message) > LOG_MAX_MESSAGE_LENGTH:
+            message = f"{message[:LOG_MAX_MESSAGE_LENGTH]}... [{len(message) - LOG_MAX_MESSAGE_LENGTH} characters truncated]"
+        record.msg = record.message = message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        span = current_span.get()
+        record.trace_id = span.trace_id if span is not None else None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc("queue_full")
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            entry["trace_id"] = trace_id
+        dropped = getattr(record, "dropped", None)
+        if dropped:
+            entry["dropped_before"] = dropped
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry).decode("utf-8")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def configure_logging():
+    """Route all logging through a bounded queue to a writer thread (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JSONFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(LogThrottle())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Registered after logging's own exit hook, so it runs first and drains the queue
+    atexit.register(stop_logging)
+
+def stop_logging():
+    """Write out everything still queued and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
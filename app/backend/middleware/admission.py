@@ -0,0 +1,167 @@
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+from middleware.maintenance import is_admin_request
+from services.metrics import metrics, admission_in_flight, admission_queue_depth, admission_queue_wait, admission_rejected
+
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+
+# Per worker: (in-flight cap, queue length, queue timeout in seconds). Override
+# with ADMISSION_<CLASS>_CONCURRENCY / _QUEUE / _TIMEOUT.
+DEFAULT_LIMITS = {
+    "catalog": (64, 256, 2.0),   # menu, events, settings: cached reads
+    "checkout": (32, 64, 5.0),   # orders and POS: Mongo writes, Stripe, SMTP
+    "admin": (16, 32, 10.0),     # staff tools, kept apart so a customer spike cannot lock them out
+    "auth": (8, 32, 3.0),        # bcrypt-bound login and registration
+}
+
+# Never queued or shed, so health checks and scrapes see the overload
+EXEMPT_PREFIXES = (
+    "/api/health",
+    "/api/metrics",
+)
+
+def _limit(route_class: str, setting: str, default):
+    return type(default)(os.getenv(f"ADMISSION_{route_class.upper()}_{setting}", default))
+
+async def classify(scope) -> Optional[str]:
+    """Route class of a request, from its path and token, before routing; None if exempt"""
+    path = scope["path"]
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+    if path.startswith("/api/auth/"):
+        return "auth"
+    if await is_admin_request(scope):
+        return "admin"
+    if path.startswith(("/api/orders", "/api/pos/")):
+        return "checkout"
+    return "catalog"
+
+class AdmissionLimiter:
+    """In-flight cap with a bounded FIFO queue in front of it.
+
+    A full queue rejects at once; a queued request that does not get a slot
+    within ``timeout`` is rejected too. Released slots pass straight to the
+    oldest waiter. Only touched from the event loop thread.
+    """
+
+    def __init__(self, route_class: str, concurrency: int, max_queue: int, timeout: float):
+        self.route_class = route_class
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[str]:
+        """None once admitted, else the reason for shedding the request"""
+        if self.in_flight < self.concurrency and not self._waiters:
+            self.in_flight += 1
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait((waiter,), timeout=self.timeout)
+        except BaseException:
+            # Cancelled while queued (client went away); give back a slot handed over meanwhile
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._abandon(waiter)
+            raise
+        admission_queue_wait.observe(time.perf_counter() - start, self.route_class)
+        if waiter.done():
+            return None
+        self._abandon(waiter)
+        return "timeout"
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot moves to the waiter; in_flight is unchanged
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _abandon(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        waiter.cancel()
+
+limiters: Dict[str, AdmissionLimiter] = {
+    route_class: AdmissionLimiter(
+        route_class,
+        _limit(route_class, "CONCURRENCY", concurrency),
+        _limit(route_class, "QUEUE", max_queue),
+        _limit(route_class, "TIMEOUT", timeout)
+    )
+    for route_class, (concurrency, max_queue, timeout) in DEFAULT_LIMITS.items()
+}
+
+def _collect_admission_stats():
+    for route_class, limiter in limiters.items():
+        admission_in_flight.set(limiter.in_flight, route_class)
+        admission_queue_depth.set(limiter.queued, route_class)
+
+metrics.add_collector(_collect_admission_stats)
+
+BUSY_BODY = json.dumps({"detail": "Server is busy, please try again shortly"}).encode("utf-8")
+
+class AdmissionMiddleware:
+    """Caps concurrent requests per route class and sheds the excess with 503.
+
+    Requests are classed as catalog, checkout, admin or auth before routing.
+    Each class has its own in-flight cap and short queue, so a burst of
+    checkouts waiting on Stripe cannot starve menu reads or staff tools, and
+    a saturated class answers at once with ``Retry-After`` instead of
+    piling up requests until Mongo or SMTP time out.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION_CONTROL_ENABLED:
+            return await self.app(scope, receive, send)
+
+        route_class = await classify(scope)
+        if route_class is None:
+            return await self.app(scope, receive, send)
+
+        limiter = limiters[route_class]
+        reason = await limiter.acquire()
+        if reason is not None:
+            admission_rejected.inc(route_class, reason)
+            return await self._reject(send, limiter)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    @staticmethod
+    async def _reject(send, limiter: AdmissionLimiter):
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(BUSY_BODY)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(limiter.timeout))).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": BUSY_BODY})
@@ -0,0 +1,190 @@
+import os
+import zlib
+from typing import Dict, Optional
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+# Smaller bodies are sent as-is; compressing them costs more than it saves
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Per-request compression favours speed; precompressed bodies are done once, so go higher
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+PRECOMPRESSED_GZIP_LEVEL = 9
+PRECOMPRESSED_BROTLI_QUALITY = 9
+
+COMPRESSIBLE_TYPES = ("application/json", "application/javascript", "application/xml", "text/")
+# Statuses without a body worth compressing
+UNCOMPRESSED_STATUSES = frozenset({204, 206, 304})
+
+def supported_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best supported encoding for an Accept-Encoding header, preferring br on ties"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress(body: bytes, encoding: str, precompressed: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=PRECOMPRESSED_BROTLI_QUALITY if precompressed else BROTLI_QUALITY)
+    compressor = zlib.compressobj(PRECOMPRESSED_GZIP_LEVEL if precompressed else GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+def is_compressible(status: int, headers: Headers) -> bool:
+    if status < 200 or status in UNCOMPRESSED_STATUSES:
+        return False
+    if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+def mark_encoded(headers: MutableHeaders, encoding: str):
+    headers["Content-Encoding"] = encoding
+    headers.add_vary_header("Accept-Encoding")
+    # The compressed representation is not byte-identical, so a strong validator must not carry over
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+class StreamCompressor:
+    """Incremental compressor that flushes each chunk so streamed data is not held back"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(chunk) + self._brotli.flush()
+        return self._zlib.compress(chunk) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, chunk: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(chunk) + self._brotli.finish()
+        return self._zlib.compress(chunk) + self._zlib.flush(zlib.Z_FINISH)
+
+class PrecompressedBody:
+    """A cached response body with its compressed variants, each built once on first use"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._variants: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        variant = self._variants.get(encoding)
+        if variant is None:
+            variant = self._variants[encoding] = compress(self.body, encoding, precompressed=True)
+        return variant
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli compression of response bodies.
+
+    Bodies below COMPRESSION_MIN_SIZE, non-text content types and responses
+    that are already encoded (e.g. a ``PrecompressedResponse``) pass through.
+    A response sent in several chunks is compressed as a stream, flushing
+    after every chunk, and loses its Content-Length.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            return await self.app(scope, receive, send)
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        await _CompressingResponder(self.app, encoding)(scope, receive, send)
+
+class _CompressingResponder:
+    def __init__(self, app, encoding: str):
+        self.app = app
+        self.encoding = encoding
+        self.send = None
+        self.start_message = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Held back until the first body chunk shows whether compression pays off
+            self.start_message = message
+            return
+
+        if message_type != "http.response.body":
+            if self.start_message is not None:
+                self.passthrough = True
+                await self.send(self.start_message)
+                self.start_message = None
+            return await self.send(message)
+
+        if self.start_message is not None:
+            await self._send_first_chunk(message)
+        elif self.passthrough:
+            await self.send(message)
+        else:
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                await self.send({"type": "http.response.body", "body": self.compressor.compress(body), "more_body": True})
+            else:
+                await self.send({"type": "http.response.body", "body": self.compressor.finish(body)})
+
+    async def _send_first_chunk(self, message):
+        start, self.start_message = self.start_message, None
+        headers = MutableHeaders(scope=start)
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not is_compressible(start["status"], headers) or (not more_body and len(body) < COMPRESSION_MIN_SIZE):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        mark_encoded(headers, self.encoding)
+        if not more_body:
+            compressed = compress(body, self.encoding)
+            headers["Content-Length"] = str(len(compressed))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        del headers["Content-Length"]
+        self.compressor = StreamCompressor(self.encoding)
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": self.compressor.compress(body), "more_body": True})
@@ -0,0 +1,106 @@
+import json
+import os
+from typing import Iterable, Tuple
+from services.auth_service import AuthService
+from services.revocation_service import revocation_list
+from services.settings_service import SettingsService
+
+# Block reads as well as writes for non-admin callers while in maintenance mode
+MAINTENANCE_BLOCK_ALL = os.getenv("MAINTENANCE_BLOCK_ALL", "false").lower() == "true"
+MAINTENANCE_RETRY_AFTER = os.getenv("MAINTENANCE_RETRY_AFTER", "300")
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Always reachable, so admins can sign in and switch maintenance off again
+# (only the sign-in routes of /api/auth: registration is a write like any other)
+EXEMPT_PREFIXES = (
+    "/api/health",
+    "/api/metrics",
+    "/api/auth/login",
+    "/api/auth/admin-login",
+    "/api/auth/refresh",
+    "/api/settings",
+)
+
+# Writes that create new orders, blocked while is_accepting_orders is off
+ORDER_INTAKE_ROUTES = (
+    ("POST", "/api/orders"),
+    ("POST", "/api/pos/orders"),
+)
+
+def _json_body(detail: str) -> bytes:
+    return json.dumps({"detail": detail}).encode("utf-8")
+
+MAINTENANCE_BODY = _json_body("Service is under maintenance, please try again later")
+NOT_ACCEPTING_BODY = _json_body("We are not accepting orders right now")
+
+class MaintenanceMiddleware:
+    """Rejects requests with 503 from the in-memory settings snapshot.
+
+    Runs before routing, body parsing and any database work, so flipping
+    ``maintenance_mode`` or ``is_accepting_orders`` sheds load immediately.
+    Admin callers (by the role claim of an unrevoked access token) are let through
+    maintenance mode; order intake stays closed for everyone, as in create_order.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        settings = SettingsService.snapshot
+        if settings is None or (not settings.maintenance_mode and settings.is_accepting_orders):
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        path = scope["path"]
+
+        if settings.maintenance_mode and not path.startswith(EXEMPT_PREFIXES):
+            if (MAINTENANCE_BLOCK_ALL or method not in SAFE_METHODS) and not await self._is_admin(scope):
+                return await self._reject(send, MAINTENANCE_BODY)
+
+        if not settings.is_accepting_orders and self._is_order_intake(method, path):
+            return await self._reject(send, NOT_ACCEPTING_BODY)
+
+        return await self.app(scope, receive, send)
+
+    @staticmethod
+    def _is_order_intake(method: str, path: str) -> bool:
+        path = path.rstrip("/")
+        return any(method == route_method and path == route_path for route_method, route_path in ORDER_INTAKE_ROUTES)
+
+    @staticmethod
+    async def _is_admin(scope) -> bool:
+        return await is_admin_request(scope)
+
+    @staticmethod
+    async def _reject(send, body: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", MAINTENANCE_RETRY_AFTER.encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+async def is_admin_request(scope) -> bool:
+    """Whether the request carries an unrevoked admin access token (role claim only; routes still authorize)"""
+    authorization = _header(scope["headers"], b"authorization")
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return False
+    payload = AuthService.verify_token(authorization[7:].strip())
+    if not payload or payload.get("type", "access") != "access" or payload.get("role") != "admin":
+        return False
+    # A bloom filter probe unless the token is actually on the denylist
+    return not await revocation_list.is_token_revoked(payload)
+
+def _header(headers: Iterable[Tuple[bytes, bytes]], name: bytes):
+    for key, value in headers:
+        if key == name:
+            return value.decode("latin-1")
+    return None
@@ -0,0 +1,58 @@
+import time
+from typing import Dict
+from services.metrics import http_requests_total, http_request_duration, http_requests_in_flight
+
+# Requests that matched no route share one label, so scanners cannot blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+_route_paths: Dict[object, str] = {}
+
+def route_template(scope) -> str:
+    """Path template of the route that handled a request (after routing has run)"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+    path = _route_paths.get(endpoint)
+    if path is None:
+        path = UNMATCHED_ROUTE
+        for route in scope["app"].routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                path = route.path
+                break
+        _route_paths[endpoint] = path
+    return path
+
+class MetricsMiddleware:
+    """Records request count, latency and in-flight requests per route.
+
+    Routes are labelled by their path template (``/api/orders/{order_id}``),
+    looked up from the endpoint the router resolved, so ids never end up in
+    label values.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = route_template(scope)
+            method = scope["method"]
+            http_request_duration.observe(time.perf_counter() - start, method, route)
+            http_requests_total.inc(method, route, str(status_code))
+
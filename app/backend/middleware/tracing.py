@@ -0,0 +1,49 @@
+import re
+from typing import Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from middleware.metrics import route_template
+from services.tracing import tracer
+
+TRACE_ID_HEADER = "X-Trace-Id"
+# W3C trace context: version-traceid-parentid-flags
+TRACEPARENT_PATTERN = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+def parse_traceparent(value: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    match = TRACEPARENT_PATTERN.match(value.strip().lower()) if value else None
+    if not match or match.group(1) == "0" * 32:
+        return None, None
+    return match.group(1), match.group(2)
+
+class TracingMiddleware:
+    """Opens the root span of each request and echoes its trace id.
+
+    An incoming ``traceparent`` header continues the caller's trace. The
+    span is renamed to the route template once routing has run, and the
+    trace id is returned in ``X-Trace-Id``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        trace_id, parent_id = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        method = scope["method"]
+        attributes = {"http.method": method, "http.target": scope["path"]}
+
+        with tracer.start_trace(f"{method} {scope['path']}", trace_id, parent_id, attributes) as root:
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("http.status_code", message["status"])
+                    headers = MutableHeaders(scope=message)
+                    headers[TRACE_ID_HEADER] = root.trace_id
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = route_template(scope)
+                root.name = f"{method} {route}"
+                root.set_attribute("http.route", route)
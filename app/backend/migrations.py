@@ -0,0 +1,62 @@
+from datetime import datetime
+from pymongo import UpdateOne
+from database import get_database, COLLECTIONS
+from models.common import to_day_datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_BATCH_SIZE = 500
+
+async def migrate_event_dates() -> int:
+    """Convert event_date values stored as strings, or datetimes with a time of day, to midnight UTC datetimes"""
+    db = get_database()
+    events = db[COLLECTIONS['events']]
+    
+    cursor = events.find(
+        {"$or": [{"event_date": {"$type": "string"}}, {"event_date": {"$type": "date"}}]},
+        {"event_date": 1}
+    )
+    
+    migrated = 0
+    batch = []
+    async for event in cursor:
+        normalized = to_day_datetime(event["event_date"])
+        if normalized == event["event_date"]:
+            continue
+        batch.append(UpdateOne({"_id": event["_id"]}, {"$set": {"event_date": normalized}}))
+        if len(batch) >= MIGRATION_BATCH_SIZE:
+            migrated += (await events.bulk_write(batch, ordered=False)).modified_count
+            batch = []
+    if batch:
+        migrated += (await events.bulk_write(batch, ordered=False)).modified_count
+    
+    if migrated:
+        logger.info(f"Migrated {migrated} event dates to UTC datetimes")
+    return migrated
+
+# Applied in order; append new migrations, never reorder or remove them
+MIGRATIONS = [
+    migrate_event_dates,
+]
+
+# Index into MIGRATIONS of the next migration to apply
+VERSION_ID = "version"
+
+async def run_migrations():
+    """Apply the migrations newer than the recorded version (idempotent)"""
+    db = get_database()
+    record = await db[COLLECTIONS['migrations']].find_one({"_id": VERSION_ID})
+    version = record["version"] if record else 0
+    if version >= len(MIGRATIONS):
+        return
+    
+    for index, migration in enumerate(MIGRATIONS[version:], start=version):
+        await migration()
+        # $max: a worker finishing late never moves the version back
+        await db[COLLECTIONS['migrations']].update_one(
+            {"_id": VERSION_ID},
+            {"$max": {"version": index + 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        logger.info(f"Applied migration {index + 1}: {migration.__name__}")
@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+from enum import Enum
+import uuid
+import secrets
+
+class ApiKeyScope(str, Enum):
+    ORDERS_CREATE = "orders:create"
+    ORDERS_READ = "orders:read"
+    ORDERS_STATUS = "orders:status"
+
+class ApiKeyBase(BaseModel):
+    name: str  # e.g. "Front counter kiosk"
+    scopes: List[ApiKeyScope] = []
+    is_active: bool = True
+    created_by: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
+    last_used_at: Optional[datetime] = None
+
+class ApiKeyCreate(BaseModel):
+    name: str
+    scopes: List[ApiKeyScope]
+
+class ApiKeyUpdate(BaseModel):
+    name: Optional[str] = None
+    scopes: Optional[List[ApiKeyScope]] = None
+    is_active: Optional[bool] = None
+
+class ApiKey(ApiKeyBase):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    key_id: str = Field(default_factory=lambda: f"nck_{secrets.token_hex(12)}")
+
+class ApiKeyResponse(ApiKey):
+    pass
+
+class ApiKeyCreated(ApiKeyResponse):
+    secret: str  # Only returned once, at creation
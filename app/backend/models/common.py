@@ -0,0 +1,30 @@
+from pydantic import BeforeValidator, PlainSerializer
+from typing import Any
+from typing_extensions import Annotated
+from datetime import datetime, date, time, timezone
+
+def to_day_datetime(value: Any) -> Any:
+    """Normalize a calendar date to its day at 00:00 UTC (naive, like the rest of the models).
+    
+    BSON has no date-only type, so dates are stored as datetimes, which keeps
+    them indexable and comparable in range queries. Accepts any ISO 8601
+    string; values with an offset are converted to UTC first, then the time
+    of day is dropped. In JSON the value is the plain "YYYY-MM-DD" date again,
+    as API clients have always received it.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return datetime.combine(value.date(), time.min)
+    if isinstance(value, date):
+        return datetime.combine(value, time.min)
+    return value
+
+# A calendar date stored as a midnight datetime, serialized to JSON as a date
+DayDatetime = Annotated[
+    datetime,
+    BeforeValidator(to_day_datetime),
+    PlainSerializer(lambda value: value.date(), return_type=date, when_used="json")
+]
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
 from typing import Optional
-from datetime import datetime, date
+from datetime import datetime
 from enum import Enum
+from models.common import DayDatetime
 import uuid
 
 class EventStatus(str, Enum):
@@ -13,13 +14,14 @@ class EventStatus(str, Enum):
 class EventBase(BaseModel):
     title: str
     description: Optional[str] = None
-    event_date: date
+    event_date: DayDatetime
     start_time: Optional[str] = None
     end_time: Optional[str] = None
     location: Optional[str] = None
     image_url: Optional[str] = None
     max_capacity: Optional[int] = None
     current_registrations: int = 0
+    waitlist_count: int = 0
     is_featured: bool = False
     status: EventStatus = EventStatus.UPCOMING
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -28,7 +30,7 @@ class EventBase(BaseModel):
 class EventCreate(BaseModel):
     title: str
     description: Optional[str] = None
-    event_date: date
+    event_date: DayDatetime
     start_time: Optional[str] = None
     end_time: Optional[str] = None
     location: Optional[str] = None
@@ -39,13 +41,12 @@ class EventCreate(BaseModel):
 class EventUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
-    event_date: Optional[date] = None
+    event_date: Optional[DayDatetime] = None
     start_time: Optional[str] = None
     end_time: Optional[str] = None
     location: Optional[str] = None
     image_url: Optional[str] = None
     max_capacity: Optional[int] = None
-    current_registrations: Optional[int] = None
     is_featured: Optional[bool] = None
     status: Optional[EventStatus] = None
 
@@ -54,3 +55,23 @@ class Event(EventBase):
 
 class EventResponse(Event):
     pass
+
+class RegistrationStatus(str, Enum):
+    PENDING = "pending"  # Claimed, seat not yet decided
+    REGISTERED = "registered"
+    WAITLISTED = "waitlisted"
+    CANCELLED = "cancelled"
+
+class EventRegistrationBase(BaseModel):
+    event_id: str
+    user_id: str
+    status: RegistrationStatus = RegistrationStatus.PENDING
+    waitlisted_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
+
+class EventRegistration(EventRegistrationBase):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+
+class EventRegistrationResponse(EventRegistration):
+    waitlist_position: Optional[int] = None
@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime, date, time
 from enum import Enum
+from models.common import DayDatetime
 import uuid
 
 class OrderType(str, Enum):
@@ -40,14 +41,14 @@ class DeliveryInfo(BaseModel):
     full_name: str
     contact_number: str
     delivery_address: str
-    delivery_date: date
+    delivery_date: DayDatetime
     delivery_time_slot: str
     special_instructions: Optional[str] = None
 
 class PickupInfo(BaseModel):
     full_name: str
     contact_number: str
-    pickup_date: date
+    pickup_date: DayDatetime
     pickup_time_slot: str
     special_instructions: Optional[str] = None
 
@@ -65,6 +66,7 @@ class OrderBase(BaseModel):
     payment_intent_id: Optional[str] = None  # Stripe payment intent ID
     delivery_info: Optional[DeliveryInfo] = None
     pickup_info: Optional[PickupInfo] = None
+    time_slot_key: Optional[str] = None  # Reserved kitchen capacity, released on cancellation
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
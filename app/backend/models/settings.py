@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 import uuid
 
@@ -26,6 +26,7 @@ class CafeSettingsBase(BaseModel):
     min_order_amount: float = 100.0
     max_delivery_distance: Optional[float] = None  # in kilometers
     business_hours: List[BusinessHours] = []
+    timezone: str = "Asia/Manila"  # IANA zone business hours and time slots are expressed in
     delivery_zones: List[DeliveryZone] = []
     available_time_slots: List[str] = [
         "9:00 AM - 10:00 AM",
@@ -38,6 +39,8 @@ class CafeSettingsBase(BaseModel):
         "4:00 PM - 5:00 PM",
         "5:00 PM - 6:00 PM"
     ]
+    time_slot_capacity: int = 20  # Orders per slot per day (delivery and pickup combined)
+    time_slot_capacities: Dict[str, int] = {}  # Per-slot overrides
     is_accepting_orders: bool = True
     maintenance_mode: bool = False
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -53,8 +56,11 @@ class CafeSettingsUpdate(BaseModel):
     min_order_amount: Optional[float] = None
     max_delivery_distance: Optional[float] = None
     business_hours: Optional[List[BusinessHours]] = None
+    timezone: Optional[str] = None
     delivery_zones: Optional[List[DeliveryZone]] = None
     available_time_slots: Optional[List[str]] = None
+    time_slot_capacity: Optional[int] = None
+    time_slot_capacities: Optional[Dict[str, int]] = None
     is_accepting_orders: Optional[bool] = None
     maintenance_mode: Optional[bool] = None
 
@@ -31,6 +31,9 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
 class UserResponse(UserBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     
@@ -0,0 +1,110 @@
+import orjson
+from datetime import timedelta
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, List, Type
+from bson import ObjectId, Decimal128
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+from starlette.datastructures import Headers, MutableHeaders
+from middleware.compression import COMPRESSION_MIN_SIZE, PrecompressedBody, negotiate_encoding, mark_encoded
+
+# datetime, date, time, UUID, enums and dataclasses are serialized natively by orjson
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _encode_decimal(value: Decimal):
+    return int(value) if value == value.to_integral_value() else float(value)
+
+# Same conversions as FastAPI's jsonable_encoder for the types orjson leaves to us
+ENCODERS = {
+    ObjectId: str,
+    Decimal128: lambda value: _encode_decimal(value.to_decimal()),
+    Decimal: _encode_decimal,
+    timedelta: lambda value: value.total_seconds(),
+    set: list,
+    frozenset: list,
+    bytes: lambda value: value.decode(),
+}
+
+def orjson_default(value: Any) -> Any:
+    """Fallback encoder for types orjson does not handle itself"""
+    encoder = ENCODERS.get(type(value))
+    if encoder is not None:
+        return encoder(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    for base, encoder in ENCODERS.items():
+        if isinstance(value, base):
+            return encoder(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=orjson_default, option=ORJSON_OPTIONS)
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, used as the app's default response class.
+
+    FastAPI has already turned ``response_model`` results into plain data by
+    the time ``render`` runs, so this only replaces the final ``json.dumps``;
+    routes returning raw Mongo documents still get ObjectId/Decimal128 handled.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class ModelJSONResponse(Response):
+    """JSON body already serialized by pydantic-core"""
+    media_type = "application/json"
+
+class PrecompressedResponse(Response):
+    """Response for a cached body that serves its stored compressed variant.
+
+    The variant is picked per request from Accept-Encoding and built only
+    once per cached body, so hot cached endpoints never recompress.
+    """
+
+    def __init__(self, payload: PrecompressedBody, status_code: int = 200, headers=None, media_type: str = "application/json"):
+        self.payload = payload
+        super().__init__(content=payload.body, status_code=status_code, headers=headers, media_type=media_type)
+
+    async def __call__(self, scope, receive, send):
+        encoding = None
+        if len(self.payload.body) >= COMPRESSION_MIN_SIZE:
+            encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            return await super().__call__(scope, receive, send)
+
+        body = self.payload.encoded(encoding)
+        headers = MutableHeaders(raw=list(self.raw_headers))
+        mark_encoded(headers, encoding)
+        headers["Content-Length"] = str(len(body))
+        await send({"type": "http.response.start", "status": self.status_code, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+def validate_documents(model: Type[BaseModel], documents: List[dict]) -> List[BaseModel]:
+    """Validate a batch of documents from our own database in one pass"""
+    return list_adapter(model).validate_python(documents)
+
+def documents_response(model: Type[BaseModel], documents) -> ModelJSONResponse:
+    """Validate trusted DB document(s) once and serialize them as ``model``.
+
+    Returning a Response makes FastAPI skip its own response_model pass
+    (dump, re-validate, serialize); routes keep response_model for the
+    OpenAPI schema only.
+    """
+    if isinstance(documents, list):
+        adapter = list_adapter(model)
+        return ModelJSONResponse(adapter.dump_json(adapter.validate_python(documents)))
+    return ModelJSONResponse(model.model_validate(documents).model_dump_json())
+
+def model_response(instances) -> ModelJSONResponse:
+    """Serialize already validated model(s) whose fields match the route's response_model"""
+    if isinstance(instances, list):
+        if not instances:
+            return ModelJSONResponse(b"[]")
+        return ModelJSONResponse(list_adapter(type(instances[0])).dump_json(instances))
+    return ModelJSONResponse(instances.model_dump_json())
@@ -0,0 +1,128 @@
+from fastapi import APIRouter, HTTPException, Depends, status
+from typing import List
+from models.api_key import ApiKey, ApiKeyCreate, ApiKeyUpdate, ApiKeyResponse, ApiKeyCreated
+from models.user import User
+from routes.auth import get_admin_user
+from services.api_key_service import api_key_service, ApiKeyService, API_KEYS_ENABLED
+from database import get_database, COLLECTIONS
+from responses import documents_response, model_response
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api-keys", tags=["API Keys"])
+
+@router.get("/", response_model=List[ApiKeyResponse])
+async def get_api_keys(admin_user: User = Depends(get_admin_user)):
+    """List API keys (Admin only)"""
+    try:
+        db = get_database()
+        cursor = db[COLLECTIONS['api_keys']].find({}).sort("created_at", -1)
+        api_keys = await cursor.to_list(length=None)
+
+        return documents_response(ApiKeyResponse, api_keys)
+
+    except Exception as e:
+        logger.error(f"Error fetching API keys: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch API keys"
+        )
+
+@router.post("/", response_model=ApiKeyCreated)
+async def create_api_key(
+    api_key_data: ApiKeyCreate,
+    admin_user: User = Depends(get_admin_user)
+):
+    """Create API key (Admin only). The signing secret is only shown in this response."""
+    try:
+        if not API_KEYS_ENABLED:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="API keys are not configured (set API_KEY_MASTER_SECRET)"
+            )
+        db = get_database()
+
+        api_key = ApiKey(**api_key_data.dict(), created_by=admin_user.id)
+        await db[COLLECTIONS['api_keys']].insert_one(api_key.dict())
+        api_key_service.put(api_key)
+
+        return ApiKeyCreated(
+            **api_key.dict(),
+            secret=ApiKeyService.derive_secret(api_key.key_id)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating API key: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create API key"
+        )
+
+@router.put("/{api_key_id}", response_model=ApiKeyResponse)
+async def update_api_key(
+    api_key_id: str,
+    api_key_data: ApiKeyUpdate,
+    admin_user: User = Depends(get_admin_user)
+):
+    """Update API key name, scopes or active flag (Admin only)"""
+    try:
+        db = get_database()
+
+        update_data = api_key_data.dict(exclude_unset=True)
+        update_data["updated_at"] = datetime.utcnow()
+
+        result = await db[COLLECTIONS['api_keys']].update_one(
+            {"id": api_key_id},
+            {"$set": update_data}
+        )
+        if result.matched_count == 0:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="API key not found"
+            )
+
+        updated_api_key = ApiKey(**await db[COLLECTIONS['api_keys']].find_one({"id": api_key_id}))
+        api_key_service.put(updated_api_key)
+
+        return model_response(updated_api_key)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating API key {api_key_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update API key"
+        )
+
+@router.delete("/{api_key_id}")
+async def delete_api_key(
+    api_key_id: str,
+    admin_user: User = Depends(get_admin_user)
+):
+    """Revoke and delete API key (Admin only)"""
+    try:
+        db = get_database()
+
+        api_key = await db[COLLECTIONS['api_keys']].find_one_and_delete({"id": api_key_id})
+        if not api_key:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="API key not found"
+            )
+
+        api_key_service.remove(api_key["key_id"])
+
+        return {"message": "API key deleted successfully"}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error deleting API key {api_key_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to delete API key"
+        )
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from models.user import User, UserCreate, UserLogin, UserResponse, UserRole
-from services.auth_service import AuthService
+from models.user import User, UserCreate, UserLogin, UserResponse, UserRole, TokenRefresh
+from services.auth_service import AuthService, ACCESS_TOKEN_EXPIRE_MINUTES
+from services.revocation_service import revocation_list
+from services.rate_limit_service import login_ip_limiter, login_email_limiter, register_ip_limiter
 from database import get_database, COLLECTIONS
+from datetime import datetime, timedelta
 from typing import Optional
 import logging
 
@@ -22,12 +25,18 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             )
         
         user_id = payload.get("sub")
-        if user_id is None:
+        if user_id is None or payload.get("type", "access") != "access":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials"
             )
         
+        if await revocation_list.is_token_revoked(payload):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+        
         db = get_database()
         user_data = await db[COLLECTIONS['users']].find_one({"id": user_id})
         if user_data is None:
@@ -53,7 +62,45 @@ async def get_admin_user(current_user: User = Depends(get_current_user)) -> User
         )
     return current_user
 
-@router.post("/register", response_model=UserResponse)
+async def issue_tokens(user_id: str, role: UserRole, family_id: Optional[str] = None) -> dict:
+    """Create an access token and a persisted refresh token for a user"""
+    db = get_database()
+    
+    refresh_token, claims = AuthService.create_refresh_token(user_id, family_id)
+    # The role claim is only a hint for middleware (e.g. maintenance bypass); routes still load the user.
+    # fam ties the access token to its refresh family, so revoking the family also revokes it.
+    access_token = AuthService.create_access_token(data={"sub": user_id, "role": role, "fam": claims["fam"]})
+    
+    await db[COLLECTIONS['refresh_tokens']].insert_one({
+        "jti": claims["jti"],
+        "family_id": claims["fam"],
+        "user_id": user_id,
+        "used": False,
+        "created_at": datetime.utcnow(),
+        "expires_at": claims["exp"]
+    })
+    
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    }
+
+async def revoke_token_family(family_id: str, reason: Optional[str] = None):
+    """Revoke every refresh token issued in a rotation family, and the access tokens issued with them"""
+    db = get_database()
+    await db[COLLECTIONS['refresh_tokens']].update_many(
+        {"family_id": family_id},
+        {"$set": {"used": True}}
+    )
+    # Access tokens issued from the family stay valid until they expire; deny them until then
+    await revocation_list.revoke_family(
+        family_id,
+        datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+        reason=reason
+    )
+
+@router.post("/register", response_model=UserResponse, dependencies=[Depends(register_ip_limiter)])
 async def register(user_data: UserCreate):
     """Register new user"""
     try:
@@ -94,10 +141,12 @@ async def register(user_data: UserCreate):
             detail="Failed to register user"
         )
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(login_ip_limiter)])
 async def login(login_data: UserLogin):
     """Login user"""
     try:
+        await login_email_limiter.check(login_data.email.lower())
+        
         db = get_database()
         
         # Find user by email
@@ -124,12 +173,21 @@ async def login(login_data: UserLogin):
                 detail="Account is deactivated"
             )
         
-        # Create access token
-        access_token = AuthService.create_access_token(data={"sub": user.id})
+        # Upgrade the stored hash if it was made with a different bcrypt cost
+        if AuthService.needs_rehash(user.hashed_password):
+            try:
+                await db[COLLECTIONS['users']].update_one(
+                    {"id": user.id, "hashed_password": user.hashed_password},
+                    {"$set": {"hashed_password": AuthService.hash_password(login_data.password)}}
+                )
+            except Exception as e:
+                logger.warning(f"Failed to rehash password for user {user.id}: {e}")
+        
+        # Create access and refresh tokens
+        tokens = await issue_tokens(user.id, user.role)
         
         return {
-            "access_token": access_token,
-            "token_type": "bearer",
+            **tokens,
             "user": UserResponse(**user.dict())
         }
         
@@ -142,12 +200,92 @@ async def login(login_data: UserLogin):
             detail="Failed to login"
         )
 
+@router.post("/refresh")
+async def refresh(refresh_data: TokenRefresh):
+    """Exchange a refresh token for a new access/refresh token pair (rotation)"""
+    try:
+        payload = AuthService.verify_token(refresh_data.refresh_token)
+        if payload is None or payload.get("type") != "refresh":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token"
+            )
+        
+        db = get_database()
+        
+        # Atomically mark the token used; a second use means the token leaked
+        token_data = await db[COLLECTIONS['refresh_tokens']].find_one_and_update(
+            {"jti": payload["jti"], "used": False},
+            {"$set": {"used": True, "used_at": datetime.utcnow()}}
+        )
+        if token_data is None:
+            logger.warning(f"Refresh token reuse detected for user {payload.get('sub')}")
+            await revoke_token_family(payload["fam"], reason="refresh_reuse")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token"
+            )
+        
+        user_data = await db[COLLECTIONS['users']].find_one({"id": payload["sub"]}, {"is_active": 1, "role": 1})
+        if not user_data or not user_data.get("is_active", True):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Account is deactivated"
+            )
+        
+        return await issue_tokens(payload["sub"], user_data.get("role", UserRole.CUSTOMER), family_id=payload["fam"])
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error refreshing token: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+
+@router.post("/logout")
+async def logout(
+    refresh_data: Optional[TokenRefresh] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Revoke the current access token and, if given, its refresh token family"""
+    try:
+        payload = AuthService.verify_token(credentials.credentials)
+        if payload is None or payload.get("type", "access") != "access":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials"
+            )
+        
+        await revocation_list.revoke(
+            payload["jti"],
+            datetime.utcfromtimestamp(payload["exp"]),
+            reason="logout"
+        )
+        
+        if refresh_data:
+            refresh_payload = AuthService.verify_token(refresh_data.refresh_token)
+            if refresh_payload and refresh_payload.get("type") == "refresh" and refresh_payload.get("sub") == payload.get("sub"):
+                await revoke_token_family(refresh_payload["fam"], reason="logout")
+        
+        return {"message": "Logged out successfully"}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error logging out: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to logout"
+        )
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information"""
     return UserResponse(**current_user.dict())
 
-@router.post("/admin-login")
+@router.post("/admin-login", dependencies=[Depends(login_ip_limiter)])
 async def admin_login(login_data: UserLogin):
     """Admin login with default credentials"""
     try:
@@ -169,18 +307,25 @@ async def admin_login(login_data: UserLogin):
                 await db[COLLECTIONS['users']].insert_one(admin.dict())
                 admin_user = admin.dict()
             
-            # Create access token
-            access_token = AuthService.create_access_token(data={"sub": admin_user["id"]})
+            # Create access and refresh tokens
+            tokens = await issue_tokens(admin_user["id"], admin_user.get("role", UserRole.ADMIN))
             
             return {
-                "access_token": access_token,
-                "token_type": "bearer",
+                **tokens,
                 "user": UserResponse(**admin_user)
             }
         
         # Fallback to regular login
         return await login(login_data)
         
+    except HTTPException as e:
+        if e.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+            raise
+        logger.error(f"Error in admin login: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin credentials"
+        )
     except Exception as e:
         logger.error(f"Error in admin login: {e}")
         raise HTTPException(
@@ -1,23 +1,35 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
 from typing import List, Optional
-from models.event import Event, EventCreate, EventUpdate, EventResponse, EventStatus
+from models.event import Event, EventCreate, EventUpdate, EventResponse, EventStatus, EventRegistrationResponse, RegistrationStatus
+from models.common import to_day_datetime
 from models.user import User
-from routes.auth import get_admin_user
+from routes.auth import get_current_user, get_admin_user
+from services.event_registration_service import EventRegistrationService
+from services.cache_service import cache_service
+from services.calendar_service import calendar_service
 from database import get_database, COLLECTIONS
+from responses import PrecompressedResponse, documents_response, model_response
+from middleware.compression import PrecompressedBody
 from datetime import datetime, date
+from email.utils import parsedate_to_datetime
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/events", tags=["Events"])
 
+# Registration counts in cached lists may lag by up to this long
+UPCOMING_EVENTS_CACHE_TTL = 30
+
 @router.get("/", response_model=List[EventResponse])
 async def get_events(
     status: Optional[EventStatus] = None,
     is_featured: Optional[bool] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000)
 ):
-    """Get all events with optional filtering"""
+    """Get all events with optional filtering; from/to are inclusive event dates"""
     try:
         db = get_database()
         
@@ -27,12 +39,19 @@ async def get_events(
             filter_query["status"] = status
         if is_featured is not None:
             filter_query["is_featured"] = is_featured
+        if date_from or date_to:
+            date_range = {}
+            if date_from:
+                date_range["$gte"] = to_day_datetime(date_from)
+            if date_to:
+                date_range["$lte"] = to_day_datetime(date_to)
+            filter_query["event_date"] = date_range
         
         # Get events (sorted by event date)
         cursor = db[COLLECTIONS['events']].find(filter_query).sort("event_date", 1).skip(skip).limit(limit)
         events = await cursor.to_list(length=limit)
         
-        return [EventResponse(**event) for event in events]
+        return documents_response(EventResponse, events)
         
     except Exception as e:
         logger.error(f"Error fetching events: {e}")
@@ -45,18 +64,22 @@ async def get_events(
 async def get_upcoming_events():
     """Get upcoming events"""
     try:
+        cached = cache_service.get("events", "upcoming")
+        if cached is not None:
+            return PrecompressedResponse(cached)
+        version = cache_service.version("events")
+        
         db = get_database()
         
-        today = date.today()
-        filter_query = {
-            "event_date": {"$gte": today},
-            "status": EventStatus.UPCOMING
-        }
+        # The event scheduler moves past events out of UPCOMING, so status alone is enough
+        filter_query = {"status": EventStatus.UPCOMING}
         
         cursor = db[COLLECTIONS['events']].find(filter_query).sort("event_date", 1).limit(10)
         events = await cursor.to_list(length=10)
         
-        return [EventResponse(**event) for event in events]
+        payload = PrecompressedBody(documents_response(EventResponse, events).body)
+        cache_service.set("events", "upcoming", payload, ttl=UPCOMING_EVENTS_CACHE_TTL, version=version)
+        return PrecompressedResponse(payload)
         
     except Exception as e:
         logger.error(f"Error fetching upcoming events: {e}")
@@ -65,6 +88,41 @@ async def get_upcoming_events():
             detail="Failed to fetch upcoming events"
         )
 
+@router.get("/calendar.ics")
+async def get_events_calendar(request: Request):
+    """iCalendar feed of events for calendar subscriptions"""
+    try:
+        feed = await calendar_service.get_feed()
+        headers = {
+            "ETag": feed.etag,
+            "Last-Modified": feed.last_modified_header,
+            "Cache-Control": "public, max-age=300"
+        }
+        
+        # Conditional GET: If-None-Match takes precedence over If-Modified-Since
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # Weak comparison: compressed responses carry the ETag as W/"..."
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            if feed.etag in tags or if_none_match.strip() == "*":
+                return Response(status_code=304, headers=headers)
+        elif request.headers.get("if-modified-since"):
+            try:
+                since = parsedate_to_datetime(request.headers["if-modified-since"]).replace(tzinfo=None)
+                if feed.last_modified <= since:
+                    return Response(status_code=304, headers=headers)
+            except (TypeError, ValueError):
+                pass
+        
+        return PrecompressedResponse(feed.payload, headers=headers, media_type="text/calendar; charset=utf-8")
+        
+    except Exception as e:
+        logger.error(f"Error rendering events calendar: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to render events calendar"
+        )
+
 @router.get("/{event_id}", response_model=EventResponse)
 async def get_event(event_id: str):
     """Get single event by ID"""
@@ -78,7 +136,7 @@ async def get_event(event_id: str):
                 detail="Event not found"
             )
         
-        return EventResponse(**event)
+        return documents_response(EventResponse, event)
         
     except HTTPException:
         raise
@@ -101,8 +159,9 @@ async def create_event(
         # Create event
         event = Event(**event_data.dict())
         await db[COLLECTIONS['events']].insert_one(event.dict())
+        cache_service.invalidate("events")
         
-        return EventResponse(**event.dict())
+        return model_response(event)
         
     except Exception as e:
         logger.error(f"Error creating event: {e}")
@@ -138,9 +197,15 @@ async def update_event(
             {"$set": update_data}
         )
         
+        # Raised capacity (or reopened event) may free seats for the waitlist
+        if "max_capacity" in update_data or "status" in update_data:
+            await EventRegistrationService.promote_waitlist(event_id)
+        
+        cache_service.invalidate("events")
+        
         # Get updated event
         updated_event = await db[COLLECTIONS['events']].find_one({"id": event_id})
-        return EventResponse(**updated_event)
+        return documents_response(EventResponse, updated_event)
         
     except HTTPException:
         raise
@@ -177,6 +242,8 @@ async def delete_event(
                 detail="Failed to delete event"
             )
         
+        cache_service.invalidate("events")
+        
         return {"message": "Event deleted successfully"}
         
     except HTTPException:
@@ -187,3 +254,85 @@ async def delete_event(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete event"
         )
+
+@router.post("/{event_id}/register", response_model=EventRegistrationResponse)
+async def register_for_event(
+    event_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Register current user for an event, or join its waitlist when full"""
+    try:
+        return await EventRegistrationService.register(event_id, current_user.id)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error registering for event {event_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to register for event"
+        )
+
+@router.delete("/{event_id}/register", response_model=EventRegistrationResponse)
+async def cancel_event_registration(
+    event_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Cancel current user's registration or waitlist entry"""
+    try:
+        return await EventRegistrationService.cancel(event_id, current_user.id)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling registration for event {event_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to cancel registration"
+        )
+
+@router.get("/{event_id}/register", response_model=EventRegistrationResponse)
+async def get_my_event_registration(
+    event_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get current user's registration status and waitlist position"""
+    try:
+        return await EventRegistrationService.get_registration(event_id, current_user.id)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching registration for event {event_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch registration"
+        )
+
+@router.get("/{event_id}/registrations", response_model=List[EventRegistrationResponse])
+async def get_event_registrations(
+    event_id: str,
+    registration_status: Optional[RegistrationStatus] = Query(None, alias="status"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Get registrations for an event (Admin only)"""
+    try:
+        db = get_database()
+        
+        filter_query = {"event_id": event_id}
+        if registration_status:
+            filter_query["status"] = registration_status
+        
+        cursor = db[COLLECTIONS['event_registrations']].find(filter_query).sort("created_at", 1).skip(skip).limit(limit)
+        registrations = await cursor.to_list(length=limit)
+        
+        return documents_response(EventRegistrationResponse, registrations)
+        
+    except Exception as e:
+        logger.error(f"Error fetching registrations for event {event_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch registrations"
+        )
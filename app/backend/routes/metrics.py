@@ -0,0 +1,48 @@
+import hmac
+import ipaddress
+import os
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from services.metrics import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/metrics", tags=["Monitoring"])
+
+# Scrapers send it as "Authorization: Bearer <token>". Unset, only loopback clients may scrape.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+def _is_loopback(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+async def require_scrape_access(request: Request):
+    """Metrics expose route, cache and breaker internals: scrape token, or loopback without one"""
+    if METRICS_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        if not hmac.compare_digest(authorization.encode("utf-8"), f"Bearer {METRICS_TOKEN}".encode("utf-8")):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid metrics token",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+        return
+    if request.client is None or not _is_loopback(request.client.host):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Metrics are only served to local scrapers unless METRICS_TOKEN is set"
+        )
+
+@router.get("", include_in_schema=False, dependencies=[Depends(require_scrape_access)])
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    try:
+        return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+    except Exception as e:
+        logger.error(f"Error rendering metrics: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to render metrics"
+        )
@@ -3,9 +3,13 @@ from typing import List, Optional
 from models.order import Order, OrderCreate, OrderUpdate, OrderResponse, OrderStatus, PaymentStatus, OrderType
 from models.user import User, UserRole
 from routes.auth import get_current_user, get_admin_user
-from services.payment_service import PaymentService
+from services.payment_service import PaymentService, PaymentUnavailableError
 from services.notification_service import NotificationService
+from services.timeslot_service import TimeSlotService
+from services.business_hours import BusinessHoursService
+from services.settings_service import SettingsService
 from database import get_database, COLLECTIONS
+from responses import documents_response, model_response
 from datetime import datetime
 import logging
 
@@ -30,6 +34,68 @@ def calculate_order_totals(order_data: OrderCreate) -> dict:
         "total_amount": total_amount
     }
 
+async def place_order(order_data: OrderCreate, customer_id: Optional[str], customer_email: Optional[str]) -> Order:
+    """Price, store and announce a new order"""
+    db = get_database()
+    
+    # Calculate totals
+    totals = calculate_order_totals(order_data)
+    
+    # Check the order can be accepted at all, from the cached settings and compiled schedule
+    settings = await SettingsService.get_settings()
+    if not settings.is_accepting_orders:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="We are not accepting orders right now"
+        )
+    
+    schedule = await BusinessHoursService.get_schedule()
+    requested_slot = TimeSlotService.requested_slot(order_data)
+    if requested_slot:
+        if not schedule.is_slot_open(*requested_slot):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Selected time slot is outside business hours"
+            )
+    elif not schedule.is_open():
+        next_opening = schedule.next_opening()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"We are closed; next opening at {next_opening.isoformat()}" if next_opening else "We are closed"
+        )
+    
+    # Reserve kitchen capacity for the requested slot (raises 409 when full)
+    time_slot_key = None
+    if requested_slot:
+        time_slot_key = await TimeSlotService.reserve(*requested_slot)
+    
+    # Create order
+    order = Order(
+        customer_id=customer_id,
+        customer_email=order_data.customer_email or customer_email,
+        time_slot_key=time_slot_key,
+        **order_data.dict(exclude={"customer_email"}),
+        **totals
+    )
+    
+    # Insert order to database
+    try:
+        await db[COLLECTIONS['orders']].insert_one(order.dict())
+    except Exception:
+        if time_slot_key:
+            await TimeSlotService.release(time_slot_key)
+        raise
+    
+    # Send notifications
+    try:
+        if order.customer_email:
+            await notification_service.send_order_confirmation(order)
+        await notification_service.send_admin_notification(order)
+    except Exception as e:
+        logger.warning(f"Failed to send order notifications: {e}")
+    
+    return order
+
 @router.post("/", response_model=OrderResponse)
 async def create_order(
     order_data: OrderCreate,
@@ -37,32 +103,16 @@ async def create_order(
 ):
     """Create new order"""
     try:
-        db = get_database()
-        
-        # Calculate totals
-        totals = calculate_order_totals(order_data)
-        
-        # Create order
-        order = Order(
+        order = await place_order(
+            order_data,
             customer_id=current_user.id if current_user else None,
-            customer_email=order_data.customer_email or (current_user.email if current_user else None),
-            **order_data.dict(),
-            **totals
+            customer_email=current_user.email if current_user else None
         )
         
-        # Insert order to database
-        await db[COLLECTIONS['orders']].insert_one(order.dict())
-        
-        # Send notifications
-        try:
-            if order.customer_email:
-                await notification_service.send_order_confirmation(order)
-            await notification_service.send_admin_notification(order)
-        except Exception as e:
-            logger.warning(f"Failed to send order notifications: {e}")
-        
-        return OrderResponse(**order.dict())
+        return model_response(order)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating order: {e}")
         raise HTTPException(
@@ -104,6 +154,12 @@ async def create_payment_intent(order_id: str):
         
     except HTTPException:
         raise
+    except PaymentUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Payments are temporarily unavailable, please try again shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Error creating payment intent for order {order_id}: {e}")
         raise HTTPException(
@@ -159,7 +215,7 @@ async def confirm_payment(order_id: str):
         # Send status update notification
         if new_order_status == OrderStatus.CONFIRMED:
             try:
-                updated_order = Order(**{**order.dict(), "status": new_order_status})
+                updated_order = order.model_copy(update={"status": new_order_status})
                 await notification_service.send_status_update(updated_order, new_order_status)
             except Exception as e:
                 logger.warning(f"Failed to send status update notification: {e}")
@@ -168,6 +224,12 @@ async def confirm_payment(order_id: str):
         
     except HTTPException:
         raise
+    except PaymentUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Payments are temporarily unavailable, please try again shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Error confirming payment for order {order_id}: {e}")
         raise HTTPException(
@@ -206,7 +268,7 @@ async def get_orders(
         cursor = db[COLLECTIONS['orders']].find(filter_query).sort("created_at", -1).skip(skip).limit(limit)
         orders = await cursor.to_list(length=limit)
         
-        return [OrderResponse(**order) for order in orders]
+        return documents_response(OrderResponse, orders)
         
     except Exception as e:
         logger.error(f"Error fetching orders: {e}")
@@ -239,7 +301,7 @@ async def get_order(
                     detail="Access denied"
                 )
         
-        return OrderResponse(**order)
+        return documents_response(OrderResponse, order)
         
     except HTTPException:
         raise
@@ -250,6 +312,65 @@ async def get_order(
             detail="Failed to fetch order"
         )
 
+async def set_order_status(order_id: str, new_status: OrderStatus) -> dict:
+    """Apply a status change, notify the customer and return the updated document"""
+    db = get_database()
+    
+    # Get current order
+    order_data = await db[COLLECTIONS['orders']].find_one({"id": order_id})
+    if not order_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found"
+        )
+    
+    current_order = Order(**order_data)
+    
+    # Update order status
+    update_data = {
+        "status": new_status,
+        "updated_at": datetime.utcnow()
+    }
+    
+    if new_status == OrderStatus.COMPLETED:
+        update_data["completed_at"] = datetime.utcnow()
+    
+    # A cancelled order coming back needs its slot again (raises 409 when it has filled up)
+    reinstated = (
+        current_order.status == OrderStatus.CANCELLED
+        and new_status != OrderStatus.CANCELLED
+        and current_order.time_slot_key
+    )
+    if reinstated:
+        await TimeSlotService.reserve(*TimeSlotService.parse_key(current_order.time_slot_key), allow_ended=True)
+    
+    result = await db[COLLECTIONS['orders']].update_one(
+        {"id": order_id, "status": current_order.status},
+        {"$set": update_data}
+    )
+    if reinstated and not result.modified_count:
+        # Someone else changed the order first
+        await TimeSlotService.release(current_order.time_slot_key)
+    
+    # Free the time slot once, on the transition into CANCELLED
+    if (
+        result.modified_count
+        and new_status == OrderStatus.CANCELLED
+        and current_order.status != OrderStatus.CANCELLED
+        and current_order.time_slot_key
+    ):
+        await TimeSlotService.release(current_order.time_slot_key)
+    
+    # Send status update notification
+    try:
+        updated_order = current_order.model_copy(update=update_data)
+        await notification_service.send_status_update(updated_order, new_status)
+    except Exception as e:
+        logger.warning(f"Failed to send status update notification: {e}")
+    
+    # Get updated order
+    return await db[COLLECTIONS['orders']].find_one({"id": order_id})
+
 @router.put("/{order_id}/status", response_model=OrderResponse)
 async def update_order_status(
     order_id: str,
@@ -258,42 +379,8 @@ async def update_order_status(
 ):
     """Update order status (Admin only)"""
     try:
-        db = get_database()
-        
-        # Get current order
-        order_data = await db[COLLECTIONS['orders']].find_one({"id": order_id})
-        if not order_data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Order not found"
-            )
-        
-        current_order = Order(**order_data)
-        
-        # Update order status
-        update_data = {
-            "status": new_status,
-            "updated_at": datetime.utcnow()
-        }
-        
-        if new_status == OrderStatus.COMPLETED:
-            update_data["completed_at"] = datetime.utcnow()
-        
-        await db[COLLECTIONS['orders']].update_one(
-            {"id": order_id},
-            {"$set": update_data}
-        )
-        
-        # Send status update notification
-        try:
-            updated_order = Order(**{**current_order.dict(), **update_data})
-            await notification_service.send_status_update(updated_order, new_status)
-        except Exception as e:
-            logger.warning(f"Failed to send status update notification: {e}")
-        
-        # Get updated order
-        updated_order_data = await db[COLLECTIONS['orders']].find_one({"id": order_id})
-        return OrderResponse(**updated_order_data)
+        updated_order_data = await set_order_status(order_id, new_status)
+        return documents_response(OrderResponse, updated_order_data)
         
     except HTTPException:
         raise
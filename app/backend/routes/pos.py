@@ -0,0 +1,77 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from typing import List, Optional
+from models.api_key import ApiKey, ApiKeyScope
+from models.order import OrderCreate, OrderResponse, OrderStatus
+from routes.orders import place_order, set_order_status
+from services.api_key_service import require_api_key
+from database import get_database, COLLECTIONS
+from responses import documents_response, model_response
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/pos", tags=["POS"])
+
+# Orders the kitchen display still has to act on
+OPEN_ORDER_STATUSES = [OrderStatus.PENDING, OrderStatus.CONFIRMED, OrderStatus.PREPARING, OrderStatus.READY]
+
+@router.post("/orders", response_model=OrderResponse)
+async def create_pos_order(
+    order_data: OrderCreate,
+    api_key: ApiKey = Depends(require_api_key(ApiKeyScope.ORDERS_CREATE))
+):
+    """Create walk-in order from a kiosk or POS terminal"""
+    try:
+        order = await place_order(order_data, customer_id=None, customer_email=None)
+        return model_response(order)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating POS order from {api_key.key_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create order"
+        )
+
+@router.get("/orders", response_model=List[OrderResponse])
+async def get_pos_orders(
+    order_status: Optional[OrderStatus] = Query(None, alias="status"),
+    limit: int = Query(100, ge=1, le=500),
+    api_key: ApiKey = Depends(require_api_key(ApiKeyScope.ORDERS_READ))
+):
+    """Get open orders for a kitchen display"""
+    try:
+        db = get_database()
+
+        filter_query = {"status": order_status} if order_status else {"status": {"$in": OPEN_ORDER_STATUSES}}
+        cursor = db[COLLECTIONS['orders']].find(filter_query).sort("created_at", 1).limit(limit)
+        orders = await cursor.to_list(length=limit)
+
+        return documents_response(OrderResponse, orders)
+
+    except Exception as e:
+        logger.error(f"Error fetching POS orders for {api_key.key_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch orders"
+        )
+
+@router.put("/orders/{order_id}/status", response_model=OrderResponse)
+async def update_pos_order_status(
+    order_id: str,
+    new_status: OrderStatus,
+    api_key: ApiKey = Depends(require_api_key(ApiKeyScope.ORDERS_STATUS))
+):
+    """Update order status from a POS terminal"""
+    try:
+        updated_order_data = await set_order_status(order_id, new_status)
+        return documents_response(OrderResponse, updated_order_data)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating order status {order_id} from {api_key.key_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update order status"
+        )
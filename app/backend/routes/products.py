@@ -3,13 +3,19 @@ from typing import List, Optional
 from models.product import Product, ProductCreate, ProductUpdate, ProductResponse, ProductCategory, ProductStatus
 from models.user import User, UserRole
 from routes.auth import get_current_user, get_admin_user
+from services.cache_service import cache_service
 from database import get_database, COLLECTIONS
+from responses import PrecompressedResponse, documents_response, model_response
+from middleware.compression import PrecompressedBody
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/products", tags=["Products"])
 
+# Listings are invalidated on every product change; the TTL only bounds a lost invalidation
+PRODUCTS_CACHE_TTL = 300
+
 @router.get("/", response_model=List[ProductResponse])
 async def get_products(
     category: Optional[ProductCategory] = None,
@@ -20,6 +26,15 @@ async def get_products(
 ):
     """Get all products with optional filtering"""
     try:
+        # Menu listings are cached until a product changes; searches are not
+        cache_key = (category, status, skip, limit)
+        if not search:
+            cached = cache_service.get("products", cache_key)
+            if cached is not None:
+                return PrecompressedResponse(cached)
+        # Read before the query, so a listing loaded across an invalidation is not cached
+        version = cache_service.version("products")
+        
         db = get_database()
         
         # Build filter query
@@ -42,7 +57,14 @@ async def get_products(
         cursor = db[COLLECTIONS['products']].find(filter_query).skip(skip).limit(limit)
         products = await cursor.to_list(length=limit)
         
-        return [ProductResponse(**product) for product in products]
+        response = documents_response(ProductResponse, products)
+        if search:
+            return response
+        
+        # Cache the rendered body (and its compressed variants) so hits skip all of it
+        payload = PrecompressedBody(response.body)
+        cache_service.set("products", cache_key, payload, ttl=PRODUCTS_CACHE_TTL, version=version)
+        return PrecompressedResponse(payload)
         
     except Exception as e:
         logger.error(f"Error fetching products: {e}")
@@ -64,7 +86,7 @@ async def get_product(product_id: str):
                 detail="Product not found"
             )
         
-        return ProductResponse(**product)
+        return documents_response(ProductResponse, product)
         
     except HTTPException:
         raise
@@ -95,8 +117,9 @@ async def create_product(
         # Create product
         product = Product(**product_data.dict())
         await db[COLLECTIONS['products']].insert_one(product.dict())
+        cache_service.invalidate("products")
         
-        return ProductResponse(**product.dict())
+        return model_response(product)
         
     except HTTPException:
         raise
@@ -133,10 +156,11 @@ async def update_product(
             {"id": product_id},
             {"$set": update_data}
         )
+        cache_service.invalidate("products")
         
         # Get updated product
         updated_product = await db[COLLECTIONS['products']].find_one({"id": product_id})
-        return ProductResponse(**updated_product)
+        return documents_response(ProductResponse, updated_product)
         
     except HTTPException:
         raise
@@ -166,6 +190,7 @@ async def delete_product(
         
         # Delete product
         result = await db[COLLECTIONS['products']].delete_one({"id": product_id})
+        cache_service.invalidate("products")
         
         if result.deleted_count == 0:
             raise HTTPException(
@@ -213,6 +238,8 @@ async def update_stock(
                 detail="Product not found"
             )
         
+        cache_service.invalidate("products")
+        
         return {"message": "Stock updated successfully"}
         
     except HTTPException:
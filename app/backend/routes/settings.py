@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from models.settings import CafeSettings, CafeSettingsUpdate
 from models.user import User
 from routes.auth import get_admin_user
+from services.settings_service import SettingsService
+from services.cache_service import cache_service
+from services.timeslot_service import TimeSlotService
+from services.business_hours import BusinessHoursService
 from database import get_database, COLLECTIONS
-from datetime import datetime
+from responses import model_response
+from datetime import datetime, date
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,20 +19,7 @@ router = APIRouter(prefix="/settings", tags=["Settings"])
 async def get_settings():
     """Get cafe settings"""
     try:
-        db = get_database()
-        
-        # Get settings from database
-        settings_data = await db[COLLECTIONS['settings']].find_one({})
-        
-        if not settings_data:
-            # Create default settings if none exist
-            default_settings = CafeSettings(
-                contact_email="admin@nanacafe.com"
-            )
-            await db[COLLECTIONS['settings']].insert_one(default_settings.dict())
-            return default_settings
-        
-        return CafeSettings(**settings_data)
+        return model_response(await SettingsService.get_settings())
         
     except Exception as e:
         logger.error(f"Error fetching settings: {e}")
@@ -54,6 +47,7 @@ async def update_settings(
                 contact_email=settings_data.contact_email or "admin@nanacafe.com"
             )
             await db[COLLECTIONS['settings']].insert_one(new_settings.dict())
+            cache_service.invalidate("settings")
             return new_settings
         else:
             # Update existing settings
@@ -65,6 +59,8 @@ async def update_settings(
                 {"$set": update_data}
             )
             
+            cache_service.invalidate("settings")
+            
             # Get updated settings
             updated_settings = await db[COLLECTIONS['settings']].find_one({"id": current_settings["id"]})
             return CafeSettings(**updated_settings)
@@ -79,28 +75,21 @@ async def update_settings(
         )
 
 @router.get("/time-slots")
-async def get_available_time_slots():
-    """Get available time slots for orders"""
+async def get_available_time_slots(service_date: Optional[date] = Query(None, alias="date")):
+    """Get time slots with remaining capacity for a date (default today)"""
     try:
-        db = get_database()
-        settings_data = await db[COLLECTIONS['settings']].find_one({})
-        
-        if settings_data and "available_time_slots" in settings_data:
-            return {"time_slots": settings_data["available_time_slots"]}
+        schedule = await BusinessHoursService.get_schedule()
+        service_date = service_date or schedule.local_now().date()
+        availability = await TimeSlotService.get_availability(service_date)
+        for slot in availability:
+            slot["is_open"] = schedule.is_slot_open(service_date, slot["slot"])
         
-        # Return default time slots
-        default_slots = [
-            "9:00 AM - 10:00 AM",
-            "10:00 AM - 11:00 AM", 
-            "11:00 AM - 12:00 PM",
-            "12:00 PM - 1:00 PM",
-            "1:00 PM - 2:00 PM",
-            "2:00 PM - 3:00 PM",
-            "3:00 PM - 4:00 PM",
-            "4:00 PM - 5:00 PM",
-            "5:00 PM - 6:00 PM"
-        ]
-        return {"time_slots": default_slots}
+        return {
+            "date": service_date,
+            "time_slots": [slot["slot"] for slot in availability if slot["is_open"] and slot["remaining"] > 0],
+            "availability": availability,
+            "business_hours": await BusinessHoursService.status()
+        }
         
     except Exception as e:
         logger.error(f"Error fetching time slots: {e}")
@@ -109,24 +98,29 @@ async def get_available_time_slots():
             detail="Failed to fetch time slots"
         )
 
+@router.get("/open-status")
+async def get_open_status():
+    """Whether the cafe is open now and when it next opens"""
+    try:
+        return await BusinessHoursService.status()
+        
+    except Exception as e:
+        logger.error(f"Error fetching open status: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch open status"
+        )
+
 @router.get("/delivery-info")
 async def get_delivery_info():
     """Get delivery information for customers"""
     try:
-        db = get_database()
-        settings_data = await db[COLLECTIONS['settings']].find_one({})
-        
-        if not settings_data:
-            return {
-                "delivery_fee": 50.0,
-                "free_delivery_threshold": 200.0,
-                "min_order_amount": 100.0
-            }
+        settings = await SettingsService.get_settings()
         
         return {
-            "delivery_fee": settings_data.get("delivery_fee", 50.0),
-            "free_delivery_threshold": settings_data.get("free_delivery_threshold", 200.0),
-            "min_order_amount": settings_data.get("min_order_amount", 100.0)
+            "delivery_fee": settings.delivery_fee,
+            "free_delivery_threshold": settings.free_delivery_threshold,
+            "min_order_amount": settings.min_order_amount
         }
         
     except Exception as e:
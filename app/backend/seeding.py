@@ -0,0 +1,285 @@
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from database import get_database, COLLECTIONS
+from models.event import Event, EventStatus
+from models.order import Order, OrderItem, OrderType, OrderStatus, PaymentStatus, PaymentMethod, DeliveryInfo, PickupInfo
+from models.product import Product, ProductCategory, ProductStatus
+from models.user import User, UserRole
+from services.auth_service import AuthService
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEED_BATCH_SIZE = 5000
+
+PRODUCT_NAMES = {
+    ProductCategory.COFFEE: ["Espresso", "Americano", "Cappuccino", "Latte", "Flat White", "Mocha", "Cortado", "Cold Brew"],
+    ProductCategory.PASTRY: ["Croissant", "Pain au Chocolat", "Ensaymada", "Banana Bread", "Cinnamon Roll", "Scone"],
+    ProductCategory.BEVERAGE: ["Matcha Latte", "Hojicha", "Chai", "Hot Chocolate", "Calamansi Juice", "Iced Tea"],
+    ProductCategory.SNACK: ["Granola Bar", "Cookie", "Brownie", "Ham & Cheese Sandwich", "Tuna Melt"]
+}
+PRICE_RANGES = {
+    ProductCategory.COFFEE: (90.0, 220.0),
+    ProductCategory.PASTRY: (60.0, 180.0),
+    ProductCategory.BEVERAGE: (80.0, 200.0),
+    ProductCategory.SNACK: (50.0, 250.0)
+}
+VARIANTS = ["Classic", "Iced", "Large", "Oat", "Spanish", "Salted Caramel", "Vanilla", "Hazelnut", "Double"]
+INGREDIENTS = ["espresso", "whole milk", "oat milk", "matcha", "butter", "flour", "sugar", "dark chocolate", "vanilla", "banana"]
+ALLERGENS = ["milk", "gluten", "nuts", "soy", "eggs"]
+FIRST_NAMES = ["Maria", "Jose", "Ana", "Juan", "Andrea", "Miguel", "Patricia", "Carlo", "Bea", "Paolo", "Kim", "Rica"]
+LAST_NAMES = ["Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores", "Ramos", "Villanueva"]
+AREAS = ["Makati", "Taguig", "Pasig", "Mandaluyong", "Quezon City", "San Juan", "Manila"]
+VENUES = ["Downtown Plaza", "Art District Gallery", "Community Center", "Weekend Market", "University Quad", "Riverside Park"]
+TIME_SLOTS = [
+    "9:00 AM - 10:00 AM", "10:00 AM - 11:00 AM", "11:00 AM - 12:00 PM", "12:00 PM - 1:00 PM", "1:00 PM - 2:00 PM",
+    "2:00 PM - 3:00 PM", "3:00 PM - 4:00 PM", "4:00 PM - 5:00 PM", "5:00 PM - 6:00 PM"
+]
+# Relative order volume per hour of the day: breakfast and lunch rushes
+HOURLY_WEIGHTS = {7: 4, 8: 9, 9: 8, 10: 5, 11: 7, 12: 10, 13: 8, 14: 4, 15: 5, 16: 5, 17: 4, 18: 2}
+ORDER_HOURS, ORDER_HOUR_WEIGHTS = list(HOURLY_WEIGHTS), list(HOURLY_WEIGHTS.values())
+# Orders older than this have run their course: completed, or cancelled
+SETTLED_AFTER = timedelta(days=2)
+
+def zipf_cum_weights(count: int, skew: float) -> List[float]:
+    """Cumulative rank^-skew weights: a few items get most of the traffic"""
+    return list(accumulate(1.0 / (rank ** skew) for rank in range(1, count + 1)))
+
+class DatasetGenerator:
+    """Realistic users, products, events and orders, reproducible from a seed.
+
+    Product popularity and order frequency per customer follow Zipf
+    distributions, orders grow towards the present and cluster around the
+    breakfast and lunch rushes, and order status follows from its age.
+    """
+
+    def __init__(
+        self,
+        users: int,
+        products: int,
+        events: int,
+        orders: int,
+        days: int = 365,
+        guest_ratio: float = 0.2,
+        delivery_ratio: float = 0.4,
+        product_skew: float = 0.8,
+        customer_skew: float = 0.6,
+        password: str = "password123",
+        seed: int = 42
+    ):
+        self.counts = {"users": users, "products": products, "events": events, "orders": orders}
+        self.days = days
+        self.guest_ratio = guest_ratio
+        self.delivery_ratio = delivery_ratio
+        self.product_skew = product_skew
+        self.customer_skew = customer_skew
+        self.password = password
+        self.rng = random.Random(seed)
+        self.now = datetime.utcnow()
+        # Keeps emails and usernames unique across repeated runs
+        self.tag = uuid.UUID(int=self.rng.getrandbits(128)).hex[:6]
+        self.customers: List[tuple] = []
+        self.catalog: List[Product] = []
+
+    def users(self) -> Iterator[dict]:
+        # One hash for everyone: hashing each password would take hours at this scale
+        hashed_password = AuthService.hash_password(self.password)
+        for i in range(self.counts["users"]):
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            username = f"{first.lower()}.{last.lower()}.{self.tag}{i}"
+            user = User(
+                username=username,
+                email=f"{username}@example.com",
+                full_name=f"{first} {last}",
+                phone=f"+63 9{self.rng.randint(10, 99)} {self.rng.randint(100, 999)} {self.rng.randint(1000, 9999)}",
+                role=UserRole.STAFF if self.rng.random() < 0.001 else UserRole.CUSTOMER,
+                hashed_password=hashed_password,
+                created_at=self.random_time(self.days * 1.5)
+            )
+            self.customers.append((user.id, user.email, user.full_name, user.phone))
+            yield user.dict()
+
+    def products(self) -> Iterator[dict]:
+        categories = list(ProductCategory)
+        for i in range(self.counts["products"]):
+            category = self.rng.choice(categories)
+            low, high = PRICE_RANGES[category]
+            status = self.rng.choices(list(ProductStatus), [90, 6, 4])[0]
+            product = Product(
+                name=f"{self.rng.choice(VARIANTS)} {self.rng.choice(PRODUCT_NAMES[category])} #{i + 1}",
+                description="House favourite, made fresh every morning",
+                price=round(self.rng.uniform(low, high) / 5) * 5.0,
+                category=category,
+                image_url=f"https://images.example.com/products/{i}.jpg",
+                ingredients=self.rng.sample(INGREDIENTS, self.rng.randint(2, 6)),
+                allergens=self.rng.sample(ALLERGENS, self.rng.randint(0, 2)),
+                is_available=status == ProductStatus.ACTIVE,
+                stock_quantity=0 if status == ProductStatus.OUT_OF_STOCK else self.rng.randint(5, 300),
+                status=status,
+                created_at=self.random_time(self.days * 1.5)
+            )
+            # Orders only reference what was on the menu
+            if status == ProductStatus.ACTIVE:
+                self.catalog.append(product)
+            yield product.dict()
+
+    def events(self) -> Iterator[dict]:
+        for i in range(self.counts["events"]):
+            # Mostly past pop-ups, with some announced for the coming weeks
+            event_date = self.now + timedelta(days=self.rng.uniform(-self.days, 60))
+            if event_date > self.now:
+                status = EventStatus.UPCOMING
+            else:
+                status = EventStatus.CANCELLED if self.rng.random() < 0.05 else EventStatus.COMPLETED
+            max_capacity = self.rng.choice([None, 50, 100, 200])
+            registrations = self.rng.randint(0, max_capacity or 150)
+            event = Event(
+                title=f"{self.rng.choice(VENUES)} Pop-Up #{i + 1}",
+                description="Coffee, pastries and live music",
+                event_date=event_date,
+                start_time=f"{self.rng.randint(7, 11)}:00 AM",
+                end_time=f"{self.rng.randint(3, 8)}:00 PM",
+                location=f"{self.rng.choice(VENUES)}, {self.rng.choice(AREAS)}",
+                max_capacity=max_capacity,
+                current_registrations=registrations,
+                is_featured=self.rng.random() < 0.1,
+                status=status,
+                created_at=event_date - timedelta(days=self.rng.randint(7, 45))
+            )
+            yield event.dict()
+
+    def orders(self) -> Iterator[dict]:
+        if not self.catalog:
+            raise ValueError("Orders need active products; generate products first")
+        product_weights = zipf_cum_weights(len(self.catalog), self.product_skew)
+        customer_weights = zipf_cum_weights(len(self.customers), self.customer_skew) if self.customers else None
+        # Regulars are not the oldest accounts; decouple rank from insertion order
+        customers = self.rng.sample(self.customers, len(self.customers))
+
+        for _ in range(self.counts["orders"]):
+            created_at = self.order_time()
+            if customer_weights and self.rng.random() >= self.guest_ratio:
+                customer_id, email, full_name, phone = self.rng.choices(customers, cum_weights=customer_weights)[0]
+            else:
+                customer_id, email = None, f"guest.{self.tag}{self.rng.getrandbits(40):x}@example.com"
+                full_name = f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+                phone = f"+63 917 {self.rng.randint(100, 999)} {self.rng.randint(1000, 9999)}"
+
+            picks = self.rng.choices(self.catalog, cum_weights=product_weights, k=self.rng.choice([1, 1, 2, 2, 3, 4]))
+            items = []
+            for product in {product.id: product for product in picks}.values():
+                quantity = self.rng.choices([1, 2, 3, 4], [70, 20, 7, 3])[0]
+                items.append(OrderItem(
+                    product_id=product.id,
+                    product_name=product.name,
+                    quantity=quantity,
+                    unit_price=product.price,
+                    total_price=round(product.price * quantity, 2)
+                ))
+            subtotal = round(sum(item.total_price for item in items), 2)
+
+            order_type = OrderType.DELIVERY if self.rng.random() < self.delivery_ratio else OrderType.PICKUP
+            delivery_fee = 50.0 if order_type == OrderType.DELIVERY and subtotal < 200.0 else 0.0
+            service_date = created_at + timedelta(days=self.rng.choice([0, 0, 0, 1, 1, 2]))
+            time_slot = self.rng.choice(TIME_SLOTS)
+            status, payment_status = self.order_status(created_at, order_type)
+            payment_method = self.rng.choices(list(PaymentMethod), [70, 20, 10])[0]
+
+            order = Order(
+                order_number=f"NC{created_at:%Y%m%d%H%M%S}",
+                customer_id=customer_id,
+                customer_email=email,
+                order_type=order_type,
+                items=items,
+                subtotal=subtotal,
+                delivery_fee=delivery_fee,
+                total_amount=subtotal + delivery_fee,
+                status=status,
+                payment_status=payment_status,
+                payment_method=payment_method,
+                payment_intent_id=f"pi_{self.rng.getrandbits(96):024x}" if payment_method == PaymentMethod.STRIPE and payment_status != PaymentStatus.PENDING else None,
+                delivery_info=DeliveryInfo(
+                    full_name=full_name or "Customer",
+                    contact_number=phone or "+63 917 555 0101",
+                    delivery_address=f"{self.rng.randint(1, 999)} {self.rng.choice(LAST_NAMES)} Street, {self.rng.choice(AREAS)}",
+                    delivery_date=service_date,
+                    delivery_time_slot=time_slot
+                ) if order_type == OrderType.DELIVERY else None,
+                pickup_info=PickupInfo(
+                    full_name=full_name or "Customer",
+                    contact_number=phone or "+63 917 555 0101",
+                    pickup_date=service_date,
+                    pickup_time_slot=time_slot
+                ) if order_type == OrderType.PICKUP else None,
+                created_at=created_at,
+                updated_at=created_at + timedelta(minutes=self.rng.randint(5, 240)) if status != OrderStatus.PENDING else None,
+                completed_at=created_at + timedelta(minutes=self.rng.randint(20, 180)) if status == OrderStatus.COMPLETED else None
+            )
+            yield order.dict()
+
+    def order_status(self, created_at: datetime, order_type: OrderType):
+        if self.now - created_at > SETTLED_AFTER:
+            if self.rng.random() < 0.06:
+                return OrderStatus.CANCELLED, self.rng.choice([PaymentStatus.FAILED, PaymentStatus.REFUNDED, PaymentStatus.PENDING])
+            return OrderStatus.COMPLETED, PaymentStatus.PAID
+        statuses = [OrderStatus.PENDING, OrderStatus.CONFIRMED, OrderStatus.PREPARING, OrderStatus.READY]
+        if order_type == OrderType.DELIVERY:
+            statuses.append(OrderStatus.OUT_FOR_DELIVERY)
+        status = self.rng.choice(statuses)
+        return status, PaymentStatus.PENDING if status == OrderStatus.PENDING else PaymentStatus.PAID
+
+    def order_time(self) -> datetime:
+        # Triangular with the mode at today: the business has been growing
+        day = self.now - timedelta(days=int(self.rng.triangular(0, self.days, 0)))
+        hour = self.rng.choices(ORDER_HOURS, ORDER_HOUR_WEIGHTS)[0]
+        moment = day.replace(hour=hour, minute=self.rng.randint(0, 59), second=self.rng.randint(0, 59), microsecond=0)
+        return min(moment, self.now)
+
+    def random_time(self, days: float) -> datetime:
+        return self.now - timedelta(seconds=self.rng.uniform(0, days * 86400))
+
+async def insert_batches(collection, documents: Iterable[dict], batch_size: int = SEED_BATCH_SIZE, on_batch: Optional[Callable[[int], None]] = None) -> int:
+    """insert_many in batches, building the next batch while the previous one is written"""
+    inserted = 0
+    pending = None
+    batch = []
+
+    async def flush(next_batch):
+        nonlocal inserted, pending
+        if pending is not None:
+            inserted += len((await pending).inserted_ids)
+            if on_batch:
+                on_batch(inserted)
+        pending = asyncio.ensure_future(collection.insert_many(next_batch, ordered=False)) if next_batch else None
+        # Let the insert reach the driver thread before generating more
+        await asyncio.sleep(0)
+
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            await flush(batch)
+            batch = []
+    await flush(batch)
+    await flush([])
+    return inserted
+
+async def clear_seeded_collections():
+    """Remove catalog, events, orders and every non-admin user"""
+    db = get_database()
+    for name in ("products", "events", "orders", "event_registrations", "slot_reservations"):
+        await db[COLLECTIONS[name]].delete_many({})
+    await db[COLLECTIONS['users']].delete_many({"role": {"$ne": UserRole.ADMIN.value}})
+
+async def seed_database(generator: DatasetGenerator, batch_size: int = SEED_BATCH_SIZE, on_batch: Optional[Callable[[str, int], None]] = None) -> Dict[str, int]:
+    """Insert the generator's dataset; users and products first, since orders reference them"""
+    db = get_database()
+    inserted = {}
+    for name in ("users", "products", "events", "orders"):
+        callback = (lambda count, name=name: on_batch(name, count)) if on_batch else None
+        inserted[name] = await insert_batches(db[COLLECTIONS[name]], getattr(generator, name)(), batch_size, callback)
+        logger.info(f"Seeded {inserted[name]} {name}")
+    return inserted
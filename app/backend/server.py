@@ -6,7 +6,23 @@ import os
 from pathlib import Path
 
 # Import database
-from database import connect_to_mongo, close_mongo_connection
+from database import connect_to_mongo, close_mongo_connection, ensure_indexes
+from migrations import run_migrations
+from services.revocation_service import revocation_list
+from services.auth_service import AuthService
+from services.api_key_service import api_key_service
+from services.event_scheduler import event_scheduler
+from services.invalidation_bus import invalidation_bus
+from services.settings_service import SettingsService
+from services.tracing import tracer
+from services.notification_service import email_outbox
+from middleware.maintenance import MaintenanceMiddleware
+from middleware.compression import CompressionMiddleware
+from middleware.metrics import MetricsMiddleware
+from middleware.tracing import TracingMiddleware
+from middleware.admission import AdmissionMiddleware
+from responses import ORJSONResponse
+from logging_config import configure_logging
 
 # Import routes
 from routes.auth import router as auth_router
@@ -14,40 +30,96 @@ from routes.products import router as products_router
 from routes.orders import router as orders_router
 from routes.events import router as events_router
 from routes.settings import router as settings_router
+from routes.api_keys import router as api_keys_router
+from routes.pos import router as pos_router
+from routes.metrics import router as metrics_router
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Off in workers started by the multi-worker launcher, which runs these once itself
+RUN_STARTUP_TASKS = os.getenv("RUN_STARTUP_TASKS", "true").lower() == "true"
+
+async def run_startup_tasks():
+    """Indexes, migrations and default data (once per deployment is enough)"""
+    await ensure_indexes()
+    await run_migrations()
+    await initialize_default_data()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Nana Cafe API Server...")
+    
+    # Calibrate bcrypt cost for this host unless it is pinned with BCRYPT_ROUNDS
+    if "BCRYPT_ROUNDS" not in os.environ and os.getenv("BCRYPT_CALIBRATE", "false").lower() == "true":
+        rounds, timings = AuthService.calibrate_bcrypt_rounds()
+        AuthService.set_bcrypt_rounds(rounds)
+        logger.info(f"Calibrated bcrypt cost to {rounds} rounds ({timings[rounds]:.0f} ms per verify)")
+    
     await connect_to_mongo()
+    if RUN_STARTUP_TASKS:
+        await run_startup_tasks()
     
-    # Initialize default data
-    await initialize_default_data()
+    # Load token denylist and keep it in sync with other workers
+    await revocation_list.start()
+    
+    # Load machine credentials for kiosks and POS terminals
+    await api_key_service.start()
+    
+    # Share cache invalidations with the other workers
+    await invalidation_bus.start()
+    
+    # Prime the settings snapshot read by the maintenance middleware
+    await SettingsService.get_settings()
+    SettingsService.start_snapshot_refresh()
+    
+    # Keep event statuses in step with their dates
+    await event_scheduler.start()
+    
+    # Retry emails queued while SMTP was unavailable
+    await email_outbox.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down Nana Cafe API Server...")
+    await email_outbox.stop()
+    await event_scheduler.stop()
+    await invalidation_bus.stop()
+    await api_key_service.stop()
+    await revocation_list.stop()
     await close_mongo_connection()
+    tracer.shutdown()
 
 # Create the main app
 app = FastAPI(
     title="Nana Cafe API",
     description="Complete API for Nana Cafe - Coffee & Pastries Delivery/Pickup Service",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Create API router with prefix
 api_router = APIRouter(prefix="/api")
 
+# Negotiated gzip/brotli compression (innermost, so it sees the route's own response)
+app.add_middleware(CompressionMiddleware)
+
+# Maintenance/order-acceptance gate (added first so CORS headers still wrap its 503s)
+app.add_middleware(MaintenanceMiddleware)
+
+# Root span per request, trace id echoed in X-Trace-Id
+app.add_middleware(TracingMiddleware)
+
+# Per-route-class concurrency caps; sheds overload with 503 before any tracing or app work
+app.add_middleware(AdmissionMiddleware)
+
+# Request count/latency metrics (outermost app middleware, so shed and 503'd requests are counted too)
+app.add_middleware(MetricsMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -63,6 +135,9 @@ api_router.include_router(products_router)
 api_router.include_router(orders_router)
 api_router.include_router(events_router)
 api_router.include_router(settings_router)
+api_router.include_router(api_keys_router)
+api_router.include_router(pos_router)
+api_router.include_router(metrics_router)
 
 # Add root endpoint
 @api_router.get("/")
@@ -204,4 +279,4 @@ async def initialize_default_data():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    uvicorn.run(app, host="0.0.0.0", port=8001, log_config=None)
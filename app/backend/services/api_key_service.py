@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Callable
+from fastapi import HTTPException, Request, status
+from pymongo.errors import DuplicateKeyError
+from models.api_key import ApiKey, ApiKeyScope
+from database import get_database, COLLECTIONS
+from services.auth_service import SECRET_KEY
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-key secrets are derived from this master secret, so they are never stored. It must be
+# set, and differ from JWT_SECRET; otherwise API keys are disabled.
+API_KEY_MASTER_SECRET = os.getenv("API_KEY_MASTER_SECRET", "").encode('utf-8')
+API_KEYS_ENABLED = bool(API_KEY_MASTER_SECRET) and API_KEY_MASTER_SECRET != SECRET_KEY.encode('utf-8')
+API_KEY_SIGNATURE_TOLERANCE_SECONDS = int(os.getenv("API_KEY_SIGNATURE_TOLERANCE_SECONDS", "300"))
+API_KEY_RELOAD_SECONDS = float(os.getenv("API_KEY_RELOAD_SECONDS", "30"))
+# last_used_at is written to the database at most this often per key
+API_KEY_LAST_USED_RESOLUTION = timedelta(minutes=1)
+API_KEY_NONCE_MAX_LENGTH = 128
+
+class ApiKeyService:
+    """Machine credentials for kiosks and POS terminals.
+
+    Requests are signed with HMAC-SHA256 over
+    ``METHOD\\nPATH[?QUERY]\\nTIMESTAMP\\nNONCE\\nSHA256(BODY)`` and sent with
+    the ``X-Api-Key``, ``X-Timestamp``, ``X-Nonce`` and ``X-Signature`` headers.
+    Active keys are held in memory, so verification needs no password hashing.
+    Each nonce is accepted once per key: it is recorded until its timestamp
+    leaves the allowed window, so a captured request cannot be replayed.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, ApiKey] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def derive_secret(key_id: str) -> str:
+        """Signing secret for a key id"""
+        return hmac.new(API_KEY_MASTER_SECRET, key_id.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def sign(secret: str, method: str, path: str, timestamp: str, nonce: str, body: bytes) -> str:
+        """Compute the request signature (shared with clients)"""
+        message = "\n".join([
+            method.upper(),
+            path,
+            timestamp,
+            nonce,
+            hashlib.sha256(body).hexdigest()
+        ])
+        return hmac.new(secret.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    async def start(self):
+        """Load active keys and start periodic reloads for changes made on other workers"""
+        if not API_KEYS_ENABLED:
+            logger.warning("API_KEY_MASTER_SECRET is unset or equal to JWT_SECRET; API keys are disabled")
+        await self.reload()
+        self._task = asyncio.create_task(self._reload_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def reload(self):
+        db = get_database()
+        cursor = db[COLLECTIONS['api_keys']].find({"is_active": True})
+        keys = {}
+        async for doc in cursor:
+            api_key = ApiKey(**doc)
+            keys[api_key.key_id] = api_key
+        self._keys = keys
+
+    async def _reload_loop(self):
+        while True:
+            await asyncio.sleep(API_KEY_RELOAD_SECONDS)
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.warning(f"Failed to reload API keys: {e}")
+
+    def put(self, api_key: ApiKey):
+        """Update the local cache after an admin change"""
+        if api_key.is_active:
+            self._keys[api_key.key_id] = api_key
+        else:
+            self._keys.pop(api_key.key_id, None)
+
+    def remove(self, key_id: str):
+        self._keys.pop(key_id, None)
+
+    async def authenticate(self, request: Request) -> ApiKey:
+        """Verify the signed request and return the calling key"""
+        if not API_KEYS_ENABLED:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="API keys are not configured"
+            )
+
+        key_id = request.headers.get("x-api-key")
+        timestamp = request.headers.get("x-timestamp")
+        nonce = request.headers.get("x-nonce")
+        signature = request.headers.get("x-signature")
+        if not key_id or not timestamp or not nonce or not signature:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Missing API key signature headers"
+            )
+        if len(nonce) > API_KEY_NONCE_MAX_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid request nonce"
+            )
+
+        try:
+            skew = abs(time.time() - int(timestamp))
+        except ValueError:
+            skew = float("inf")
+        if skew > API_KEY_SIGNATURE_TOLERANCE_SECONDS:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Request timestamp outside allowed window"
+            )
+
+        # Compute the expected signature even for unknown keys so timing does not reveal which exist
+        api_key = self._keys.get(key_id)
+        path = request.url.path
+        if request.url.query:
+            path = f"{path}?{request.url.query}"
+        body = await request.body()
+        expected = self.sign(self.derive_secret(key_id), request.method, path, timestamp, nonce, body)
+
+        if not hmac.compare_digest(expected, signature) or api_key is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key signature"
+            )
+
+        # Only after the signature checks out, so nobody else can use up a key's nonces
+        await self._use_nonce(key_id, nonce, int(timestamp))
+        await self._touch(api_key)
+        return api_key
+
+    @staticmethod
+    async def _use_nonce(key_id: str, nonce: str, timestamp: int):
+        """Record a nonce until its request could no longer pass the timestamp check; reject repeats"""
+        db = get_database()
+        try:
+            await db[COLLECTIONS['api_key_nonces']].insert_one({
+                "key_id": key_id,
+                "nonce": nonce,
+                "expires_at": datetime.utcfromtimestamp(timestamp + API_KEY_SIGNATURE_TOLERANCE_SECONDS)
+            })
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Request nonce already used"
+            )
+
+    @staticmethod
+    async def _touch(api_key: ApiKey):
+        now = datetime.utcnow()
+        if api_key.last_used_at and now - api_key.last_used_at < API_KEY_LAST_USED_RESOLUTION:
+            return
+        api_key.last_used_at = now
+        try:
+            db = get_database()
+            await db[COLLECTIONS['api_keys']].update_one({"key_id": api_key.key_id}, {"$set": {"last_used_at": now}})
+        except Exception as e:
+            logger.warning(f"Failed to record last use of API key {api_key.key_id}: {e}")
+
+api_key_service = ApiKeyService()
+
+def require_api_key(scope: ApiKeyScope) -> Callable:
+    """FastAPI dependency factory: a signed request from a key holding ``scope``"""
+    async def dependency(request: Request) -> ApiKey:
+        api_key = await api_key_service.authenticate(request)
+        if scope not in api_key.scopes:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"API key lacks scope {scope.value}"
+            )
+        return api_key
+    return dependency
@@ -1,23 +1,172 @@
 import bcrypt
 import jwt
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Dict, Tuple
 from models.user import User, UserCreate, UserLogin
+from services.metrics import metrics, token_cache_hits, token_cache_misses, token_cache_hit_ratio, token_cache_size, token_cache_evictions
 import os
 
 SECRET_KEY = os.getenv("JWT_SECRET", "nanacafe-secret-key-2024")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+
+# bcrypt work factor. Pin BCRYPT_ROUNDS in multi-worker deployments so every
+# worker agrees on the cost; otherwise it can be calibrated at startup.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "2048"))
+
+class TokenCache:
+    """LRU of decoded JWT payloads keyed by token digest, valid until the token's exp"""
+    
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+    
+    def get(self, token: str) -> Optional[dict]:
+        """Return the cached payload, or None on a miss or an expired entry"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            # Expired tokens are dropped so the caller re-verifies and gets the proper error
+            self._entries.pop(key, None)
+            self.expired += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+    
+    def set(self, token: str, payload: dict):
+        """Cache a verified payload; tokens without exp are never cached"""
+        expires_at = payload.get("exp")
+        if expires_at is None or self.max_size <= 0:
+            return
+        
+        key = self._key(token)
+        self._entries[key] = (payload, float(expires_at))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, token: str):
+        """Drop a single token from the cache"""
+        self._entries.pop(self._key(token), None)
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions
+        }
+
+token_cache = TokenCache()
+
+def _collect_token_cache_stats():
+    # Expired entries were looked up and had to be decoded again: count them as misses
+    stats = token_cache.stats()
+    hits, misses = stats["hits"], stats["misses"] + stats["expired"]
+    token_cache_hits.set(hits)
+    token_cache_misses.set(misses)
+    token_cache_hit_ratio.set(hits / (hits + misses) if hits + misses else 0.0)
+    token_cache_size.set(stats["size"])
+    token_cache_evictions.set(stats["evictions"])
+
+metrics.add_collector(_collect_token_cache_stats)
 
 class AuthService:
     
+    bcrypt_rounds: int = BCRYPT_ROUNDS
+    
     @staticmethod
     def hash_password(password: str) -> str:
         """Hash a password for storing in database"""
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=AuthService.bcrypt_rounds)
         hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed.decode('utf-8')
     
+    @staticmethod
+    def get_hash_rounds(hashed_password: str) -> Optional[int]:
+        """Extract the cost factor from a "$2b$12$..." bcrypt hash"""
+        try:
+            return int(hashed_password.split('$')[2])
+        except (IndexError, ValueError):
+            return None
+    
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        """Whether a stored hash was made with a different cost than the current one"""
+        return AuthService.get_hash_rounds(hashed_password) != AuthService.bcrypt_rounds
+    
+    @staticmethod
+    def calibrate_bcrypt_rounds(
+        target_ms: float = BCRYPT_TARGET_MS,
+        min_rounds: int = BCRYPT_MIN_ROUNDS,
+        max_rounds: int = BCRYPT_MAX_ROUNDS
+    ) -> Tuple[int, Dict[int, float]]:
+        """Pick the highest cost whose verify latency on this host stays within target_ms.
+        
+        Each extra round doubles the work, so after timing the lowest cost the rest
+        are extrapolated and only the chosen cost is measured again to confirm.
+        Returns the chosen rounds and the measured timings in milliseconds.
+        """
+        password = b"calibration-password"
+        
+        def measure(rounds: int, samples: int = 3) -> float:
+            hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+            best = float("inf")
+            for _ in range(samples):
+                start = time.perf_counter()
+                bcrypt.checkpw(password, hashed)
+                best = min(best, (time.perf_counter() - start) * 1000)
+            return best
+        
+        timings = {min_rounds: measure(min_rounds)}
+        rounds = min_rounds
+        while rounds < max_rounds and timings[min_rounds] * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+            rounds += 1
+        
+        if rounds != min_rounds:
+            timings[rounds] = measure(rounds, samples=1)
+            # Step down if the extrapolation was optimistic
+            while rounds > min_rounds and timings[rounds] > target_ms:
+                rounds -= 1
+                timings[rounds] = measure(rounds, samples=1)
+        
+        return rounds, timings
+    
+    @staticmethod
+    def set_bcrypt_rounds(rounds: int):
+        """Use a new cost for hashes created from now on"""
+        AuthService.bcrypt_rounds = max(4, min(31, rounds))
+    
     @staticmethod
     def verify_password(password: str, hashed_password: str) -> bool:
         """Verify a password against its hash"""
@@ -31,17 +180,39 @@ class AuthService:
             expire = datetime.utcnow() + expires_delta
         else:
             expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        to_encode.setdefault("jti", uuid.uuid4().hex)
+        to_encode.setdefault("type", "access")
         to_encode.update({"exp": expire})
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
         return encoded_jwt
     
+    @staticmethod
+    def create_refresh_token(user_id: str, family_id: Optional[str] = None) -> Tuple[str, dict]:
+        """Create JWT refresh token; returns the token and its claims for persistence"""
+        expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        claims = {
+            "sub": user_id,
+            "jti": uuid.uuid4().hex,
+            "fam": family_id or uuid.uuid4().hex,
+            "type": "refresh",
+            "exp": expire
+        }
+        encoded_jwt = jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+        return encoded_jwt, claims
+    
     @staticmethod
     def verify_token(token: str) -> Optional[dict]:
         """Verify and decode JWT token"""
+        payload = token_cache.get(token)
+        if payload is not None:
+            return payload
+        
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            return payload
         except jwt.ExpiredSignatureError:
             return None
-        except jwt.JWTError:
+        except jwt.InvalidTokenError:
             return None
+        
+        token_cache.set(token, payload)
+        return payload
@@ -0,0 +1,187 @@
+from bisect import bisect_right
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from models.settings import CafeSettings
+from services.cache_service import cache_service
+from services.settings_service import SettingsService, SETTINGS_CACHE_TTL
+import logging
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+DAY_INDEX = {
+    "monday": 0, "mon": 0,
+    "tuesday": 1, "tue": 1, "tues": 1,
+    "wednesday": 2, "wed": 2,
+    "thursday": 3, "thu": 3, "thurs": 3,
+    "friday": 4, "fri": 4,
+    "saturday": 5, "sat": 5,
+    "sunday": 6, "sun": 6,
+}
+
+def parse_clock(value: str) -> Optional[int]:
+    """Minutes after midnight for "09:00", "9:00 AM" or "9 PM"; None if unparseable"""
+    text = value.strip().upper()
+    for fmt in ("%H:%M", "%I:%M %p", "%I:%M%p", "%I %p", "%I%p"):
+        try:
+            parsed = datetime.strptime(text, fmt)
+            return parsed.hour * 60 + parsed.minute
+        except ValueError:
+            continue
+    return None
+
+def parse_slot_start(slot: str) -> Optional[int]:
+    """Start minute of a "9:00 AM - 10:00 AM" slot label"""
+    return parse_clock(slot.split("-")[0])
+
+def parse_slot_end(slot: str) -> Optional[int]:
+    """End minute of a "9:00 AM - 10:00 AM" slot label (past 24h if it ends after midnight)"""
+    start, _, end = slot.partition("-")
+    start_minute, end_minute = parse_clock(start), parse_clock(end) if end else None
+    if end_minute is not None and start_minute is not None and end_minute <= start_minute:
+        end_minute += MINUTES_PER_DAY
+    return end_minute
+
+class CompiledSchedule:
+    """Opening hours as sorted, merged [start, end) minute-of-week intervals.
+
+    Built once per settings version; checks are a bisect over the interval
+    starts, with no string parsing or database access per request. An empty
+    ``business_hours`` list means no restriction (always open).
+    """
+
+    def __init__(self, intervals: List[Tuple[int, int]], tz: timezone, slot_starts: Dict[str, Optional[int]],
+                 slot_ends: Dict[str, Optional[int]]):
+        self.intervals = intervals
+        self.starts = [start for start, _ in intervals]
+        self.tz = tz
+        self.slot_starts = slot_starts
+        self.slot_ends = slot_ends
+        self.always_open = not intervals
+
+    @classmethod
+    def compile(cls, settings: CafeSettings) -> "CompiledSchedule":
+        intervals = []
+        for hours in settings.business_hours:
+            day = DAY_INDEX.get(hours.day.strip().lower())
+            if day is None or not hours.is_open or not hours.open_time or not hours.close_time:
+                if day is None:
+                    logger.warning(f"Ignoring business hours for unknown day {hours.day!r}")
+                continue
+            open_minute = parse_clock(hours.open_time)
+            close_minute = parse_clock(hours.close_time)
+            if open_minute is None or close_minute is None:
+                logger.warning(f"Ignoring unparseable business hours for {hours.day}: {hours.open_time}-{hours.close_time}")
+                continue
+
+            start = day * MINUTES_PER_DAY + open_minute
+            # Close at or before open means the cafe is open past midnight
+            end = day * MINUTES_PER_DAY + close_minute
+            if close_minute <= open_minute:
+                end += MINUTES_PER_DAY
+            if end > MINUTES_PER_WEEK:
+                # Sunday night into Monday morning wraps around the week
+                intervals.append((start, MINUTES_PER_WEEK))
+                intervals.append((0, end - MINUTES_PER_WEEK))
+            else:
+                intervals.append((start, end))
+
+        merged: List[Tuple[int, int]] = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+
+        try:
+            tz = ZoneInfo(settings.timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning(f"Unknown timezone {settings.timezone!r}, using UTC")
+            tz = timezone.utc
+
+        slot_starts = {slot: parse_slot_start(slot) for slot in settings.available_time_slots}
+        slot_ends = {slot: parse_slot_end(slot) for slot in settings.available_time_slots}
+        return cls(merged, tz, slot_starts, slot_ends)
+
+    def _minute_of_week(self, moment: datetime) -> int:
+        return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+    def local_now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def is_open_at_minute(self, minute: int) -> bool:
+        if self.always_open:
+            return True
+        index = bisect_right(self.starts, minute) - 1
+        return index >= 0 and minute < self.intervals[index][1]
+
+    def is_open(self, moment: Optional[datetime] = None) -> bool:
+        """Whether the cafe is open at ``moment`` (aware, or naive in cafe-local time)"""
+        moment = self._localize(moment)
+        return self.is_open_at_minute(self._minute_of_week(moment))
+
+    def next_opening(self, moment: Optional[datetime] = None) -> Optional[datetime]:
+        """Start of the next opening after ``moment``; ``moment`` itself if open, None if never open"""
+        moment = self._localize(moment)
+        if self.always_open or self.is_open(moment):
+            return moment
+        if not self.intervals:
+            return None
+        minute = self._minute_of_week(moment)
+        index = bisect_right(self.starts, minute)
+        start = self.starts[index] if index < len(self.starts) else self.starts[0] + MINUTES_PER_WEEK
+        week_start = (moment - timedelta(days=moment.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        return week_start + timedelta(minutes=start)
+
+    def is_slot_open(self, service_date: date, slot: str) -> bool:
+        """Whether a slot on a date starts within opening hours (unparseable slots are allowed)"""
+        start = self.slot_starts.get(slot)
+        if start is None:
+            start = parse_slot_start(slot)
+        if start is None:
+            return True
+        return self.is_open_at_minute(service_date.weekday() * MINUTES_PER_DAY + start)
+
+    def has_slot_ended(self, service_date: date, slot: str, moment: Optional[datetime] = None) -> bool:
+        """Whether a slot on a date is over at ``moment``; slots without a parseable end last all day"""
+        moment = self._localize(moment)
+        if service_date != moment.date():
+            return service_date < moment.date()
+        end = self.slot_ends[slot] if slot in self.slot_ends else parse_slot_end(slot)
+        if end is None:
+            end = MINUTES_PER_DAY
+        return end <= moment.hour * 60 + moment.minute
+
+    def _localize(self, moment: Optional[datetime]) -> datetime:
+        if moment is None:
+            return self.local_now()
+        if moment.tzinfo is None:
+            return moment.replace(tzinfo=self.tz)
+        return moment.astimezone(self.tz)
+
+class BusinessHoursService:
+    """Access to the compiled schedule, rebuilt only when settings change"""
+
+    @staticmethod
+    async def get_schedule() -> CompiledSchedule:
+        # Stored in the settings namespace, so it is dropped together with the settings
+        schedule = cache_service.get("settings", "schedule")
+        if schedule is None:
+            version = cache_service.version("settings")
+            schedule = CompiledSchedule.compile(await SettingsService.get_settings())
+            cache_service.set("settings", "schedule", schedule, ttl=SETTINGS_CACHE_TTL, version=version)
+        return schedule
+
+    @staticmethod
+    async def status(moment: Optional[datetime] = None) -> dict:
+        schedule = await BusinessHoursService.get_schedule()
+        settings = await SettingsService.get_settings()
+        next_opening = schedule.next_opening(moment)
+        return {
+            "is_open": schedule.is_open(moment),
+            "is_accepting_orders": settings.is_accepting_orders and not settings.maintenance_mode,
+            "next_opening": next_opening.isoformat() if next_opening else None,
+            "timezone": settings.timezone
+        }
@@ -0,0 +1,82 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class CacheService:
+    """In-process cache grouped into namespaces (usually one per collection).
+
+    Writers call ``invalidate(namespace)`` after changing the underlying data,
+    which drops the namespace's entries, bumps its version and notifies
+    listeners (e.g. pre-rendered payloads that must be rebuilt).
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[Any, Tuple[Optional[float], Any]]] = {}
+        self._versions: Dict[str, int] = {}
+        self._listeners: Dict[str, List[Callable[[str], None]]] = {}
+        self._broadcasters: List[Callable[[str], None]] = []
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def get(self, namespace: str, key: Any, default: Any = None) -> Any:
+        entry = self._entries.get(namespace, {}).get(key, _MISSING)
+        if entry is not _MISSING:
+            expires_at, value = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self.hits[namespace] = self.hits.get(namespace, 0) + 1
+                return value
+            self._entries[namespace].pop(key, None)
+        self.misses[namespace] = self.misses.get(namespace, 0) + 1
+        return default
+
+    def set(self, namespace: str, key: Any, value: Any, ttl: Optional[float] = None, version: Optional[int] = None):
+        """Store a value; with ``version`` (read before loading it), skip it if the namespace was invalidated since"""
+        if version is not None and version != self.version(namespace):
+            return
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries.setdefault(namespace, {})[key] = (expires_at, value)
+
+    def version(self, namespace: str) -> int:
+        return self._versions.get(namespace, 0)
+
+    def invalidate(self, namespace: str, broadcast: bool = True):
+        """Drop every entry in a namespace and notify its listeners.
+        
+        ``broadcast=False`` is used when applying an invalidation that came
+        from another worker, so it is not sent back out.
+        """
+        self._entries.pop(namespace, None)
+        self._versions[namespace] = self._versions.get(namespace, 0) + 1
+        callbacks = list(self._listeners.get(namespace, []))
+        if broadcast:
+            callbacks.extend(self._broadcasters)
+        for callback in callbacks:
+            try:
+                callback(namespace)
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener for {namespace} failed: {e}")
+
+    def on_invalidate(self, namespace: str, listener: Callable[[str], None]):
+        self._listeners.setdefault(namespace, []).append(listener)
+
+    def add_broadcaster(self, broadcaster: Callable[[str], None]):
+        """Register a callback for every locally originated invalidation"""
+        self._broadcasters.append(broadcaster)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        namespaces = set(self._versions) | set(self.hits) | set(self.misses)
+        return {
+            namespace: {
+                "entries": len(self._entries.get(namespace, {})),
+                "version": self.version(namespace),
+                "hits": self.hits.get(namespace, 0),
+                "misses": self.misses.get(namespace, 0)
+            }
+            for namespace in sorted(namespaces)
+        }
+
+cache_service = CacheService()
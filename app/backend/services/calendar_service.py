@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Optional, List
+from models.event import EventStatus
+from services.cache_service import cache_service
+from middleware.compression import PrecompressedBody
+from database import get_database, COLLECTIONS
+import logging
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_NAME = "Nana Cafe Pop-Ups"
+CALENDAR_PAST_DAYS = 90  # Older events are left out of the feed
+ICS_LINE_LIMIT = 75  # Octets per content line before folding (RFC 5545 3.1)
+
+class CalendarFeed:
+    """A rendered feed with the validators needed for conditional GETs"""
+
+    def __init__(self, body: bytes, last_modified: datetime):
+        self.body = body
+        self.payload = PrecompressedBody(body)
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.last_modified = last_modified.replace(microsecond=0)
+        self.last_modified_header = format_datetime(self.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+
+class CalendarService:
+    """iCalendar feed of events, rendered once and kept until events change.
+
+    The rendered feed is dropped whenever the ``events`` cache namespace is
+    invalidated (event create/update/delete and scheduled status changes) and
+    rebuilt on the next request. Concurrent misses share one build, and a
+    build that overlaps an invalidation is served but not kept.
+    """
+
+    def __init__(self):
+        self._feed: Optional[CalendarFeed] = None
+        # Bumped by every invalidation; a build only stores its feed if it is unchanged
+        self._generation = 0
+        self._building: Optional[asyncio.Task] = None
+        # Deletions leave no document behind, so the invalidation time also counts as a modification
+        self._invalidated_at = datetime.min
+        cache_service.on_invalidate("events", self._drop)
+
+    def _drop(self, namespace: str):
+        self._feed = None
+        self._invalidated_at = datetime.utcnow()
+        self._generation += 1
+        # Requests from now on must not join a build that started before the change
+        self._building = None
+
+    async def get_feed(self) -> CalendarFeed:
+        if self._feed is not None:
+            return self._feed
+        if self._building is None:
+            self._building = asyncio.get_running_loop().create_task(self._rebuild(self._generation))
+        # Shielded: a client disconnecting must not cancel the build for the others
+        return await asyncio.shield(self._building)
+
+    async def _rebuild(self, generation: int) -> CalendarFeed:
+        try:
+            feed = await self._build()
+            if generation == self._generation:
+                self._feed = feed
+            return feed
+        finally:
+            if generation == self._generation:
+                self._building = None
+
+    async def _build(self) -> CalendarFeed:
+        db = get_database()
+        since = datetime.utcnow() - timedelta(days=CALENDAR_PAST_DAYS)
+        cursor = db[COLLECTIONS['events']].find({"event_date": {"$gte": since}}).sort("event_date", 1)
+        events = await cursor.to_list(length=None)
+
+        last_modified = max(
+            [event.get("updated_at") or event.get("created_at") or since for event in events] + [self._invalidated_at],
+            default=datetime.utcnow()
+        )
+        if last_modified == datetime.min:
+            last_modified = datetime.utcnow()
+        return CalendarFeed(render_calendar(events), last_modified)
+
+calendar_service = CalendarService()
+
+def render_calendar(events: List[dict]) -> bytes:
+    """Render event documents as an RFC 5545 VCALENDAR"""
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Nana Cafe//Events//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(CALENDAR_NAME)}",
+    ]
+    for event in events:
+        lines.extend(_render_event(event))
+    lines.append("END:VCALENDAR")
+    return "".join(_fold(line) + "\r\n" for line in lines).encode('utf-8')
+
+def _render_event(event: dict) -> List[str]:
+    event_date = event["event_date"]
+    stamp = event.get("updated_at") or event.get("created_at") or datetime.utcnow()
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{event['id']}@nanacafe",
+        f"DTSTAMP:{stamp.strftime('%Y%m%dT%H%M%SZ')}",
+    ]
+
+    start = _parse_time(event.get("start_time"))
+    end = _parse_time(event.get("end_time"))
+    if start is not None:
+        # Floating local times: the cafe's pop-ups are all in one city
+        start_at = event_date.replace(hour=start[0], minute=start[1])
+        lines.append(f"DTSTART:{start_at.strftime('%Y%m%dT%H%M%S')}")
+        if end is not None:
+            end_at = event_date.replace(hour=end[0], minute=end[1])
+            lines.append(f"DTEND:{end_at.strftime('%Y%m%dT%H%M%S')}")
+    else:
+        lines.append(f"DTSTART;VALUE=DATE:{event_date.strftime('%Y%m%d')}")
+        lines.append(f"DTEND;VALUE=DATE:{(event_date + timedelta(days=1)).strftime('%Y%m%d')}")
+
+    lines.append(f"SUMMARY:{_escape(event.get('title', ''))}")
+    if event.get("description"):
+        lines.append(f"DESCRIPTION:{_escape(event['description'])}")
+    if event.get("location"):
+        lines.append(f"LOCATION:{_escape(event['location'])}")
+    if event.get("image_url"):
+        lines.append(f"ATTACH:{event['image_url']}")
+    lines.append(f"STATUS:{'CANCELLED' if event.get('status') == EventStatus.CANCELLED else 'CONFIRMED'}")
+    lines.append("END:VEVENT")
+    return lines
+
+def _parse_time(value: Optional[str]):
+    """Parse "9:00 AM" / "17:30" into (hour, minute); None if absent or unparseable"""
+    if not value:
+        return None
+    for fmt in ("%I:%M %p", "%I %p", "%H:%M"):
+        try:
+            parsed = datetime.strptime(value.strip().upper(), fmt)
+            return parsed.hour, parsed.minute
+        except ValueError:
+            continue
+    return None
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets without splitting UTF-8 sequences"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= ICS_LINE_LIMIT:
+        return line
+    parts = []
+    current = ""
+    current_size = 0
+    limit = ICS_LINE_LIMIT
+    for char in line:
+        size = len(char.encode('utf-8'))
+        if current_size + size > limit:
+            parts.append(current)
+            current, current_size = "", 0
+            limit = ICS_LINE_LIMIT - 1  # Continuation lines start with a space
+        current += char
+        current_size += size
+    parts.append(current)
+    return "\r\n ".join(parts)
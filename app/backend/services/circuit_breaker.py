@@ -0,0 +1,142 @@
+import math
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict
+from services.metrics import metrics, circuit_breaker_state, circuit_breaker_rejected, circuit_breaker_transitions
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Shared defaults; per dependency with <NAME>_BREAKER_FAILURE_RATE etc. (e.g. STRIPE_BREAKER_OPEN_SECONDS)
+CIRCUIT_BREAKER_FAILURE_RATE = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+CIRCUIT_BREAKER_MIN_CALLS = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "10"))
+CIRCUIT_BREAKER_WINDOW = int(os.getenv("CIRCUIT_BREAKER_WINDOW", "20"))
+CIRCUIT_BREAKER_OPEN_SECONDS = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30"))
+CIRCUIT_BREAKER_HALF_OPEN_PROBES = int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_PROBES", "2"))
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+# Exported as a number: 0 closed, 1 half-open, 2 open
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Failure-rate breaker over the last ``window`` calls to one dependency.
+
+    Closed: calls go through and outcomes are recorded. Once at least
+    ``min_calls`` are recorded and the failure rate reaches ``failure_rate``
+    it opens, and calls fail fast with CircuitOpenError for ``open_seconds``.
+    Then it goes half-open and lets ``probes`` calls through one at a time:
+    all succeeding closes it, any failure opens it again.
+
+    ``call()`` is only entered on the event loop thread (blocking clients are
+    awaited in a worker thread inside it), so outcomes are recorded on the
+    loop and there is no locking.
+    """
+
+    def __init__(self, name: str, is_failure: Callable[[BaseException], bool] = lambda e: True):
+        prefix = f"{name.upper()}_BREAKER_"
+        self.name = name
+        self.is_failure = is_failure
+        self.failure_rate = float(os.getenv(prefix + "FAILURE_RATE", CIRCUIT_BREAKER_FAILURE_RATE))
+        self.min_calls = int(os.getenv(prefix + "MIN_CALLS", CIRCUIT_BREAKER_MIN_CALLS))
+        self.open_seconds = float(os.getenv(prefix + "OPEN_SECONDS", CIRCUIT_BREAKER_OPEN_SECONDS))
+        self.probes = int(os.getenv(prefix + "HALF_OPEN_PROBES", CIRCUIT_BREAKER_HALF_OPEN_PROBES))
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=int(os.getenv(prefix + "WINDOW", CIRCUIT_BREAKER_WINDOW)))
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_successes = 0
+        breakers[name] = self
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a probe through (0 if it would now)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == OPEN and self.retry_after == 0:
+            self._transition(HALF_OPEN)
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+            self._probe_successes += 1
+            if self._probe_successes >= self.probes:
+                self._transition(CLOSED)
+            return
+        self._outcomes.append(False)
+
+    def record_failure(self):
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+            self._transition(OPEN)
+            return
+        self._outcomes.append(True)
+        if len(self._outcomes) >= self.min_calls and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+            self._transition(OPEN)
+
+    @contextmanager
+    def call(self):
+        """Guard one call: fail fast while open, record the outcome otherwise"""
+        if not self.allow():
+            circuit_breaker_rejected.inc(self.name)
+            raise CircuitOpenError(self.name, max(1, math.ceil(self.retry_after)))
+        try:
+            yield
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                # The dependency answered; the request itself was bad
+                self.record_success()
+            raise
+        except BaseException:
+            # Cancelled or interrupted: no outcome, but free the probe slot for the next caller
+            self._release_probe()
+            raise
+        self.record_success()
+
+    def _release_probe(self):
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+
+    def _transition(self, state: str):
+        logger.warning(f"Circuit breaker {self.name}: {self.state} -> {state}")
+        self.state = state
+        circuit_breaker_transitions.inc(self.name, state)
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        elif state == HALF_OPEN:
+            self._probe_in_flight = False
+            self._probe_successes = 0
+        else:
+            self._outcomes.clear()
+
+breakers: Dict[str, CircuitBreaker] = {}
+
+def _collect_breaker_states():
+    for name, breaker in breakers.items():
+        # An open breaker past its wait admits the next call as a probe: report it as half-open already
+        state = HALF_OPEN if breaker.state == OPEN and breaker.retry_after == 0 else breaker.state
+        circuit_breaker_state.set(STATE_VALUES[state], name)
+
+metrics.add_collector(_collect_breaker_states)
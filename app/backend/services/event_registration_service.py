@@ -0,0 +1,253 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from models.event import EventStatus, EventRegistration, EventRegistrationResponse, RegistrationStatus
+from database import get_database, COLLECTIONS
+import logging
+
+logger = logging.getLogger(__name__)
+
+OPEN_EVENT_STATUSES = [EventStatus.UPCOMING, EventStatus.ACTIVE]
+ACTIVE_REGISTRATION_STATUSES = [RegistrationStatus.PENDING, RegistrationStatus.REGISTERED, RegistrationStatus.WAITLISTED]
+# A PENDING registration older than this was abandoned mid-request and may be claimed again
+REGISTRATION_CLAIM_LEASE_SECONDS = 60
+
+def seat_available_filter(event_id: str, behind_waitlist: bool = False) -> dict:
+    """Matches the event only while it is open and below max_capacity (or uncapped).
+    
+    ``behind_waitlist`` also requires an empty waitlist, so new registrants
+    cannot take a freed seat ahead of the people already waiting for it.
+    """
+    query = {
+        "id": event_id,
+        "status": {"$in": OPEN_EVENT_STATUSES},
+        "$or": [
+            {"max_capacity": None},
+            {"$expr": {"$lt": ["$current_registrations", "$max_capacity"]}}
+        ]
+    }
+    if behind_waitlist:
+        query["waitlist_count"] = {"$not": {"$gt": 0}}
+    return query
+
+class EventRegistrationService:
+    """Event registrations with capacity enforced by conditional updates.
+
+    A seat is taken with a single ``find_one_and_update`` that only matches while
+    ``current_registrations < max_capacity``, so concurrent registrations are
+    serialized by MongoDB's document-level atomicity and the counter can never
+    overshoot. Registrations that miss a seat, or arrive while others are
+    waiting, join a waitlist ordered by ``waitlisted_at`` and are promoted as
+    seats free up.
+
+    Each attempt stamps its PENDING claim with a ``claim_id`` and only moves
+    the registration on while the claim is still its own, so a cancel or a
+    takeover of a stale claim in the meantime is never overwritten. The seat
+    increment pushes the ``claim_id`` onto the event's ``seat_holds`` in the
+    same update, so a claim abandoned between taking a seat and registering
+    can have exactly that seat returned by whoever cancels or takes it over.
+    """
+
+    @staticmethod
+    async def register(event_id: str, user_id: str) -> EventRegistrationResponse:
+        db = get_database()
+        registrations = db[COLLECTIONS['event_registrations']]
+        events = db[COLLECTIONS['events']]
+
+        event = await events.find_one({"id": event_id}, {"status": 1})
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
+            )
+        if event["status"] not in OPEN_EVENT_STATUSES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Event is not open for registration"
+            )
+
+        now = datetime.utcnow()
+        claim_id = str(uuid.uuid4())
+
+        # Claim the (event, user) pair; the unique index rejects a second active registration
+        new_registration = EventRegistration(event_id=event_id, user_id=user_id)
+        try:
+            previous = await registrations.find_one_and_update(
+                {
+                    "event_id": event_id,
+                    "user_id": user_id,
+                    "$or": [
+                        {"status": RegistrationStatus.CANCELLED},
+                        {"status": RegistrationStatus.PENDING, "updated_at": {"$lt": now - timedelta(seconds=REGISTRATION_CLAIM_LEASE_SECONDS)}}
+                    ]
+                },
+                {
+                    "$set": {"status": RegistrationStatus.PENDING, "claim_id": claim_id, "waitlisted_at": None, "updated_at": now},
+                    "$setOnInsert": {"id": new_registration.id, "created_at": new_registration.created_at}
+                },
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Already registered for this event"
+            )
+
+        if previous and previous["status"] == RegistrationStatus.PENDING:
+            # Taking over an abandoned claim: give back the seat it may have taken
+            await EventRegistrationService._release_seat(event_id, previous.get("claim_id"))
+
+        own_claim = {"id": previous["id"] if previous else new_registration.id, "status": RegistrationStatus.PENDING, "claim_id": claim_id}
+
+        # Take a seat if one is left and nobody is waiting for it; the hold records whose seat it is
+        seated = await events.find_one_and_update(
+            seat_available_filter(event_id, behind_waitlist=True),
+            {"$inc": {"current_registrations": 1}, "$push": {"seat_holds": claim_id}},
+            projection={"_id": 1}
+        )
+        if seated:
+            registration = await registrations.find_one_and_update(
+                own_claim,
+                {"$set": {"status": RegistrationStatus.REGISTERED, "updated_at": datetime.utcnow()}},
+                return_document=ReturnDocument.AFTER
+            )
+            if not registration:
+                # Cancelled or taken over meanwhile: hand the seat on
+                await EventRegistrationService._release_seat(event_id, claim_id)
+                raise EventRegistrationService._claim_lost()
+            # The seat now belongs to the REGISTERED registration
+            await events.update_one({"id": event_id}, {"$pull": {"seat_holds": claim_id}})
+            return EventRegistrationResponse(**registration)
+
+        # Closed or deleted since the check above
+        event = await events.find_one({"id": event_id}, {"status": 1})
+        if not event or event["status"] not in OPEN_EVENT_STATUSES:
+            await registrations.update_one(
+                own_claim,
+                {"$set": {"status": RegistrationStatus.CANCELLED, "updated_at": now}}
+            )
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND if not event else status.HTTP_400_BAD_REQUEST,
+                detail="Event not found" if not event else "Event is not open for registration"
+            )
+
+        # Full or others waiting: join the waitlist, then promote in case a seat is free
+        result = await registrations.update_one(
+            own_claim,
+            {"$set": {"status": RegistrationStatus.WAITLISTED, "waitlisted_at": now, "updated_at": now}}
+        )
+        if not result.modified_count:
+            raise EventRegistrationService._claim_lost()
+        await events.update_one({"id": event_id}, {"$inc": {"waitlist_count": 1}})
+        await EventRegistrationService.promote_waitlist(event_id)
+
+        return await EventRegistrationService.get_registration(event_id, user_id)
+
+    @staticmethod
+    async def cancel(event_id: str, user_id: str) -> EventRegistrationResponse:
+        db = get_database()
+        registration = await db[COLLECTIONS['event_registrations']].find_one_and_update(
+            {"event_id": event_id, "user_id": user_id, "status": {"$in": ACTIVE_REGISTRATION_STATUSES}},
+            {"$set": {"status": RegistrationStatus.CANCELLED, "updated_at": datetime.utcnow()}}
+        )
+        if not registration:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Registration not found"
+            )
+
+        if registration["status"] == RegistrationStatus.REGISTERED:
+            await db[COLLECTIONS['events']].update_one({"id": event_id}, {"$inc": {"current_registrations": -1}})
+            await EventRegistrationService.promote_waitlist(event_id)
+        elif registration["status"] == RegistrationStatus.WAITLISTED:
+            await db[COLLECTIONS['events']].update_one({"id": event_id}, {"$inc": {"waitlist_count": -1}})
+        else:
+            # PENDING: free the seat its claim holds, if any (the in-flight register may be gone)
+            await EventRegistrationService._release_seat(event_id, registration.get("claim_id"))
+
+        return EventRegistrationResponse(**{**registration, "status": RegistrationStatus.CANCELLED})
+
+    @staticmethod
+    async def promote_waitlist(event_id: str) -> int:
+        """Move waitlisted users into free seats in arrival order; returns how many were promoted"""
+        db = get_database()
+        registrations = db[COLLECTIONS['event_registrations']]
+        events = db[COLLECTIONS['events']]
+        promoted = 0
+
+        while True:
+            candidate = await registrations.find_one(
+                {"event_id": event_id, "status": RegistrationStatus.WAITLISTED},
+                sort=[("waitlisted_at", 1)]
+            )
+            if not candidate:
+                return promoted
+
+            seated = await events.find_one_and_update(
+                seat_available_filter(event_id),
+                {"$inc": {"current_registrations": 1, "waitlist_count": -1}},
+                projection={"_id": 1}
+            )
+            if not seated:
+                return promoted
+
+            result = await registrations.update_one(
+                {"id": candidate["id"], "status": RegistrationStatus.WAITLISTED},
+                {"$set": {"status": RegistrationStatus.REGISTERED, "updated_at": datetime.utcnow()}}
+            )
+            if result.modified_count:
+                promoted += 1
+            else:
+                # Candidate cancelled concurrently (and already left the waitlist count): give the seat back
+                await events.update_one(
+                    {"id": event_id},
+                    {"$inc": {"current_registrations": -1, "waitlist_count": 1}}
+                )
+
+    @staticmethod
+    async def get_registration(event_id: str, user_id: str) -> EventRegistrationResponse:
+        db = get_database()
+        registration = await db[COLLECTIONS['event_registrations']].find_one({"event_id": event_id, "user_id": user_id})
+        if not registration:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Registration not found"
+            )
+        return await EventRegistrationService._with_position(registration)
+
+    @staticmethod
+    async def _release_seat(event_id: str, claim_id: Optional[str]):
+        """Give back the seat held by a PENDING claim, once, then let the waitlist have it"""
+        if not claim_id:
+            return
+        db = get_database()
+        result = await db[COLLECTIONS['events']].update_one(
+            {"id": event_id, "seat_holds": claim_id},
+            {"$inc": {"current_registrations": -1}, "$pull": {"seat_holds": claim_id}}
+        )
+        if result.modified_count:
+            await EventRegistrationService.promote_waitlist(event_id)
+
+    @staticmethod
+    def _claim_lost() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Registration was cancelled while it was being processed"
+        )
+
+    @staticmethod
+    async def _with_position(registration: dict) -> EventRegistrationResponse:
+        position: Optional[int] = None
+        if registration["status"] == RegistrationStatus.WAITLISTED:
+            db = get_database()
+            ahead = await db[COLLECTIONS['event_registrations']].count_documents({
+                "event_id": registration["event_id"],
+                "status": RegistrationStatus.WAITLISTED,
+                "waitlisted_at": {"$lt": registration["waitlisted_at"]}
+            })
+            position = ahead + 1
+        return EventRegistrationResponse(**registration, waitlist_position=position)
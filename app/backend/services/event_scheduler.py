@@ -0,0 +1,96 @@
+import asyncio
+import os
+from datetime import datetime, date, time, timedelta, timezone
+from typing import Dict, Optional
+from models.event import EventStatus
+from services.business_hours import BusinessHoursService
+from services.cache_service import cache_service
+from database import get_database, COLLECTIONS
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bound between runs, so a missed boundary (clock change, DB outage) is caught up quickly
+EVENT_SCHEDULER_MAX_SLEEP_SECONDS = float(os.getenv("EVENT_SCHEDULER_MAX_SLEEP_SECONDS", "3600"))
+
+class EventScheduler:
+    """Moves events UPCOMING -> ACTIVE -> COMPLETED at date boundaries.
+
+    Dates are the cafe's (``settings.timezone``), not the server's, since
+    event dates are the cafe-local day.
+
+    Each run is a few ``update_many`` calls, idempotent across workers, so every
+    worker can run the scheduler without coordination.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        await self.run_once()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @staticmethod
+    async def run_once(today: Optional[date] = None) -> Dict[str, int]:
+        """Apply all transitions due on ``today`` (default: the cafe's today); returns modified counts per transition"""
+        db = get_database()
+        events = db[COLLECTIONS['events']]
+        if today is None:
+            today = (await BusinessHoursService.get_schedule()).local_now().date()
+        today_start = datetime.combine(today, time.min)
+        tomorrow_start = today_start + timedelta(days=1)
+        now = datetime.utcnow()
+
+        completed = await events.update_many(
+            {
+                "status": {"$in": [EventStatus.UPCOMING, EventStatus.ACTIVE]},
+                "event_date": {"$lt": today_start}
+            },
+            {"$set": {"status": EventStatus.COMPLETED, "updated_at": now}}
+        )
+        activated = await events.update_many(
+            {
+                "status": EventStatus.UPCOMING,
+                "event_date": {"$gte": today_start, "$lt": tomorrow_start}
+            },
+            {"$set": {"status": EventStatus.ACTIVE, "updated_at": now}}
+        )
+
+        counts = {"completed": completed.modified_count, "activated": activated.modified_count}
+        if counts["completed"] or counts["activated"]:
+            cache_service.invalidate("events")
+            logger.info(f"Event status transitions applied: {counts}")
+        return counts
+
+    @staticmethod
+    def seconds_until_next_run(now: datetime) -> float:
+        """Seconds from ``now`` (aware, in the cafe's timezone) to its next local midnight"""
+        next_midnight = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=now.tzinfo)
+        # Compared in UTC so a DST change in between is counted; small offset so the run lands on the new date
+        remaining = next_midnight.astimezone(timezone.utc) - now.astimezone(timezone.utc)
+        return min(remaining.total_seconds() + 1, EVENT_SCHEDULER_MAX_SLEEP_SECONDS)
+
+    async def _loop(self):
+        while True:
+            try:
+                now = (await BusinessHoursService.get_schedule()).local_now()
+                delay = self.seconds_until_next_run(now)
+            except Exception as e:
+                logger.warning(f"Event status scheduler could not read the cafe timezone: {e}")
+                delay = EVENT_SCHEDULER_MAX_SLEEP_SECONDS
+            await asyncio.sleep(delay)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"Event status scheduler run failed: {e}")
+
+event_scheduler = EventScheduler()
@@ -0,0 +1,126 @@
+import asyncio
+import os
+from datetime import datetime
+from typing import Dict, Optional, Set
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+from services.cache_service import cache_service
+from database import get_database, COLLECTIONS
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on staleness when change streams are unavailable
+INVALIDATION_POLL_SECONDS = float(os.getenv("INVALIDATION_POLL_SECONDS", "1"))
+INVALIDATION_USE_CHANGE_STREAMS = os.getenv("INVALIDATION_USE_CHANGE_STREAMS", "true").lower() == "true"
+# Polling rounds before retrying a change stream that broke (e.g. primary step-down)
+CHANGE_STREAM_RETRY_POLLS = 30
+
+class InvalidationBus:
+    """Propagates cache invalidations between workers.
+
+    Each namespace has a version counter in the ``cache_versions`` collection.
+    Local invalidations bump it; every worker follows the collection (change
+    stream on replica sets, otherwise polling every INVALIDATION_POLL_SECONDS)
+    and invalidates its own cache when it sees a version it has not applied.
+    """
+
+    def __init__(self):
+        self._known: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+        self.mode = "stopped"
+
+    async def start(self):
+        await self._poll(apply=False)
+        cache_service.add_broadcaster(self._on_local_invalidate)
+        self._task = asyncio.create_task(self._follow())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        self.mode = "stopped"
+
+    def _on_local_invalidate(self, namespace: str):
+        try:
+            task = asyncio.get_running_loop().create_task(self.publish(namespace))
+        except RuntimeError:
+            return  # No loop (e.g. CLI scripts): nothing to broadcast to
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def publish(self, namespace: str):
+        """Bump a namespace version so other workers invalidate it"""
+        try:
+            db = get_database()
+            doc = await db[COLLECTIONS['cache_versions']].find_one_and_update(
+                {"_id": namespace},
+                {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            # Our own bump is already applied locally; if another worker bumped in
+            # between, its invalidation may have raced ours, so apply it again
+            if doc["version"] - 1 > self._known.get(namespace, 0):
+                cache_service.invalidate(namespace, broadcast=False)
+            self._known[namespace] = max(self._known.get(namespace, 0), doc["version"])
+        except Exception as e:
+            logger.warning(f"Failed to publish invalidation for {namespace}: {e}")
+
+    def _apply(self, namespace: str, version: int, apply: bool = True):
+        if version > self._known.get(namespace, 0):
+            self._known[namespace] = version
+            if apply:
+                cache_service.invalidate(namespace, broadcast=False)
+
+    async def _poll(self, apply: bool = True):
+        db = get_database()
+        async for doc in db[COLLECTIONS['cache_versions']].find({}, {"version": 1}):
+            self._apply(doc["_id"], doc.get("version", 0), apply)
+
+    async def _follow(self):
+        use_change_streams = INVALIDATION_USE_CHANGE_STREAMS
+        while True:
+            if not use_change_streams:
+                await self._poll_loop()
+            try:
+                await self._watch()
+            except OperationFailure as e:
+                # Standalone servers do not support change streams
+                logger.info(f"Change streams unavailable, polling cache versions: {e}")
+                use_change_streams = False
+            except Exception as e:
+                logger.warning(f"Cache version change stream failed, polling: {e}")
+                await self._poll_loop(CHANGE_STREAM_RETRY_POLLS)
+
+    async def _watch(self):
+        db = get_database()
+        async with db[COLLECTIONS['cache_versions']].watch(full_document="updateLookup") as stream:
+            self.mode = "change_stream"
+            # Catch up on anything missed before the stream opened
+            await self._poll()
+            async for change in stream:
+                document = change.get("fullDocument")
+                if document:
+                    self._apply(document["_id"], document.get("version", 0))
+
+    async def _poll_loop(self, iterations: Optional[int] = None):
+        """Poll until cancelled (or for ``iterations`` rounds when retrying change streams)"""
+        self.mode = "polling"
+        rounds = 0
+        while iterations is None or rounds < iterations:
+            rounds += 1
+            await asyncio.sleep(INVALIDATION_POLL_SECONDS)
+            try:
+                await self._poll()
+            except Exception as e:
+                logger.warning(f"Failed to poll cache versions: {e}")
+
+invalidation_bus = InvalidationBus()
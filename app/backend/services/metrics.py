@@ -0,0 +1,280 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+from pymongo import monitoring
+from services.cache_service import cache_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; covers cached reads (sub-millisecond) up to SMTP/Stripe timeouts
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Sharded:
+    """Per-thread storage, so writers never share a dict and need no lock.
+
+    Request handlers all run on the event loop thread; pymongo command
+    listeners and executor jobs run on their own threads. Each thread only
+    ever writes its own shard, and a scrape sums the shards.
+    """
+
+    def __init__(self):
+        self._shards: Dict[int, dict] = {}
+
+    def _shard(self) -> dict:
+        ident = threading.get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            shard = self._shards.setdefault(ident, {})
+        return shard
+
+    def _snapshot(self) -> List[dict]:
+        return [dict(shard) for shard in list(self._shards.values())]
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+
+    def inc(self, *label_values: str, amount: float = 1):
+        shard = self._shard()
+        shard[label_values] = shard.get(label_values, 0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._snapshot():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in sorted(self.values().items())]
+
+class Gauge:
+    """Current value; only ever set from the event loop thread"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) - amount
+
+    def set(self, value: float, *label_values: str):
+        self._values[label_values] = value
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in sorted(self._values.items())]
+
+class CopiedCounter(Gauge):
+    """Counter kept elsewhere (e.g. cache_service.hits) and copied in by a collector"""
+    kind = "counter"
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values: str):
+        shard = self._shard()
+        series = shard.get(label_values)
+        if series is None:
+            # Per-bucket (non-cumulative) counts, then sum; cumulated at scrape time
+            series = shard[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, *label_values: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def render(self) -> List[str]:
+        merged: Dict[LabelValues, List[float]] = {}
+        for shard in self._snapshot():
+            for key, series in shard.items():
+                total = merged.setdefault(key, [0] * len(series))
+                for index, value in enumerate(series):
+                    total[index] += value
+
+        lines = []
+        for key, series in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """Collects metrics and renders them in the Prometheus text format (0.0.4)"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def copied_counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> CopiedCounter:
+        return self._register(CopiedCounter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Run ``collector`` before each scrape, to copy values kept elsewhere into gauges"""
+        self._collectors.append(collector)
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+# HTTP
+http_requests_total = metrics.counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_request_duration = metrics.histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+http_requests_in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests currently being handled")
+
+# Admission control (queue depth and in-flight copied from the limiters at scrape time)
+admission_in_flight = metrics.gauge("admission_in_flight", "Admitted requests currently running, by route class", ("route_class",))
+admission_queue_depth = metrics.gauge("admission_queue_depth", "Requests waiting for a slot, by route class", ("route_class",))
+admission_queue_wait = metrics.histogram("admission_queue_wait_seconds", "Time queued before admission", ("route_class",))
+admission_rejected = metrics.counter("admission_rejected_total", "Requests shed with 503, by route class and reason", ("route_class", "reason"))
+
+# MongoDB (recorded by a pymongo command listener, on driver threads)
+db_command_duration = metrics.histogram("mongodb_command_duration_seconds", "MongoDB command latency", ("command", "collection"))
+db_command_failures = metrics.counter("mongodb_command_failures_total", "Failed MongoDB commands", ("command", "collection"))
+
+# Stripe and SMTP
+external_call_duration = metrics.histogram("external_call_duration_seconds", "Latency of calls to Stripe and SMTP", ("service", "operation"))
+external_call_failures = metrics.counter("external_call_failures_total", "Failed calls to Stripe and SMTP", ("service", "operation"))
+
+# Circuit breakers around Stripe and SMTP (state copied from the breakers at scrape time)
+circuit_breaker_state = metrics.gauge("circuit_breaker_state", "Breaker state by dependency: 0 closed, 1 half-open, 2 open", ("dependency",))
+circuit_breaker_transitions = metrics.counter("circuit_breaker_transitions_total", "Breaker state changes by dependency and new state", ("dependency", "state"))
+circuit_breaker_rejected = metrics.counter("circuit_breaker_rejected_total", "Calls failed fast by an open breaker", ("dependency",))
+email_outbox_queued = metrics.counter("email_outbox_queued_total", "Emails queued for a later retry instead of sent")
+email_outbox_sent = metrics.counter("email_outbox_sent_total", "Queued emails delivered by the outbox worker")
+
+# Tracing
+traces_dropped = metrics.counter("traces_dropped_total", "Finished traces dropped because the export queue was full")
+
+# Log pipeline
+log_records_dropped = metrics.counter("log_records_dropped_total", "Log records dropped by sampling, rate limits or a full queue", ("reason",))
+
+# In-process cache, copied from cache_service at scrape time
+cache_hits = metrics.copied_counter("cache_hits_total", "Cache hits by namespace since start", ("namespace",))
+cache_misses = metrics.copied_counter("cache_misses_total", "Cache misses by namespace since start", ("namespace",))
+cache_hit_ratio = metrics.gauge("cache_hit_ratio", "Cache hits over lookups by namespace", ("namespace",))
+
+# Decoded JWT cache, copied from auth_service's token_cache at scrape time
+token_cache_hits = metrics.copied_counter("token_cache_hits_total", "Access token verifications served from the cache")
+token_cache_misses = metrics.copied_counter("token_cache_misses_total", "Access token verifications that decoded the JWT")
+token_cache_hit_ratio = metrics.gauge("token_cache_hit_ratio", "Token cache hits over lookups")
+token_cache_size = metrics.gauge("token_cache_entries", "Decoded tokens currently cached")
+token_cache_evictions = metrics.copied_counter("token_cache_evictions_total", "Tokens evicted to stay within TOKEN_CACHE_SIZE")
+
+@contextmanager
+def track_external_call(service: str, operation: str):
+    """Time a call to an external dependency, counting it as failed if it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        external_call_failures.inc(service, operation)
+        raise
+    finally:
+        external_call_duration.observe(time.perf_counter() - start, service, operation)
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Records MongoDB command latency by command and collection"""
+
+    def __init__(self):
+        # request_id -> collection, between a command's started and finished events
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):
+            target = event.command.get("collection", "")
+        self._collections[event.request_id] = target if isinstance(target, str) else ""
+
+    def succeeded(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        db_command_duration.observe(event.duration_micros / 1e6, event.command_name, collection)
+
+    def failed(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        db_command_duration.observe(event.duration_micros / 1e6, event.command_name, collection)
+        db_command_failures.inc(event.command_name, collection)
+
+db_command_listener = CommandMetricsListener()
+
+def _collect_cache_stats():
+    for namespace in set(cache_service.hits) | set(cache_service.misses):
+        hits = cache_service.hits.get(namespace, 0)
+        misses = cache_service.misses.get(namespace, 0)
+        cache_hits.set(hits, namespace)
+        cache_misses.set(misses, namespace)
+        cache_hit_ratio.set(hits / (hits + misses) if hits + misses else 0.0, namespace)
+
+metrics.add_collector(_collect_cache_stats)
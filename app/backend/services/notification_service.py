@@ -1,14 +1,39 @@
+import asyncio
 import smtplib
 import os
+from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from database import get_database, COLLECTIONS
 from models.order import Order, OrderStatus
 from models.user import User
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.metrics import track_external_call, email_outbox_queued, email_outbox_sent
+from services.tracing import traced
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Without a timeout smtplib waits on a dead server indefinitely
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "10"))
+EMAIL_OUTBOX_INTERVAL_SECONDS = float(os.getenv("EMAIL_OUTBOX_INTERVAL_SECONDS", "30"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "10"))
+EMAIL_OUTBOX_BATCH_SIZE = 50
+# A claimed email whose worker died is picked up again after this
+EMAIL_OUTBOX_LEASE = timedelta(minutes=2)
+
+def is_transient_smtp_error(error: BaseException) -> bool:
+    """Worth retrying later: timeouts, refused or dropped connections and 4xx replies"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    # smtplib.SMTPException is an OSError too, so this also covers SMTPServerDisconnected
+    return isinstance(error, OSError)
+
+smtp_breaker = CircuitBreaker("smtp", is_failure=is_transient_smtp_error)
+
 class NotificationService:
     
     def __init__(self):
@@ -18,43 +43,89 @@ class NotificationService:
         self.email_username = os.getenv("EMAIL_USERNAME", "")
         self.email_password = os.getenv("EMAIL_PASSWORD", "")
         self.from_email = os.getenv("FROM_EMAIL", "noreply@nanacafe.com")
+        # Local relays and test sinks usually speak plain SMTP
+        self.smtp_starttls = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
     
+    @traced("notification.send_email")
     async def send_email(self, to_email: str, subject: str, body: str, html_body: Optional[str] = None) -> bool:
-        """Send email notification"""
+        """Send email notification; queued for a later retry while SMTP is unavailable"""
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            
-            # Add plain text part
-            text_part = MIMEText(body, 'plain')
-            msg.attach(text_part)
-            
-            # Add HTML part if provided
-            if html_body:
-                html_part = MIMEText(html_body, 'html')
-                msg.attach(html_part)
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                if self.email_username and self.email_password:
-                    server.login(self.email_username, self.email_password)
-                server.send_message(msg)
-            
+            await self.deliver(to_email, subject, body, html_body)
             logger.info(f"Email sent successfully to {to_email}")
             return True
             
+        except CircuitOpenError:
+            logger.warning(f"SMTP circuit open, queueing email to {to_email}")
+            await self.queue_email(to_email, subject, body, html_body)
+            return False
         except Exception as e:
-            logger.error(f"Error sending email to {to_email}: {e}")
+            if is_transient_smtp_error(e):
+                logger.warning(f"Error sending email to {to_email}, queued for retry: {e}")
+                await self.queue_email(to_email, subject, body, html_body, str(e))
+            else:
+                logger.error(f"Error sending email to {to_email}: {e}")
             return False
     
+    async def deliver(self, to_email: str, subject: str, body: str, html_body: Optional[str] = None):
+        """Build and send one message through the SMTP breaker; raises on failure"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = self.from_email
+        msg['To'] = to_email
+        
+        # Add plain text part
+        text_part = MIMEText(body, 'plain')
+        msg.attach(text_part)
+        
+        # Add HTML part if provided
+        if html_body:
+            html_part = MIMEText(html_body, 'html')
+            msg.attach(html_part)
+        
+        # smtplib blocks for up to SMTP_TIMEOUT per step, so it runs in a thread;
+        # the breaker is entered and its outcome recorded back here on the loop
+        with smtp_breaker.call(), track_external_call("smtp", "send_email"):
+            await asyncio.to_thread(self._send, msg)
+    
+    def _send(self, msg: MIMEMultipart):
+        with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=SMTP_TIMEOUT) as server:
+            if self.smtp_starttls:
+                server.starttls()
+            if self.email_username and self.email_password:
+                server.login(self.email_username, self.email_password)
+            server.send_message(msg)
+    
+    @staticmethod
+    async def queue_email(to_email: str, subject: str, body: str, html_body: Optional[str] = None, error: Optional[str] = None):
+        """Store an email in the outbox for EmailOutbox to deliver later"""
+        try:
+            now = datetime.utcnow()
+            await get_database()[COLLECTIONS['email_outbox']].insert_one({
+                "to_email": to_email,
+                "subject": subject,
+                "body": body,
+                "html_body": html_body,
+                "status": "queued",
+                "attempts": 0,
+                "last_error": error,
+                "created_at": now,
+                "next_attempt_at": now
+            })
+            email_outbox_queued.inc()
+        except Exception as e:
+            logger.error(f"Failed to queue email to {to_email}: {e}")
+    
+    @traced("notification.send_order_confirmation")
     async def send_order_confirmation(self, order: Order) -> bool:
         """Send order confirmation email"""
         if not order.customer_email:
             return False
-            
+        
+        subject, body = self.render_order_confirmation(order)
+        return await self.send_email(order.customer_email, subject, body)
+    
+    def render_order_confirmation(self, order: Order) -> Tuple[str, str]:
+        """Subject and body of the order confirmation email"""
         subject = f"Order Confirmation - Nana Cafe #{order.order_number}"
         
         # Create order items list
@@ -69,14 +140,14 @@ class NotificationService:
             delivery_info = f"""
 Delivery Information:
 - Address: {order.delivery_info.delivery_address}
-- Date: {order.delivery_info.delivery_date}
+- Date: {order.delivery_info.delivery_date.date()}
 - Time: {order.delivery_info.delivery_time_slot}
 - Contact: {order.delivery_info.contact_number}
 """
         elif order.order_type.value == "pickup" and order.pickup_info:
             delivery_info = f"""
 Pickup Information:
-- Date: {order.pickup_info.pickup_date}
+- Date: {order.pickup_info.pickup_date.date()}
 - Time: {order.pickup_info.pickup_time_slot}  
 - Contact: {order.pickup_info.contact_number}
 """
@@ -108,13 +179,19 @@ Best regards,
 Nana Cafe Team
 """
         
-        return await self.send_email(order.customer_email, subject, body)
+        return subject, body
     
+    @traced("notification.send_status_update")
     async def send_status_update(self, order: Order, new_status: OrderStatus) -> bool:
         """Send order status update email"""
         if not order.customer_email:
             return False
-            
+        
+        subject, body = self.render_status_update(order, new_status)
+        return await self.send_email(order.customer_email, subject, body)
+    
+    def render_status_update(self, order: Order, new_status: OrderStatus) -> Tuple[str, str]:
+        """Subject and body of the status update email"""
         subject = f"Order Update - Nana Cafe #{order.order_number}"
         
         status_messages = {
@@ -145,12 +222,18 @@ Best regards,
 Nana Cafe Team
 """
         
-        return await self.send_email(order.customer_email, subject, body)
+        return subject, body
     
+    @traced("notification.send_admin_notification")
     async def send_admin_notification(self, order: Order) -> bool:
         """Send new order notification to admin"""
         admin_email = os.getenv("ADMIN_EMAIL", "admin@nanacafe.com")
         
+        subject, body = self.render_admin_notification(order)
+        return await self.send_email(admin_email, subject, body)
+    
+    def render_admin_notification(self, order: Order) -> Tuple[str, str]:
+        """Subject and body of the new order email to the admin"""
         subject = f"New Order Received - #{order.order_number}"
         
         items_text = "\
@@ -174,4 +257,82 @@ Items:
 Please log in to the admin panel to manage this order.
 """
         
-        return await self.send_email(admin_email, subject, body)
+        return subject, body
+
+class EmailOutbox:
+    """Retries queued emails in the background once SMTP is reachable again.
+
+    Each email is claimed by pushing its next attempt past a lease, so several
+    workers can drain the outbox together. Transient failures back off
+    exponentially; permanent ones, or too many attempts, mark it failed.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._notifications = NotificationService()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_once(self) -> int:
+        """Deliver due emails until the outbox is empty or SMTP fails; returns how many were sent"""
+        outbox = get_database()[COLLECTIONS['email_outbox']]
+        sent = 0
+        for _ in range(EMAIL_OUTBOX_BATCH_SIZE):
+            now = datetime.utcnow()
+            email = await outbox.find_one_and_update(
+                {"status": "queued", "next_attempt_at": {"$lte": now}},
+                {"$set": {"next_attempt_at": now + EMAIL_OUTBOX_LEASE}},
+                sort=[("next_attempt_at", 1)]
+            )
+            if email is None:
+                break
+
+            try:
+                await self._notifications.deliver(email["to_email"], email["subject"], email["body"], email.get("html_body"))
+            except CircuitOpenError:
+                # Hand it back untouched and wait for the breaker to close
+                await outbox.update_one({"_id": email["_id"]}, {"$set": {"next_attempt_at": now}})
+                break
+            except Exception as e:
+                attempts = email["attempts"] + 1
+                failed = attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS or not is_transient_smtp_error(e)
+                await outbox.update_one({"_id": email["_id"]}, {"$set": {
+                    "status": "failed" if failed else "queued",
+                    "attempts": attempts,
+                    "last_error": str(e),
+                    "next_attempt_at": now + timedelta(seconds=min(30 * 2 ** attempts, 3600))
+                }})
+                if failed:
+                    logger.error(f"Giving up on queued email to {email['to_email']} after {attempts} attempts: {e}")
+                    continue
+                break
+
+            await outbox.delete_one({"_id": email["_id"]})
+            email_outbox_sent.inc()
+            sent += 1
+
+        if sent:
+            logger.info(f"Delivered {sent} queued emails")
+        return sent
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(EMAIL_OUTBOX_INTERVAL_SECONDS)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email outbox run failed: {e}")
+
+email_outbox = EmailOutbox()
@@ -1,24 +1,66 @@
+import asyncio
 import stripe
 import os
 from typing import Optional, Dict, Any
 from models.order import Order, PaymentStatus
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.metrics import track_external_call
+from services.tracing import traced
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Set Stripe API key (you'll need to add this to environment variables)
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "sk_test_...")
+# Point at stripe-mock or a local stand-in for load tests
+stripe.api_base = os.getenv("STRIPE_API_BASE", stripe.api_base)
+# Stripe's default is 80s; a hung connection should fail (and count against the breaker) sooner
+STRIPE_TIMEOUT = float(os.getenv("STRIPE_TIMEOUT", "10"))
+stripe.default_http_client = stripe.new_default_http_client(timeout=STRIPE_TIMEOUT)
+# Retry-After suggested when Stripe fails before its breaker has opened
+STRIPE_RETRY_AFTER = 5
+
+class PaymentUnavailableError(Exception):
+    """Stripe is down or its breaker is open; the request can be retried later"""
+    
+    def __init__(self, retry_after: int = STRIPE_RETRY_AFTER):
+        super().__init__(f"Payment provider unavailable; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+def is_stripe_outage(error: BaseException) -> bool:
+    """Connection failures, timeouts, 5xx and rate limiting; card and request errors mean Stripe is up"""
+    return isinstance(error, (stripe.error.APIConnectionError, stripe.error.APIError, stripe.error.RateLimitError))
+
+stripe_breaker = CircuitBreaker("stripe", is_failure=is_stripe_outage)
 
 class PaymentService:
     
     @staticmethod
+    async def _call_stripe(operation: str, func, **params):
+        """Call Stripe through its breaker; outages raise PaymentUnavailableError"""
+        try:
+            # The Stripe client blocks, so it runs in a thread; the breaker stays on the loop
+            with stripe_breaker.call(), track_external_call("stripe", operation):
+                return await asyncio.to_thread(func, **params)
+        except CircuitOpenError as e:
+            raise PaymentUnavailableError(e.retry_after)
+        except stripe.error.StripeError as e:
+            if is_stripe_outage(e):
+                logger.error(f"Stripe unavailable during {operation}: {e}")
+                raise PaymentUnavailableError() from e
+            raise
+    
+    @staticmethod
+    @traced("payment.create_payment_intent")
     async def create_payment_intent(order: Order) -> Optional[Dict[str, Any]]:
         """Create Stripe payment intent for order"""
         try:
             # Convert PHP pesos to centavos (Stripe uses smallest currency unit)
             amount_in_centavos = int(order.total_amount * 100)
             
-            payment_intent = stripe.PaymentIntent.create(
+            payment_intent = await PaymentService._call_stripe(
+                "create_payment_intent",
+                stripe.PaymentIntent.create,
                 amount=amount_in_centavos,
                 currency='php',  # Philippine Peso
                 metadata={
@@ -36,6 +78,8 @@ class PaymentService:
                 'status': payment_intent.status
             }
             
+        except PaymentUnavailableError:
+            raise
         except stripe.error.StripeError as e:
             logger.error(f"Stripe error creating payment intent: {e}")
             return None
@@ -44,10 +88,11 @@ class PaymentService:
             return None
     
     @staticmethod
+    @traced("payment.confirm_payment")
     async def confirm_payment(payment_intent_id: str) -> Optional[Dict[str, Any]]:
         """Confirm payment intent status"""
         try:
-            payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            payment_intent = await PaymentService._call_stripe("retrieve_payment_intent", stripe.PaymentIntent.retrieve, id=payment_intent_id)
             
             return {
                 'payment_intent_id': payment_intent.id,
@@ -56,6 +101,8 @@ class PaymentService:
                 'metadata': payment_intent.metadata
             }
             
+        except PaymentUnavailableError:
+            raise
         except stripe.error.StripeError as e:
             logger.error(f"Stripe error confirming payment: {e}")
             return None
@@ -64,6 +111,7 @@ class PaymentService:
             return None
     
     @staticmethod
+    @traced("payment.refund_payment")
     async def refund_payment(payment_intent_id: str, amount: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """Refund payment"""
         try:
@@ -73,7 +121,7 @@ class PaymentService:
             if amount:
                 refund_data['amount'] = amount
                 
-            refund = stripe.Refund.create(**refund_data)
+            refund = await PaymentService._call_stripe("create_refund", stripe.Refund.create, **refund_data)
             
             return {
                 'refund_id': refund.id,
@@ -81,6 +129,8 @@ class PaymentService:
                 'amount': refund.amount
             }
             
+        except PaymentUnavailableError:
+            raise
         except stripe.error.StripeError as e:
             logger.error(f"Stripe error creating refund: {e}")
             return None
@@ -0,0 +1,129 @@
+import math
+import os
+import time
+from typing import Dict, Tuple
+from datetime import datetime, timedelta
+from fastapi import HTTPException, Request, status
+from pymongo import ReturnDocument
+from database import get_database, COLLECTIONS
+import logging
+
+logger = logging.getLogger(__name__)
+
+# "memory" keeps counters per worker; "mongo" shares them across workers
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "false").lower() == "true"
+
+class InMemoryRateLimitStore:
+    """Per-process fixed-window counters: key -> (window index, count in window, count in previous window)"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._counters: Dict[str, Tuple[int, int, int]] = {}
+
+    async def increment(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        """Count a hit in ``window``; returns (current window count, previous window count)"""
+        current_window, current, previous = self._counters.get(key, (window, 0, 0))
+        if current_window != window:
+            previous = current if current_window == window - 1 else 0
+            current = 0
+        current += 1
+        self._counters[key] = (window, current, previous)
+
+        if len(self._counters) > self.max_keys:
+            self._prune(window)
+        return current, previous
+
+    def _prune(self, window: int):
+        # Anything older than the previous window no longer contributes to a decision
+        self._counters = {k: v for k, v in self._counters.items() if v[0] >= window - 1}
+
+class MongoRateLimitStore:
+    """Shared counters in the rate_limits collection, one document per key and window"""
+
+    async def increment(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        db = get_database()
+        collection = db[COLLECTIONS['rate_limits']]
+        expires_at = datetime.utcfromtimestamp((window + 2) * window_seconds)
+
+        current_doc = await collection.find_one_and_update(
+            {"_id": f"{key}:{window}"},
+            {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": expires_at}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        previous_doc = await collection.find_one({"_id": f"{key}:{window - 1}"}, {"count": 1})
+        return current_doc["count"], previous_doc["count"] if previous_doc else 0
+
+def _create_store():
+    if RATE_LIMIT_STORE == "mongo":
+        return MongoRateLimitStore()
+    return InMemoryRateLimitStore()
+
+rate_limit_store = _create_store()
+
+def get_client_ip(request: Request) -> str:
+    """Client address, honouring X-Forwarded-For only behind a trusted proxy"""
+    if TRUST_PROXY_HEADERS:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+class RateLimiter:
+    """Sliding-window limiter.
+
+    Uses the sliding window counter approximation: the previous fixed window's
+    count is weighted by how much of it still overlaps the sliding window, so
+    each key needs two counters instead of a log of timestamps.
+
+    An instance can be used directly as a FastAPI dependency (limits by client
+    IP) or called with ``check(key)`` for other keys such as an email address.
+    """
+
+    def __init__(self, name: str, limit: int, window_seconds: int = 60, store=None):
+        self.name = name
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.store = store or rate_limit_store
+
+    async def hit(self, key: str) -> Tuple[bool, int]:
+        """Record an attempt; returns (allowed, seconds until retry)"""
+        now = time.time()
+        window = int(now // self.window_seconds)
+        current, previous = await self.store.increment(f"{self.name}:{key}", window, self.window_seconds)
+
+        elapsed = (now % self.window_seconds) / self.window_seconds
+        estimated = previous * (1 - elapsed) + current
+        if estimated <= self.limit:
+            return True, 0
+
+        retry_after = max(1, math.ceil(self.window_seconds * (1 - elapsed)))
+        return False, retry_after
+
+    async def check(self, key: str):
+        """Raise 429 if ``key`` is over the limit"""
+        if not RATE_LIMIT_ENABLED:
+            return
+        try:
+            allowed, retry_after = await self.hit(key)
+        except Exception as e:
+            # Fail open: a broken limiter store must not lock everyone out
+            logger.warning(f"Rate limiter {self.name} unavailable: {e}")
+            return
+
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(retry_after)}
+            )
+
+    async def __call__(self, request: Request):
+        await self.check(get_client_ip(request))
+
+# Limits for authentication endpoints
+login_ip_limiter = RateLimiter("login-ip", limit=int(os.getenv("LOGIN_RATE_LIMIT_IP", "20")), window_seconds=60)
+login_email_limiter = RateLimiter("login-email", limit=int(os.getenv("LOGIN_RATE_LIMIT_EMAIL", "5")), window_seconds=60)
+register_ip_limiter = RateLimiter("register-ip", limit=int(os.getenv("REGISTER_RATE_LIMIT_IP", "5")), window_seconds=60)
@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Optional, Iterable
+from database import get_database, COLLECTIONS
+import logging
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+# Overlap between sync windows to tolerate clock skew between workers
+REVOCATION_SYNC_OVERLAP = timedelta(seconds=30)
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings using double hashing of one blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        # Standard sizing: m = -n ln(p) / (ln 2)^2, k = (m / n) ln 2
+        ln2 = math.log(2)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (ln2 * ln2)))
+        self.hash_count = max(1, int(round(self.size / capacity * ln2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str):
+        if item in self:
+            return
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        for pos in self._positions(item):
+            if not self.bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+class RevocationList:
+    """Denylist of revoked token ids.
+
+    Membership is checked against an in-memory bloom filter, so the common case
+    (token not revoked) costs a few hash probes and no I/O. Bloom positives are
+    confirmed against the ``revoked_tokens`` collection. Each worker polls the
+    collection for entries revoked by other workers and adds them to its filter.
+    Whole refresh token families are revoked through a ``family:<id>`` entry,
+    matched against the ``fam`` claim of access tokens.
+    """
+
+    def __init__(self, capacity: int = REVOCATION_BLOOM_CAPACITY, error_rate: float = REVOCATION_BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.last_sync: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Load unexpired revocations and start the background sync loop"""
+        await self.rebuild()
+        self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def rebuild(self):
+        """Rebuild the filter from every unexpired revocation in the database"""
+        db = get_database()
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        last_sync = datetime.utcnow()
+        cursor = db[COLLECTIONS['revoked_tokens']].find(
+            {"expires_at": {"$gt": datetime.utcnow()}},
+            {"jti": 1, "_id": 0}
+        )
+        async for doc in cursor:
+            bloom.add(doc["jti"])
+        self.bloom = bloom
+        self.last_sync = last_sync
+        logger.info(f"Loaded {bloom.count} revoked tokens into denylist")
+
+    async def sync(self):
+        """Pull revocations recorded since the last sync (possibly by other workers)"""
+        db = get_database()
+        since = (self.last_sync - REVOCATION_SYNC_OVERLAP) if self.last_sync else datetime.min
+        now = datetime.utcnow()
+        cursor = db[COLLECTIONS['revoked_tokens']].find(
+            {"revoked_at": {"$gte": since}},
+            {"jti": 1, "_id": 0}
+        )
+        async for doc in cursor:
+            self.bloom.add(doc["jti"])
+        self.last_sync = now
+
+        # Rebuild once the filter is past capacity so the false-positive rate stays bounded
+        if self.bloom.count > self.capacity:
+            await self.rebuild()
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(REVOCATION_SYNC_SECONDS)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Failed to sync token denylist: {e}")
+
+    async def revoke(self, jti: str, expires_at: datetime, reason: Optional[str] = None):
+        """Revoke a token id until its natural expiry"""
+        db = get_database()
+        await db[COLLECTIONS['revoked_tokens']].update_one(
+            {"jti": jti},
+            {"$setOnInsert": {
+                "jti": jti,
+                "expires_at": expires_at,
+                "revoked_at": datetime.utcnow(),
+                "reason": reason
+            }},
+            upsert=True
+        )
+        self.bloom.add(jti)
+
+    async def is_revoked(self, jti: Optional[str]) -> bool:
+        """O(1) negative check; positives are confirmed in the database"""
+        if not jti or jti not in self.bloom:
+            return False
+        db = get_database()
+        doc = await db[COLLECTIONS['revoked_tokens']].find_one({"jti": jti}, {"_id": 1})
+        return doc is not None
+
+    @staticmethod
+    def family_key(family_id: str) -> str:
+        """Denylist entry covering every access token issued in a refresh token family"""
+        return f"family:{family_id}"
+
+    async def revoke_family(self, family_id: str, expires_at: datetime, reason: Optional[str] = None):
+        """Revoke the access tokens of a family; ``expires_at`` must cover the newest one"""
+        await self.revoke(self.family_key(family_id), expires_at, reason)
+
+    async def is_token_revoked(self, payload: dict) -> bool:
+        """Whether an access token was revoked itself or through its refresh token family"""
+        if await self.is_revoked(payload.get("jti")):
+            return True
+        family_id = payload.get("fam")
+        return bool(family_id) and await self.is_revoked(self.family_key(family_id))
+
+revocation_list = RevocationList()
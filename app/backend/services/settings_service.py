@@ -0,0 +1,66 @@
+import asyncio
+from typing import Optional
+from models.settings import CafeSettings
+from services.cache_service import cache_service
+from database import get_database, COLLECTIONS
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTACT_EMAIL = "admin@nanacafe.com"
+# Safety net in case an invalidation is lost (e.g. the bus was down)
+SETTINGS_CACHE_TTL = 300
+
+class SettingsService:
+    """Cafe settings read through the in-process cache (namespace ``settings``).
+    
+    ``snapshot`` always holds the last loaded settings for synchronous readers
+    such as middleware; it is refreshed in the background whenever the settings
+    namespace is invalidated (locally or by another worker).
+    """
+    
+    snapshot: Optional[CafeSettings] = None
+    _refresh_task: Optional[asyncio.Task] = None
+    
+    @staticmethod
+    def start_snapshot_refresh():
+        """Refresh the snapshot after every settings invalidation"""
+        cache_service.on_invalidate("settings", SettingsService._schedule_refresh)
+    
+    @staticmethod
+    def _schedule_refresh(namespace: str):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        SettingsService._refresh_task = loop.create_task(SettingsService._refresh())
+    
+    @staticmethod
+    async def _refresh():
+        try:
+            await SettingsService.get_settings()
+        except Exception as e:
+            logger.warning(f"Failed to refresh settings snapshot: {e}")
+    
+    @staticmethod
+    async def get_settings() -> CafeSettings:
+        settings = cache_service.get("settings", "current")
+        if settings is not None:
+            return settings
+        
+        # An invalidation during the read below means the result may be stale: do not cache it
+        version = cache_service.version("settings")
+        db = get_database()
+        settings_data = await db[COLLECTIONS['settings']].find_one({})
+        
+        if settings_data:
+            settings = CafeSettings(**settings_data)
+        else:
+            # Create default settings if none exist
+            settings = CafeSettings(contact_email=DEFAULT_CONTACT_EMAIL)
+            await db[COLLECTIONS['settings']].insert_one(settings.dict())
+        
+        if version == cache_service.version("settings"):
+            cache_service.set("settings", "current", settings, ttl=SETTINGS_CACHE_TTL)
+            SettingsService.snapshot = settings
+        return settings
@@ -0,0 +1,140 @@
+import os
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError
+from models.order import OrderCreate, OrderType
+from models.settings import CafeSettings
+from services.business_hours import BusinessHoursService
+from services.cache_service import cache_service
+from services.settings_service import SettingsService
+from database import get_database, COLLECTIONS
+import logging
+
+logger = logging.getLogger(__name__)
+
+# How long a worker trusts its copy of a day's counters before re-reading them
+TIME_SLOT_COUNTERS_TTL = float(os.getenv("TIME_SLOT_COUNTERS_TTL", "5"))
+
+class TimeSlotService:
+    """Per-date, per-slot order capacity.
+
+    Reservations live in ``slot_reservations`` as one counter document per
+    (date, slot). A reservation is a single conditional upsert that only
+    increments while ``reserved < capacity``; when the slot is full the upsert
+    collides with the existing ``_id`` and is rejected, so the kitchen's
+    capacity can never be oversold. Availability is served from a short-lived
+    per-worker copy of each day's counters.
+    """
+
+    @staticmethod
+    def slot_key(service_date: date, slot: str) -> str:
+        return f"{service_date.isoformat()}|{slot}"
+
+    @staticmethod
+    def capacity_for(settings: CafeSettings, slot: str) -> int:
+        return settings.time_slot_capacities.get(slot, settings.time_slot_capacity)
+
+    @staticmethod
+    def requested_slot(order_data: OrderCreate) -> Optional[Tuple[date, str]]:
+        """The (date, slot) an order asks for, if any"""
+        if order_data.order_type == OrderType.DELIVERY and order_data.delivery_info:
+            return order_data.delivery_info.delivery_date.date(), order_data.delivery_info.delivery_time_slot
+        if order_data.order_type == OrderType.PICKUP and order_data.pickup_info:
+            return order_data.pickup_info.pickup_date.date(), order_data.pickup_info.pickup_time_slot
+        return None
+
+    @staticmethod
+    def parse_key(key: str) -> Tuple[date, str]:
+        date_part, slot = key.split("|", 1)
+        return date.fromisoformat(date_part), slot
+
+    @staticmethod
+    async def reserve(service_date: date, slot: str, allow_ended: bool = False) -> str:
+        """Reserve one unit of capacity; returns the reservation key.
+        
+        ``allow_ended`` lets an existing order take its slot back after the
+        slot is over (e.g. a cancellation that is undone afterwards).
+        """
+        settings = await SettingsService.get_settings()
+        if slot not in settings.available_time_slots:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Unknown time slot"
+            )
+        schedule = await BusinessHoursService.get_schedule()
+        if not allow_ended and schedule.has_slot_ended(service_date, slot):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Selected time slot has already passed"
+            )
+
+        key = TimeSlotService.slot_key(service_date, slot)
+        capacity = TimeSlotService.capacity_for(settings, slot)
+        if capacity <= 0:
+            # With no counter document yet the upsert below would insert reserved=1
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Selected time slot is fully booked"
+            )
+        db = get_database()
+        try:
+            await db[COLLECTIONS['slot_reservations']].update_one(
+                {"_id": key, "reserved": {"$lt": capacity}},
+                {"$inc": {"reserved": 1}, "$setOnInsert": {"date": service_date.isoformat(), "slot": slot}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Selected time slot is fully booked"
+            )
+
+        TimeSlotService._adjust_cached(service_date, slot, 1)
+        return key
+
+    @staticmethod
+    async def release(key: str):
+        """Give back a reservation (e.g. order cancelled or failed to save)"""
+        db = get_database()
+        await db[COLLECTIONS['slot_reservations']].update_one(
+            {"_id": key, "reserved": {"$gt": 0}},
+            {"$inc": {"reserved": -1}}
+        )
+        TimeSlotService._adjust_cached(*TimeSlotService.parse_key(key), -1)
+
+    @staticmethod
+    async def get_counters(service_date: date) -> Dict[str, int]:
+        """Reserved count per slot for a date (cached per worker for TIME_SLOT_COUNTERS_TTL)"""
+        counters = cache_service.get("time_slots", service_date)
+        if counters is not None:
+            return counters
+
+        db = get_database()
+        cursor = db[COLLECTIONS['slot_reservations']].find({"date": service_date.isoformat()}, {"slot": 1, "reserved": 1})
+        counters = {doc["slot"]: doc["reserved"] async for doc in cursor}
+        cache_service.set("time_slots", service_date, counters, ttl=TIME_SLOT_COUNTERS_TTL)
+        return counters
+
+    @staticmethod
+    async def get_availability(service_date: date) -> List[dict]:
+        settings = await SettingsService.get_settings()
+        counters = await TimeSlotService.get_counters(service_date)
+        availability = []
+        for slot in settings.available_time_slots:
+            capacity = TimeSlotService.capacity_for(settings, slot)
+            reserved = counters.get(slot, 0)
+            availability.append({
+                "slot": slot,
+                "capacity": capacity,
+                "reserved": reserved,
+                "remaining": max(capacity - reserved, 0)
+            })
+        return availability
+
+    @staticmethod
+    def _adjust_cached(service_date: date, slot: str, delta: int):
+        # Keep this worker's copy in step with its own reservations without a re-read
+        counters = cache_service.get("time_slots", service_date)
+        if counters is not None:
+            counters[slot] = max(counters.get(slot, 0) + delta, 0)
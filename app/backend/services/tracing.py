@@ -0,0 +1,276 @@
+import abc
+import functools
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from pymongo import monitoring
+from services.metrics import traces_dropped
+import logging
+
+logger = logging.getLogger(__name__)
+
+# none (trace ids only), file (JSON lines) or otlp (OTLP/HTTP JSON collector)
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "nana-cafe-api")
+# Spans kept per trace; a runaway loop of DB calls should not grow a trace without bound
+TRACING_MAX_SPANS = int(os.getenv("TRACING_MAX_SPANS", "500"))
+# Finished traces waiting for export; while the collector is slow or down the excess is dropped
+TRACING_QUEUE_SIZE = int(os.getenv("TRACING_QUEUE_SIZE", "1000"))
+
+class Trace:
+    """Spans of one request, exported together once the root span ends"""
+
+    __slots__ = ("trace_id", "root_id", "spans", "dropped")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.root_id: Optional[str] = None
+        self.spans: List["Span"] = []
+        self.dropped = 0
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException):
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def finish(self, end_ns: Optional[int] = None):
+        self.end_ns = end_ns or time.time_ns()
+        # list.append is atomic, so driver threads can finish spans too
+        if len(self.trace.spans) < TRACING_MAX_SPANS:
+            self.trace.spans.append(self)
+        else:
+            self.trace.dropped += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+class TraceExporter(abc.ABC):
+    """Writes finished traces from a background thread, so exporting never blocks the event loop"""
+
+    def __init__(self, max_queue: int = TRACING_QUEUE_SIZE):
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+
+    def export(self, trace: Trace):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"{type(self).__name__}", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            traces_dropped.inc()
+
+    def shutdown(self, timeout: float = 5.0):
+        if self._thread is not None:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                logger.warning("Trace export queue still full at shutdown; abandoning queued traces")
+                return
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                return
+            try:
+                self.write(trace)
+            except Exception as e:
+                logger.warning(f"Failed to export trace {trace.trace_id}: {e}")
+
+    @abc.abstractmethod
+    def write(self, trace: Trace):
+        """Send one trace; runs on the exporter thread"""
+
+class FileTraceExporter(TraceExporter):
+    """One JSON line per trace"""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+
+    def write(self, trace: Trace):
+        record = {
+            "trace_id": trace.trace_id,
+            "service": TRACING_SERVICE_NAME,
+            "dropped_spans": trace.dropped,
+            "spans": [span.to_dict() for span in trace.spans]
+        }
+        with open(self.path, "a", encoding="utf-8") as trace_file:
+            trace_file.write(json.dumps(record, default=str) + "\n")
+
+class OTLPTraceExporter(TraceExporter):
+    """Posts traces as OTLP/HTTP JSON to a collector (or any stand-in accepting that payload)"""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        super().__init__()
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def write(self, trace: Trace):
+        import requests
+        response = requests.post(self.endpoint, json=self.to_otlp(trace), timeout=self.timeout)
+        response.raise_for_status()
+
+    @staticmethod
+    def to_otlp(trace: Trace) -> dict:
+        spans = []
+        for span in trace.spans:
+            otlp_span = {
+                "traceId": trace.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 2 if span.span_id == trace.root_id else 1,  # SERVER for the request, INTERNAL otherwise
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [{"key": key, "value": {"stringValue": str(value)}} for key, value in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            spans.append(otlp_span)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACING_SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": "nanacafe.tracing"}, "spans": spans}]
+            }]
+        }
+
+def create_exporter() -> Optional[TraceExporter]:
+    if TRACING_EXPORTER == "file":
+        return FileTraceExporter(TRACING_FILE)
+    if TRACING_EXPORTER == "otlp":
+        return OTLPTraceExporter(TRACING_OTLP_ENDPOINT)
+    return None
+
+class Tracer:
+    """Request-scoped spans carried in a contextvar.
+
+    The request middleware opens the root span; ``span()``/``@traced`` open
+    children under whatever span is current. Outside a request (scheduler,
+    CLI) there is no current span and they do nothing.
+    """
+
+    def __init__(self, exporter: Optional[TraceExporter] = None):
+        self.exporter = exporter
+
+    @contextmanager
+    def start_trace(self, name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None):
+        root = Span(Trace(trace_id or secrets.token_hex(16)), name, parent_id, attributes)
+        root.trace.root_id = root.span_id
+        token = current_span.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            root.record_exception(e)
+            raise
+        finally:
+            current_span.reset(token)
+            root.finish()
+            if self.exporter is not None:
+                self.exporter.export(root.trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        parent = current_span.get()
+        if parent is None:
+            yield None
+            return
+        span = Span(parent.trace, name, parent.span_id, attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            current_span.reset(token)
+            span.finish()
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+tracer = Tracer(create_exporter())
+
+def traced(name: str):
+    """Run an async function inside a child span"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class CommandTracingListener(monitoring.CommandListener):
+    """Child spans for MongoDB commands.
+
+    Motor runs commands on executor threads with a copy of the caller's
+    context, so ``current_span`` here is the span that issued the command.
+    """
+
+    def __init__(self):
+        self._spans: Dict[int, Span] = {}
+
+    def started(self, event):
+        parent = current_span.get()
+        if parent is None:
+            return
+        target = event.command.get(event.command_name)
+        attributes = {"db.system": "mongodb", "db.operation": event.command_name}
+        if isinstance(target, str):
+            attributes["db.collection"] = target
+        self._spans[event.request_id] = Span(parent.trace, f"mongodb.{event.command_name}", parent.span_id, attributes)
+
+    def succeeded(self, event):
+        span = self._spans.pop(event.request_id, None)
+        if span is not None:
+            span.finish(span.start_ns + event.duration_micros * 1000)
+
+    def failed(self, event):
+        span = self._spans.pop(event.request_id, None)
+        if span is not None:
+            span.error = str(event.failure)
+            span.finish(span.start_ns + event.duration_micros * 1000)
+
+db_tracing_listener = CommandTracingListener()
@@ -0,0 +1,22 @@
+import asyncio
+import os
+import sys
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from services.cache_service import cache_service
+
+@pytest.fixture
+def db():
+    """A fresh in-memory database with the application's indexes"""
+    database.client = AsyncMongoMockClient()
+    database.database = database.client[database.DB_NAME]
+    # Settings and slot counters cached by an earlier test belong to its database
+    for namespace in ("settings", "time_slots"):
+        cache_service.invalidate(namespace, broadcast=False)
+    asyncio.run(database.ensure_indexes())
+    yield database.database
+    database.client = database.database = None
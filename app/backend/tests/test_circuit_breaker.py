@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, HALF_OPEN, OPEN
+
+def make_breaker(**overrides):
+    breaker = CircuitBreaker("test")
+    breaker.min_calls = 4
+    breaker.failure_rate = 0.5
+    breaker.open_seconds = 0
+    breaker.probes = 2
+    for name, value in overrides.items():
+        setattr(breaker, name, value)
+    return breaker
+
+def fail(breaker, error=RuntimeError("down")):
+    with pytest.raises(type(error)):
+        with breaker.call():
+            raise error
+
+def succeed(breaker):
+    with breaker.call():
+        pass
+
+def trip(breaker):
+    for _ in range(breaker.min_calls):
+        fail(breaker, ConnectionError("down"))
+
+def test_opens_at_failure_rate_after_min_calls():
+    breaker = make_breaker(open_seconds=60)
+    fail(breaker)
+    succeed(breaker)
+    fail(breaker)
+    assert breaker.state == CLOSED
+    fail(breaker)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        succeed(breaker)
+
+def test_half_open_probes_close_it():
+    breaker = make_breaker()
+    trip(breaker)
+    succeed(breaker)
+    assert breaker.state == HALF_OPEN
+    succeed(breaker)
+    assert breaker.state == CLOSED
+
+def test_failed_probe_reopens_it():
+    breaker = make_breaker()
+    trip(breaker)
+    fail(breaker)
+    assert breaker.state == OPEN
+
+def test_one_probe_at_a_time():
+    breaker = make_breaker()
+    trip(breaker)
+    with breaker.call():
+        with pytest.raises(CircuitOpenError):
+            succeed(breaker)
+
+def test_non_failures_count_as_answers():
+    breaker = make_breaker(is_failure=lambda e: not isinstance(e, ValueError))
+    for _ in range(breaker.min_calls):
+        fail(breaker, ValueError("bad request"))
+    assert breaker.state == CLOSED
+
+def test_cancelled_probe_records_nothing():
+    breaker = make_breaker(is_failure=lambda e: isinstance(e, ConnectionError))
+    trip(breaker)
+
+    async def probe():
+        with breaker.call():
+            await asyncio.sleep(10)
+
+    async def cancel_probe():
+        task = asyncio.create_task(probe())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert breaker.state == HALF_OPEN
+    assert breaker._probe_successes == 0
+    # The probe slot is free again for the next caller
+    assert breaker.allow()
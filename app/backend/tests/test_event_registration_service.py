@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from models.event import RegistrationStatus
+from services.event_registration_service import EventRegistrationService, REGISTRATION_CLAIM_LEASE_SECONDS
+
+def run(coro):
+    return asyncio.run(coro)
+
+async def add_event(db, max_capacity=None, **fields):
+    await db.events.insert_one({
+        "id": "event-1",
+        "status": "upcoming",
+        "max_capacity": max_capacity,
+        "current_registrations": 0,
+        "waitlist_count": 0,
+        **fields
+    })
+
+async def statuses(db):
+    return {r["user_id"]: r["status"] async for r in db.event_registrations.find()}
+
+def test_concurrent_registrations_never_overshoot_capacity(db):
+    async def scenario():
+        await add_event(db, max_capacity=3)
+        results = await asyncio.gather(*(
+            EventRegistrationService.register("event-1", f"user-{i}") for i in range(10)
+        ))
+        event = await db.events.find_one({"id": "event-1"})
+        return results, event
+
+    results, event = run(scenario())
+    registered = [r for r in results if r.status == RegistrationStatus.REGISTERED]
+    waitlisted = [r for r in results if r.status == RegistrationStatus.WAITLISTED]
+    assert len(registered) == 3
+    assert len(waitlisted) == 7
+    assert event["current_registrations"] == 3
+    assert event["waitlist_count"] == 7
+
+def test_cancel_promotes_the_longest_waiting(db):
+    async def scenario():
+        await add_event(db, max_capacity=1)
+        for user in ("alice", "bob", "carol"):
+            await EventRegistrationService.register("event-1", user)
+        await EventRegistrationService.cancel("event-1", "alice")
+        return await statuses(db), await db.events.find_one({"id": "event-1"})
+
+    registrations, event = run(scenario())
+    assert registrations == {"alice": "cancelled", "bob": "registered", "carol": "waitlisted"}
+    assert event["current_registrations"] == 1
+    assert event["waitlist_count"] == 1
+
+def test_newcomer_queues_behind_the_waitlist(db):
+    async def scenario():
+        await add_event(db, max_capacity=1)
+        await EventRegistrationService.register("event-1", "alice")
+        await EventRegistrationService.register("event-1", "bob")
+        # A seat freed without promotion (e.g. capacity raised by hand) still goes to bob first
+        await db.events.update_one({"id": "event-1"}, {"$inc": {"max_capacity": 1}})
+        carol = await EventRegistrationService.register("event-1", "carol")
+        return carol, await statuses(db)
+
+    carol, registrations = run(scenario())
+    assert carol.status == RegistrationStatus.WAITLISTED
+    assert registrations["bob"] == "registered"
+
+def test_duplicate_registration_is_rejected(db):
+    async def scenario():
+        await add_event(db)
+        await EventRegistrationService.register("event-1", "alice")
+        await EventRegistrationService.register("event-1", "alice")
+
+    with pytest.raises(HTTPException) as exc:
+        run(scenario())
+    assert exc.value.status_code == 400
+
+def test_unknown_event_writes_nothing(db):
+    async def scenario():
+        with pytest.raises(HTTPException) as exc:
+            await EventRegistrationService.register("missing", "alice")
+        return exc.value, await db.event_registrations.count_documents({})
+
+    error, count = run(scenario())
+    assert error.status_code == 404
+    assert count == 0
+
+def test_abandoned_claim_seat_is_returned_on_takeover(db):
+    async def scenario():
+        # A register that took the last seat and died before marking itself REGISTERED
+        await add_event(db, max_capacity=1, current_registrations=1, seat_holds=["dead-claim"])
+        await db.event_registrations.insert_one({
+            "id": "reg-1",
+            "event_id": "event-1",
+            "user_id": "alice",
+            "status": "pending",
+            "claim_id": "dead-claim",
+            "updated_at": datetime.utcnow() - timedelta(seconds=REGISTRATION_CLAIM_LEASE_SECONDS + 1),
+            "created_at": datetime.utcnow()
+        })
+        registration = await EventRegistrationService.register("event-1", "alice")
+        return registration, await db.events.find_one({"id": "event-1"})
+
+    registration, event = run(scenario())
+    assert registration.status == RegistrationStatus.REGISTERED
+    assert event["current_registrations"] == 1
+    assert event["seat_holds"] == []
+
+def test_cancelling_an_abandoned_claim_returns_its_seat(db):
+    async def scenario():
+        await add_event(db, max_capacity=1, current_registrations=1, seat_holds=["dead-claim"])
+        await db.event_registrations.insert_one({
+            "id": "reg-1",
+            "event_id": "event-1",
+            "user_id": "alice",
+            "status": "pending",
+            "claim_id": "dead-claim",
+            "updated_at": datetime.utcnow(),
+            "created_at": datetime.utcnow()
+        })
+        await EventRegistrationService.cancel("event-1", "alice")
+        return await db.events.find_one({"id": "event-1"})
+
+    event = run(scenario())
+    assert event["current_registrations"] == 0
+    assert event["seat_holds"] == []
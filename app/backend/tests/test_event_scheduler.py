@@ -0,0 +1,26 @@
+import asyncio
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from models.settings import CafeSettings
+from services import event_scheduler
+from services.event_scheduler import EventScheduler
+
+def test_transitions_follow_the_cafe_date(db):
+    async def scenario():
+        await db.settings.insert_one(CafeSettings(contact_email="cafe@example.com", timezone="Pacific/Kiritimati").dict())
+        cafe_today = datetime.now(ZoneInfo("Pacific/Kiritimati")).date()
+        await db.events.insert_one({"id": "e", "status": "upcoming", "event_date": datetime.combine(cafe_today, datetime.min.time())})
+        await EventScheduler.run_once()
+        return (await db.events.find_one({"id": "e"}))["status"]
+
+    assert asyncio.run(scenario()) == "active"
+
+def test_next_run_is_the_cafe_midnight():
+    manila = ZoneInfo("Asia/Manila")
+    assert EventScheduler.seconds_until_next_run(datetime(2024, 5, 6, 23, 30, tzinfo=manila)) == 1801
+
+def test_next_run_counts_a_dst_change(monkeypatch):
+    monkeypatch.setattr(event_scheduler, "EVENT_SCHEDULER_MAX_SLEEP_SECONDS", 2 * 24 * 3600)
+    # Clocks go back an hour at 2:00 on 2024-11-03, so that day is 25 hours long
+    delay = EventScheduler.seconds_until_next_run(datetime(2024, 11, 3, 0, 0, tzinfo=ZoneInfo("America/New_York")))
+    assert delay == 25 * 3600 + 1
@@ -0,0 +1,75 @@
+import asyncio
+from datetime import date, datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from models.settings import CafeSettings
+from services.business_hours import CompiledSchedule
+from services.timeslot_service import TimeSlotService
+
+SLOT = "9:00 AM - 10:00 AM"
+
+def run(coro):
+    return asyncio.run(coro)
+
+async def use_settings(db, **fields):
+    await db.settings.insert_one(CafeSettings(contact_email="cafe@example.com", timezone="UTC", **fields).dict())
+
+def tomorrow() -> date:
+    return datetime.utcnow().date() + timedelta(days=1)
+
+def test_reserve_stops_at_capacity(db):
+    async def scenario():
+        await use_settings(db, time_slot_capacity=3)
+        outcomes = await asyncio.gather(
+            *(TimeSlotService.reserve(tomorrow(), SLOT) for _ in range(5)),
+            return_exceptions=True
+        )
+        return outcomes, await db.slot_reservations.find_one({})
+
+    outcomes, counter = run(scenario())
+    rejected = [o for o in outcomes if isinstance(o, HTTPException)]
+    assert len(rejected) == 2
+    assert all(o.status_code == 409 for o in rejected)
+    assert counter["reserved"] == 3
+
+def test_release_frees_a_place(db):
+    async def scenario():
+        await use_settings(db, time_slot_capacity=1)
+        key = await TimeSlotService.reserve(tomorrow(), SLOT)
+        await TimeSlotService.release(key)
+        await TimeSlotService.reserve(tomorrow(), SLOT)
+        # Releasing more than was reserved never goes below zero
+        await TimeSlotService.release(key)
+        await TimeSlotService.release(key)
+        return await TimeSlotService.get_availability(tomorrow())
+
+    availability = run(scenario())
+    assert next(a for a in availability if a["slot"] == SLOT)["reserved"] == 0
+
+def test_zero_capacity_slot_is_never_booked(db):
+    async def scenario():
+        await use_settings(db, time_slot_capacities={SLOT: 0})
+        with pytest.raises(HTTPException) as exc:
+            await TimeSlotService.reserve(tomorrow(), SLOT)
+        return exc.value, await db.slot_reservations.count_documents({})
+
+    error, count = run(scenario())
+    assert error.status_code == 409
+    assert count == 0
+
+def test_past_dates_are_rejected(db):
+    async def scenario():
+        await use_settings(db)
+        with pytest.raises(HTTPException) as exc:
+            await TimeSlotService.reserve(datetime.utcnow().date() - timedelta(days=1), SLOT)
+        return exc.value
+
+    assert run(scenario()).status_code == 400
+
+def test_slot_has_ended():
+    schedule = CompiledSchedule.compile(CafeSettings(contact_email="cafe@example.com", timezone="UTC"))
+    today = date(2024, 5, 6)
+    assert not schedule.has_slot_ended(today, SLOT, datetime(2024, 5, 6, 9, 30))
+    assert schedule.has_slot_ended(today, SLOT, datetime(2024, 5, 6, 10, 0))
+    assert schedule.has_slot_ended(today, SLOT, datetime(2024, 5, 7, 8, 0))
+    assert not schedule.has_slot_ended(today, SLOT, datetime(2024, 5, 5, 23, 0))